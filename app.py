@@ -1,5 +1,6 @@
 import streamlit as st
 from datetime import datetime, timedelta
+from refund_engine import RefundCase, calculate_refund
 
 def refund_calculator_page():
     st.title("💰 이용권 환불 계산")
@@ -26,39 +27,22 @@ def refund_calculator_page():
         valid_period = f"{purchase_date.strftime('%Y-%m-%d')} ~ {(purchase_date + timedelta(days=days_given-1)).strftime('%Y-%m-%d')}" if days_given else "정보 없음"
     
     if st.button("환불 금액 계산"):
-        used_days = (refund_date - purchase_date).days + 1
-        daily_rate = 11000
-        hourly_rate = 2000
-        used_amount = 0
-        
-        if policy == "% 규정":
-            percent_used = (used_days / days_given) * 100 if ticket_type in ["기간권", "노블레스석"] else (hours_used / total_hours) * 100
-            
-            if percent_used <= 25:
-                refund_amount = ticket_price * 0.5
-                deduction_amount = ticket_price * 0.5
-                deduction_detail = f"0~25% 환불 구간 : 결제금액의 50% 환불 ({deduction_amount:,.0f}원)"
-            elif percent_used <= 50:
-                refund_amount = ticket_price * 0.25
-                deduction_amount = ticket_price * 0.75
-                deduction_detail = f"26~50% 환불 구간 : 결제금액의 25% 환불 ({deduction_amount:,.0f}원)"
-            else:
-                refund_amount = 0
-                deduction_amount = ticket_price
-                deduction_detail = f"50% 초과 사용 구간 : 환불 불가 ({deduction_amount:,.0f}원)"
-            
-            usage_info = f"{percent_used:.1f}% 사용"
-            used_amount = deduction_amount
-        else:
-            if ticket_type == "기간권":
-                used_amount = used_days * daily_rate
-            elif ticket_type == "노블레스석":
-                used_amount = used_days * noble_rate
-            elif ticket_type == "시간권":
-                used_amount = hours_used * hourly_rate
-            refund_amount = max(ticket_price - used_amount, 0)
-            usage_info = f"{used_days}일 사용" if ticket_type in ["기간권", "노블레스석"] else f"{hours_used}시간 사용"
-            deduction_detail = f"{used_days}일 × {daily_rate:,}원" if ticket_type == "기간권" else f"{used_days}일 × {noble_rate:,}원 (노블레스석 1일 요금)" if ticket_type == "노블레스석" else f"{hours_used}시간 × {hourly_rate:,}원"
+        # ✅ 공용 환불 엔진으로 계산
+        result = calculate_refund(RefundCase(
+            ticket_type=ticket_type,
+            policy=policy,
+            ticket_price=ticket_price,
+            purchase_date=purchase_date,
+            refund_date=refund_date,
+            days_given=days_given,
+            hours_used=hours_used,
+            total_hours=total_hours,
+            noble_rate=noble_rate,
+        ))
+        usage_info = result.usage_info
+        used_amount = int(result.deduction_amount)
+        deduction_detail = result.deduction_detail
+        refund_amount = result.refund_amount
         
         refund_detail = f"""
         [멘토즈 스터디카페 환불 내역서]
@@ -0,0 +1,146 @@
+import functools, html, json, math
+
+import folium
+from folium.plugins import FastMarkerCluster
+
+
+# ✅ 지점 지도 HTML 생성
+#    - 전체 지점 지도: 좌표표(BranchStore.locations)에서 GeoJSON을 한 번 만들고, 마커는 FastMarkerCluster로 넘겨
+#      브라우저가 마커 객체를 지점마다 따로 만들지 않게 한다 (수천 개여도 가볍게 표시).
+#      결과 HTML은 호출하는 쪽에서 스냅샷 버전별로 캐시한다.
+#    - 지점 하나 지도: (지점명, 좌표)마다 HTML을 한 번만 만들어 재사용한다 (같은 문자열이면 화면의 iframe도 그대로 유지).
+#      카카오 지도 SDK를 쓸 수 없으면(키 없음/로드 실패) 같은 좌표로 folium(OpenStreetMap) 지도를 보여준다.
+
+DEFAULT_CENTER = (36.5, 127.8)  # 대한민국 중심 부근
+
+# FastMarkerCluster 콜백: row = [위도, 경도, 지점명, 주소]
+_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup('<b>' + row[2] + '</b><br>' + row[3]);
+    marker.bindTooltip(row[2]);
+    return marker;
+};
+"""
+
+
+def build_branch_geojson(locations):
+    """좌표가 있는 지점만 Point Feature로 변환 (같은 지점명은 첫 행만)"""
+    features = []
+    seen = set()
+    for name, address, lat, lng in zip(locations["지점명"], locations["주소"], locations["위도"], locations["경도"]):
+        name = str(name).strip()
+        if not name or name in seen or math.isnan(lat) or math.isnan(lng):
+            continue
+        seen.add(name)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(lng), float(lat)]},
+            "properties": {"name": name, "address": str(address)},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _escape(text):
+    # 팝업 HTML에 그대로 들어가므로 태그 문자만 바꿔 둔다
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def render_overview_map(geojson, height=600):
+    """GeoJSON FeatureCollection → 클러스터 지도 HTML 문자열"""
+    features = geojson["features"]
+    if features:
+        lats = [f["geometry"]["coordinates"][1] for f in features]
+        lngs = [f["geometry"]["coordinates"][0] for f in features]
+        center = (sum(lats) / len(lats), sum(lngs) / len(lngs))
+    else:
+        center = DEFAULT_CENTER
+
+    m = folium.Map(location=center, zoom_start=7, height=height, prefer_canvas=True)
+    rows = [
+        [f["geometry"]["coordinates"][1], f["geometry"]["coordinates"][0],
+         _escape(f["properties"]["name"]), _escape(f["properties"]["address"])]
+        for f in features
+    ]
+    FastMarkerCluster(rows, callback=_MARKER_CALLBACK, name="지점").add_to(m)
+    if features:
+        m.fit_bounds([[min(lats), min(lngs)], [max(lats), max(lngs)]])
+    return m.get_root().render()
+
+
+def geojson_bytes(geojson):
+    """다운로드용 GeoJSON (UTF-8)"""
+    return json.dumps(geojson, ensure_ascii=False).encode("utf-8")
+
+
+_KAKAO_MAP_TEMPLATE = """
+<meta http-equiv="Content-Security-Policy" content="upgrade-insecure-requests">
+<div id="map" style="width:100%;height:{height}px;border-radius:12px;margin:0 auto;box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);"></div>
+<iframe id="map-fallback" style="display:none;width:100%;height:{height}px;border:0;border-radius:12px;" srcdoc="{fallback}"></iframe>
+<script type="text/javascript" src="//dapi.kakao.com/v2/maps/sdk.js?appkey={app_key}&libraries=services"></script>
+<script>
+    if (typeof kakao === 'undefined' || !kakao.maps) {{
+        // SDK를 불러오지 못한 경우 → 같은 좌표의 folium 지도로 대체
+        document.getElementById('map').style.display = 'none';
+        document.getElementById('map-fallback').style.display = 'block';
+    }} else {{
+        var mapContainer = document.getElementById('map');
+        var mapOption = {{
+            center: new kakao.maps.LatLng({lat}, {lng}), // 변환된 좌표 사용
+            level: 3
+        }};
+        var map = new kakao.maps.Map(mapContainer, mapOption);
+
+        // 마커 생성
+        var marker = new kakao.maps.Marker({{
+            map: map,
+            position: new kakao.maps.LatLng({lat}, {lng})
+        }});
+
+        // 인포윈도우 생성
+        var infowindow = new kakao.maps.InfoWindow({{
+            content: '<div style="padding:10px;font-size:14px;background-color:#ffffff;border-radius:8px;box-shadow: 0 2px 6px rgba(0,0,0,0.1);">' + {name} + '</div>'
+        }});
+        infowindow.open(map, marker);
+
+        // 지도 컨트롤 스타일 변경
+        var zoomControl = new kakao.maps.ZoomControl();
+        map.addControl(zoomControl, kakao.maps.ControlPosition.RIGHT);
+
+        // 지도 스타일 커스텀
+        map.setOptions({{
+            mapTypeControl: true,
+            mapTypeId: kakao.maps.MapTypeId.ROADMAP,
+            zoomControl: true,
+            zoomControlOptions: {{
+                position: kakao.maps.ControlPosition.RIGHT
+            }},
+            scaleControl: true,
+            streetViewControl: false,
+            rotateControl: false,
+            fullscreenControl: false,
+            keyboardShortcuts: false
+        }});
+    }}
+</script>
+"""
+
+
+@functools.lru_cache(maxsize=256)
+def folium_branch_map_html(name, lat, lng, height=400):
+    """지점 하나 folium 지도 HTML (카카오 SDK 대체용)"""
+    m = folium.Map(location=(lat, lng), zoom_start=17, height=height)
+    folium.Marker((lat, lng), tooltip=_escape(name), popup=_escape(name)).add_to(m)
+    return m.get_root().render()
+
+
+@functools.lru_cache(maxsize=256)
+def branch_map_html(name, lat, lng, app_key=None, height=400):
+    """지점 하나 지도 HTML ((지점명, 좌표, 키)마다 한 번만 생성). app_key가 없으면 folium 지도"""
+    fallback = folium_branch_map_html(name, lat, lng, height)
+    if not app_key:
+        return fallback
+    return _KAKAO_MAP_TEMPLATE.format(
+        height=height, fallback=html.escape(fallback, quote=True), app_key=app_key,
+        lat=lat, lng=lng, name=json.dumps(_escape(name), ensure_ascii=False),
+    )
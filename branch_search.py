@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict, defaultdict
+
+
+# ✅ 지점명 검색 인덱스 (스냅샷마다 한 번만 생성해서 모든 페이지가 공유)
+#    부분 일치 / 앞부분 일치 / 초성 검색("ㅂㅅㅇㅅ" → 부산연산점)을 지원하고 결과를 순위대로 정렬한다.
+
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSUNG_SET = set(CHOSUNG)
+_HANGUL_START, _HANGUL_END = 0xAC00, 0xD7A3
+
+
+def normalize(text):
+    """검색용 정규화 (소문자, 공백 제거)"""
+    return "".join(str(text).lower().split())
+
+
+def to_chosung(text):
+    """한글 음절을 초성으로 변환 (그 외 문자는 그대로)"""
+    result = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_START <= code <= _HANGUL_END:
+            result.append(CHOSUNG[(code - _HANGUL_START) // 588])
+        else:
+            result.append(ch)
+    return "".join(result)
+
+
+def has_chosung(text):
+    return any(ch in _CHOSUNG_SET for ch in text)
+
+
+def _grams(text):
+    # 글자 1개 + 연속된 2글자 조합
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class BranchSearchIndex:
+    def __init__(self, names):
+        self.names = []  # 중복 없는 지점명 (시트 순서)
+        self.rows = {}  # 지점명 → 시트 행 위치 목록 (DataFrame 기준 0부터)
+        for row, name in enumerate(names):
+            if name is None or str(name).strip() == "":
+                continue
+            name = str(name).strip()
+            if name not in self.rows:
+                self.rows[name] = []
+                self.names.append(name)
+            self.rows[name].append(row)
+
+        self._keys = [normalize(name) for name in self.names]
+        self._chosung_keys = [to_chosung(key) for key in self._keys]
+        self._plain_grams = self._build_grams(self._keys)
+        self._chosung_grams = self._build_grams(self._chosung_keys)
+
+        # ✅ 한 글자 검색("점", "ㄱ")은 거의 모든 지점이 걸리므로 순위를 미리 계산해 둔다
+        self._plain_single = self._build_single(self._keys, self._plain_grams, 0)
+        self._chosung_single = self._build_single(self._chosung_keys, self._chosung_grams, 3)
+        self._cache = OrderedDict()  # 최근 검색어 결과 (화면이 다시 그려질 때마다 같은 검색어가 반복됨)
+        self._cache_lock = threading.Lock()  # 여러 세션이 같은 인덱스를 공유
+
+    @staticmethod
+    def _build_grams(keys):
+        grams = defaultdict(set)
+        for i, key in enumerate(keys):
+            for gram in _grams(key):
+                grams[gram].add(i)
+        return grams
+
+    def _build_single(self, keys, grams, base_rank):
+        single = {}
+        for gram, ids in grams.items():
+            if len(gram) == 1:
+                single[gram] = [i for *_, i in sorted(self._rank(keys[i], gram, i, base_rank) for i in ids)]
+        return single
+
+    def _rank(self, key, query, i, base_rank):
+        pos = key.find(query)
+        if base_rank == 0 and key == query:
+            return (0, pos, len(self._keys[i]), i)
+        return (base_rank + (1 if pos == 0 else 2), pos, len(self._keys[i]), i)
+
+    def _candidates(self, query, grams):
+        # ✅ 검색어의 글자 조합이 모두 들어있는 지점만 후보로 (가장 적은 집합부터 교집합)
+        sets = sorted((grams.get(gram, set()) for gram in _grams(query)), key=len)
+        if not sets or not sets[0]:
+            return set()
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def search(self, query, limit=None):
+        """검색어와 일치하는 지점명 목록 (정확히 일치 > 앞부분 일치 > 부분 일치 > 초성 일치 순)"""
+        query = normalize(query)
+        if not query:
+            return []
+
+        with self._cache_lock:
+            ids = self._cache.get(query)
+            if ids is not None:
+                self._cache.move_to_end(query)
+        if ids is None:
+            ids = self._search(query)
+            with self._cache_lock:
+                self._cache[query] = ids
+                if len(self._cache) > 256:
+                    self._cache.popitem(last=False)
+
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.names[i] for i in ids]
+
+    def _search(self, query):
+        if has_chosung(query):
+            # 초성이 섞인 검색어는 지점명의 초성과 비교 ("부산ㅇㅅ"처럼 섞어 써도 동작)
+            query = to_chosung(query)
+            keys, grams, single, base_rank = self._chosung_keys, self._chosung_grams, self._chosung_single, 3
+        else:
+            keys, grams, single, base_rank = self._keys, self._plain_grams, self._plain_single, 0
+
+        if len(query) == 1:
+            return single.get(query, [])
+
+        ranked = [
+            self._rank(keys[i], query, i, base_rank)
+            for i in self._candidates(query, grams) if query in keys[i]
+        ]
+        ranked.sort()
+        return [i for *_, i in ranked]
+
+    def search_rows(self, query):
+        """검색된 지점들의 시트 행 위치 (시트 순서로 정렬)"""
+        return sorted(row for name in self.search(query) for row in self.rows[name])
@@ -0,0 +1,323 @@
+import json, os, tempfile, threading, time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from branch_search import BranchSearchIndex
+from refund_policy import PolicyTable
+
+
+# ✅ 지점 정보 스냅샷 (디스크에 보관, 시트가 바뀐 경우에만 다시 읽음)
+SNAPSHOT_PATH = os.getenv("BRANCH_SNAPSHOT_PATH", os.path.join(".cache", "branch_snapshot.json"))
+SPREADSHEET_TITLE = "멘토즈 지점 정보"
+WORKSHEET_TITLE = "시트1"
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """디스크에 저장된 스냅샷 로드 (없거나 손상된 경우 None)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or not snapshot.get("values"):
+        return None
+    return snapshot
+
+
+def save_snapshot(snapshot, path=SNAPSHOT_PATH):
+    """임시 파일에 쓴 뒤 교체 (다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록)"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class BranchSync:
+    """로컬 스냅샷을 유지하면서 시트의 수정 시각이 바뀐 경우에만 전체 데이터를 다시 읽음
+
+    stale-while-revalidate: 확인 주기가 지나면 백그라운드 스레드가 시트를 확인하고, 그동안 화면에는
+    마지막 스냅샷을 그대로 보여준다. 새 데이터는 BranchStore까지 만든 뒤 한 번에 교체한다.
+    스냅샷이 전혀 없는 첫 실행에서만 호출한 쪽이 다운로드를 기다린다.
+    """
+
+    def __init__(self, source, path=SNAPSHOT_PATH, check_interval=5, locate=None):
+        self.source = source  # storage_backends의 백엔드 (revision() / read_values())
+        self.locate = locate  # 주소 → (위도, 경도) 또는 None (네트워크 없이 캐시만 조회하는 함수)
+        self.path = path
+        self.check_interval = check_interval
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._invalidations = 0  # invalidate() 횟수 (확인 도중 들어온 invalidate를 덮어쓰지 않도록)
+
+        # ✅ 디스크 스냅샷이 있으면 바로 사용 (다음 확인 주기에 변경 여부 확인)
+        self.snapshot = load_snapshot(path)
+        self.checked_at = time.time() if self.snapshot else 0.0
+        self.verified_at = self.snapshot.get("fetched_at", 0.0) if self.snapshot else 0.0  # 시트와 같다고 마지막으로 확인한 시각
+
+        self._store = None  # 현재 스냅샷으로 만든 BranchStore (스냅샷과 함께 교체)
+        self._store_lock = threading.Lock()
+
+    def current(self):
+        """최신 스냅샷 반환 (오래된 경우 백그라운드 갱신만 시작하고 기다리지 않음)"""
+        with self._lock:
+            if self.snapshot is None:
+                # 첫 실행: 보여줄 데이터가 없으므로 한 번은 기다린다 (실패하면 호출한 쪽에서 처리)
+                snapshot = self._fetch(None)
+                self.snapshot, self._store = snapshot, None
+                self.checked_at = self.verified_at = time.time()
+                self.last_error = None
+                save_snapshot(snapshot, self.path)
+            elif not self._refreshing and time.time() - self.checked_at >= self.check_interval:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, name="branch-sync", daemon=True).start()
+            return self.snapshot
+
+    def store(self):
+        """현재 스냅샷의 BranchStore 반환 (모든 세션이 같은 객체를 복사 없이 공유)"""
+        snapshot = self.current()
+        store = self._store
+        if store is not None and store.snapshot is snapshot:
+            return store
+        with self._store_lock:
+            if self._store is None or self._store.snapshot is not snapshot:
+                self._store = BranchStore(snapshot, self.locate)
+            return self._store
+
+    def refresh_locations(self):
+        """좌표 캐시가 갱신된 뒤 같은 스냅샷으로 BranchStore를 다시 만들어 교체"""
+        snapshot = self.current()
+        store = BranchStore(snapshot, self.locate)
+        with self._lock:
+            if self.snapshot is snapshot:
+                self._store = store
+
+    def age(self):
+        """화면에 보이는 데이터가 시트와 같다고 마지막으로 확인된 뒤 지난 시간(초)"""
+        return max(0.0, time.time() - self.verified_at) if self.verified_at else None
+
+    def invalidate(self):
+        """다음 current() 호출 때 수정 시각을 바로 확인하도록 표시 (쓰기 직후 호출)"""
+        with self._lock:
+            self.checked_at = 0.0
+            self._invalidations += 1
+
+    def commit(self, values, revision):
+        """직접 쓴 결과를 스냅샷에 바로 반영 (전체를 다시 읽지 않음)"""
+        snapshot = {"revision": revision, "fetched_at": time.time(), "values": values}
+        store = BranchStore(snapshot, self.locate)
+        with self._lock:
+            self.snapshot, self._store = snapshot, store
+            self.checked_at = self.verified_at = snapshot["fetched_at"]
+            save_snapshot(snapshot, self.path)
+
+    def _fetch(self, snapshot):
+        """시트 수정 시각을 확인하고 바뀐 경우에만 새 스냅샷 반환 (그대로면 None)"""
+        revision = self.source.revision()
+        if snapshot is not None and snapshot.get("revision") == revision:
+            return None
+        values = self.source.read_values()
+        return {"revision": revision, "fetched_at": time.time(), "values": values}
+
+    def _refresh(self):
+        with self._lock:
+            base, invalidations = self.snapshot, self._invalidations
+        try:
+            snapshot = self._fetch(base)
+            store = BranchStore(snapshot, self.locate) if snapshot is not None else None  # 교체 전에 미리 생성
+        except Exception as e:
+            # 이전 스냅샷을 계속 제공하고 다음 확인 주기에 다시 시도
+            with self._lock:
+                self.last_error = e
+                self.checked_at = time.time() if self._invalidations == invalidations else 0.0
+                self._refreshing = False
+            return
+
+        with self._lock:
+            self.checked_at = time.time()
+            self.last_error = None
+            if self.snapshot is not base:
+                # 확인하는 동안 쓰기 결과가 먼저 반영됨 → 다음 주기에 다시 확인
+                self.checked_at = 0.0
+            elif snapshot is not None:
+                self.snapshot, self._store = snapshot, store
+                self.verified_at = self.checked_at
+                save_snapshot(snapshot, self.path)
+            else:
+                self.verified_at = self.checked_at
+            if self._invalidations != invalidations:
+                # 확인하는 동안 invalidate() 호출됨 (읽은 값이 그 쓰기 이전일 수 있음) → 다음 current()에서 바로 다시 확인
+                self.checked_at = 0.0
+            self._refreshing = False
+
+
+# ✅ 지점 레코드 (지점명 → 정규화된 지점 정보, 스냅샷마다 한 번만 생성)
+@dataclass(frozen=True)
+class BranchRecord:
+    name: str
+    row: int  # DataFrame 행 위치 (시트 행 번호 = row + 2)
+    locker_id: str
+    locker_pwd: str
+    login_id: str
+    login_pwd: str
+    channel: str
+    study_room: str
+    special_notes: str
+    parking: str
+    laptop_printer: str
+    address: str
+    time_price: str  # 시간권금액 원문 (예: "2,000원")
+    period_price: str  # 기간권금액 원문
+    refund_period: str
+    refund_restriction: str
+    latitude: float = None  # 미리 변환해 둔 좌표 (없으면 None)
+    longitude: float = None
+
+
+# 레코드 필드 → (시트 컬럼명, 컬럼이 없을 때 기본값)
+RECORD_COLUMNS = {
+    "locker_id": ("사물함ID", ""),
+    "locker_pwd": ("사물함PWD", ""),
+    "login_id": ("ID", ""),
+    "login_pwd": ("PWD", ""),
+    "channel": ("지점카카오톡채널", "N/A"),
+    "study_room": ("스터디룸여부", "N/A"),
+    "special_notes": ("특이사항", ""),
+    "parking": ("주차여부", "N/A"),
+    "laptop_printer": ("노트북/프린트", "N/A"),
+    "address": ("주소", "N/A"),
+    "time_price": ("시간권금액", "0"),
+    "period_price": ("기간권금액", "0"),
+    "refund_period": ("환불기간", "미입력"),
+    "refund_restriction": ("환불응대금지", "미입력"),
+}
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and value != value):  # None / NaN
+        return ""
+    return str(value).strip()
+
+
+class BranchRecords:
+    """지점명으로 바로 찾는 레코드 모음 (같은 지점명이 여러 행이면 첫 행을 쓰고 중복 행을 따로 기록)"""
+
+    def __init__(self, df, locations=None):
+        self.by_name = {}
+        self.duplicates = {}  # 지점명 → 행 위치 목록 (2개 이상인 경우만)
+        if "지점명" not in df.columns:
+            return
+
+        columns = {
+            field: [_clean(v) for v in df[col]] if col in df.columns else [default] * len(df)
+            for field, (col, default) in RECORD_COLUMNS.items()
+        }
+        for row, name in enumerate(df["지점명"]):
+            name = _clean(name)
+            if not name:
+                continue
+            if name in self.by_name:
+                self.duplicates.setdefault(name, [self.by_name[name].row]).append(row)
+                continue
+            lat, lng = (locations[row] if locations is not None else None) or (None, None)
+            self.by_name[name] = BranchRecord(
+                name=name, row=row, latitude=lat, longitude=lng,
+                **{field: values[row] for field, values in columns.items()}
+            )
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def duplicate_rows(self, name):
+        return self.duplicates.get(name, [])
+
+    def __len__(self):
+        return len(self.by_name)
+
+
+# ✅ 시트 값 → DataFrame (컬럼명 정규화, 필수 컬럼 확인, 계정/사물함 값 정리)
+REQUIRED_COLUMNS = ["지점명", "사물함ID", "사물함PWD", "ID", "PWD",
+                    "지점카카오톡채널", "스터디룸여부", "주차여부", "노트북/프린트"]
+
+
+# 새 저장소 파일을 만들 때 쓰는 헤더 (시트와 같은 열 순서)
+SHEET_COLUMNS = ["지점명"] + [column for column, _ in RECORD_COLUMNS.values()]
+
+
+def build_frame(values):
+    if not values:
+        raise KeyError("지점 데이터에 헤더 행이 없습니다. 시트(또는 BRANCH_BACKEND_PATH 파일)가 비어 있는지 확인해주세요.")
+    df = pd.DataFrame(values[1:], columns=values[0])  # 첫 번째 행을 컬럼명으로 사용
+
+    # ✅ 컬럼명 정규화 (공백 제거 및 대소문자 통일)
+    df.columns = df.columns.str.strip().str.replace(" ", "")
+
+    # ✅ 필수 컬럼 존재 여부 확인
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            raise KeyError(f"구글 시트에 '{col}' 컬럼이 없습니다. 시트 구조를 확인해주세요.")
+
+    # ✅ 모든 0 패딩 제거 (사물함ID, 사물함PWD)
+    df["사물함ID"] = df["사물함ID"].astype(str).str.strip()
+    df["사물함PWD"] = df["사물함PWD"].astype(str).str.strip()
+
+    # ✅ ID, PWD 컬럼: 텍스트 형식으로 강제 변환 (앞의 0 유지, 빈 값은 공백 처리)
+    df["ID"] = df["ID"].apply(lambda x: str(x).strip() if x else "")
+    df["PWD"] = df["PWD"].apply(lambda x: str(x).strip() if x else "")
+    return df
+
+
+def build_locations(frame, locate=None):
+    """지점별 위도/경도 (frame과 같은 인덱스, 좌표가 없으면 NaN)
+
+    좌표는 시트 값이 아니라 주소 기준 좌표 캐시에서 가져온다 (편집기/시트에 위도·경도 열이 섞이지 않도록).
+    """
+    names = frame["지점명"] if "지점명" in frame.columns else pd.Series("", index=frame.index)
+    addresses = frame["주소"] if "주소" in frame.columns else pd.Series("", index=frame.index)
+    coords = {}
+    if locate is not None:
+        for address in addresses.unique():
+            coords[address] = locate(address) or (float("nan"), float("nan"))
+    pairs = [coords.get(a, (float("nan"), float("nan"))) for a in addresses]
+    return pd.DataFrame({
+        "지점명": names.values,
+        "주소": addresses.values,
+        "위도": [p[0] for p in pairs],
+        "경도": [p[1] for p in pairs],
+    }, index=frame.index, columns=["지점명", "주소", "위도", "경도"]).astype({"위도": float, "경도": float})
+
+
+class BranchStore:
+    """스냅샷 하나로 만든 읽기 전용 데이터 묶음
+
+    st.cache_data처럼 호출할 때마다 DataFrame을 복사하지 않고, 프로세스 안의 모든 세션이 같은 객체를 읽는다.
+    frame은 절대 직접 수정하지 말고 필요한 경우 복사본이나 iloc 등으로 만든 뷰를 사용한다.
+    """
+
+    def __init__(self, snapshot, locate=None):
+        self.snapshot = snapshot
+        self.revision = snapshot["revision"] if snapshot else None
+        self.frame = build_frame(snapshot["values"]) if snapshot else pd.DataFrame()
+        self.locations = build_locations(self.frame, locate)
+        coords = [
+            None if pd.isna(lat) else (lat, lng)
+            for lat, lng in zip(self.locations["위도"], self.locations["경도"])
+        ]
+        self.records = BranchRecords(self.frame, coords)
+        self.policies = PolicyTable(self.records)  # 지점별 환불 정책 (금액/기간 문자열은 여기서 한 번만 해석)
+        # 스냅샷 + 좌표 버전 (좌표만 갱신돼도 바뀜, 지도 HTML 같은 파생 결과의 캐시 키)
+        coords_hash = int(pd.util.hash_pandas_object(self.locations[["위도", "경도"]], index=False).sum())
+        self.version = f"{self.revision}:{coords_hash:x}"
+        self.search_index = BranchSearchIndex(self.frame["지점명"] if "지점명" in self.frame.columns else [])
+
+    @classmethod
+    def empty(cls):
+        return cls(None)
@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+# ✅ 퇴실 미처리 초과 요금
+#    기본 규정은 30분당 1,000원. 지점별 규정(단위 분, 단위 요금, 상한)이 있으면 그 지점에만 적용한다.
+#    일괄 계산은 업로드한 퇴실 기록 전체를 pandas 날짜 연산 한 번으로 처리한다 (행마다 파이썬 루프 없음).
+
+TIMEZONE = "Asia/Seoul"
+
+
+@dataclass(frozen=True)
+class FeeRule:
+    unit_minutes: int = 30  # 요금 단위 (분)
+    unit_fee: int = 1000  # 단위당 요금 (원)
+    max_fee: int = None  # 상한 (없으면 None)
+
+    def __post_init__(self):
+        # 단위가 0이면 나눗셈이 깨진다 (0으로 나누기 / 일괄 계산 표에 음수 최솟값)
+        if not (self.unit_minutes > 0 and self.unit_fee > 0):
+            raise ValueError(f"요금 규정의 단위(분)와 단위요금은 0보다 커야 합니다: {self.unit_minutes}분 / {self.unit_fee}원")
+
+    @property
+    def label(self):
+        text = f"{self.unit_minutes}분당 {self.unit_fee:,}원"
+        return text + (f" (최대 {self.max_fee:,}원)" if self.max_fee else "")
+
+
+DEFAULT_FEE_RULE = FeeRule()
+
+# 업로드 파일 열 이름 (공백 제거 후 비교)
+CHECKOUT_COLUMNS = ["지점명", "좌석/전화번호", "퇴실시각"]
+RULE_COLUMNS = ["지점명", "단위(분)", "단위요금", "최대요금"]
+RESULT_COLUMNS = ["미처리(분)", "미처리시간", "적용규정", "초과요금", "오류"]
+
+
+def overstay_fee(minutes, rule=DEFAULT_FEE_RULE):
+    """미처리 시간(분) → 초과 요금 (단위 미만은 버림)"""
+    fee = (int(minutes) // rule.unit_minutes) * rule.unit_fee
+    return min(fee, rule.max_fee) if rule.max_fee else fee
+
+
+def load_table(source):
+    """CSV/XLSX 경로 또는 파일 객체 → DataFrame (문자열, 열 이름 공백 제거)"""
+    name = getattr(source, "name", source)
+    if str(name).lower().endswith((".xlsx", ".xls")):
+        frame = pd.read_excel(source, dtype=str)
+    else:
+        frame = pd.read_csv(source, dtype=str, encoding="utf-8-sig")
+    frame.columns = frame.columns.str.strip().str.replace(" ", "")
+    return frame
+
+
+def _number(value):
+    """셀 값 → 숫자 (빈 칸/해석 실패는 NaN, 천 단위 쉼표 허용)"""
+    return pd.to_numeric(str("" if pd.isna(value) else value).replace(",", "").strip(), errors="coerce")
+
+
+def load_fee_rules(source):
+    """지점별 규정 파일 (지점명, 단위(분), 단위요금[, 최대요금]) → {지점명: FeeRule}
+
+    단위(분)/단위요금이 비었거나 0 이하인 지점이 있으면 지점명을 넣어 ValueError (지점명이 빈 행은 건너뜀)
+    """
+    frame = load_table(source)
+    missing = [col for col in RULE_COLUMNS[:3] if col not in frame.columns]
+    if missing:
+        raise KeyError(f"요금 규정 파일에 {', '.join(missing)} 열이 없습니다.")
+    rules = {}
+    for row in frame.to_dict("records"):
+        name = "" if pd.isna(row["지점명"]) else str(row["지점명"]).strip()
+        if not name:
+            continue
+        units = {}
+        for column in ("단위(분)", "단위요금"):
+            value = _number(row[column])
+            if pd.isna(value) or value <= 0 or value != int(value):
+                shown = "빈 칸" if pd.isna(row[column]) else f"'{row[column]}'"
+                raise ValueError(f"'{name}' 지점의 {column} 값이 올바르지 않습니다: {shown} (1 이상의 정수)")
+            units[column] = int(value)
+        max_fee = _number(row.get("최대요금"))
+        rules[name] = FeeRule(
+            unit_minutes=units["단위(분)"],
+            unit_fee=units["단위요금"],
+            max_fee=None if pd.isna(max_fee) or max_fee <= 0 else int(max_fee),
+        )
+    return rules
+
+
+def _checkout_times(frame):
+    """퇴실시각 열 (또는 퇴실일자 + 퇴실시간 열) → 서울 시각 Series (해석 실패는 NaT)"""
+    if "퇴실시각" in frame.columns:
+        text = frame["퇴실시각"].astype(str)
+    elif {"퇴실일자", "퇴실시간"} <= set(frame.columns):
+        text = frame["퇴실일자"].astype(str) + " " + frame["퇴실시간"].astype(str)
+    else:
+        raise KeyError("퇴실 기록에 퇴실시각 열(또는 퇴실일자 + 퇴실시간 열)이 없습니다.")
+    text = text.str.strip()
+    # 오프셋이 붙은 값(+09:00, Z 등)은 UTC로 맞춰 해석하고, 오프셋 없는 값은 따로 서울 시각으로 본다
+    # (한 번에 해석하면 오프셋이 섞인 파일에서 실패하거나 object 열이 된다)
+    aware = text.str.contains(r"\d:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:Z|[+-]\d{2}(?::?\d{2})?)$", case=False)
+    times = pd.Series(pd.NaT, index=frame.index, dtype=f"datetime64[ns, {TIMEZONE}]")
+    if aware.any():
+        times[aware] = pd.to_datetime(text[aware], errors="coerce", format="mixed", utc=True).dt.tz_convert(TIMEZONE)
+    if (~aware).any():
+        naive = pd.to_datetime(text[~aware], errors="coerce", format="mixed")
+        times[~aware] = naive.dt.tz_localize(TIMEZONE, ambiguous="NaT", nonexistent="NaT")
+    return times
+
+
+def compute_overstay_fees(frame, now, rules=None, default=DEFAULT_FEE_RULE):
+    """퇴실 기록 DataFrame 전체의 미처리 시간/초과 요금 계산 (원래 열 뒤에 RESULT_COLUMNS를 붙여 반환)
+
+    now: 기준 시각 (tz가 없으면 서울 시각으로 봄), rules: {지점명: FeeRule} (없는 지점은 default)
+    """
+    if "지점명" not in frame.columns:
+        raise KeyError("퇴실 기록에 지점명 열이 없습니다.")
+    now = pd.Timestamp(now)
+    now = now.tz_localize(TIMEZONE) if now.tzinfo is None else now.tz_convert(TIMEZONE)
+
+    checkout = _checkout_times(frame)
+    minutes = ((now - checkout).dt.total_seconds() // 60).to_numpy()  # NaT → nan
+    invalid = np.isnan(minutes)
+    future = ~invalid & (minutes < 0)
+
+    # 규정은 지점마다 한 번만 찾고 행에는 dict 매핑으로 펼친다
+    rules = rules or {}
+    branches = frame["지점명"].astype(str).str.strip()
+    rule_of = {name: rules.get(name, default) for name in branches.unique()}
+    unit_minutes = branches.map({name: r.unit_minutes for name, r in rule_of.items()}).to_numpy(dtype=float)
+    unit_fee = branches.map({name: r.unit_fee for name, r in rule_of.items()}).to_numpy(dtype=float)
+    max_fee = branches.map({name: r.max_fee or np.inf for name, r in rule_of.items()}).to_numpy(dtype=float)
+
+    valid_minutes = np.where(invalid | future, 0, minutes)
+    fee = np.minimum(np.floor_divide(valid_minutes, unit_minutes) * unit_fee, max_fee)
+
+    result = frame.copy()
+    result["미처리(분)"] = np.where(invalid | future, np.nan, minutes)
+    hours, rest = np.divmod(valid_minutes.astype(np.int64), 60)
+    result["미처리시간"] = np.where(
+        invalid | future, "", pd.Series(hours).astype(str).to_numpy() + "시간 " + pd.Series(rest).astype(str).to_numpy() + "분"
+    )
+    result["적용규정"] = branches.map({name: r.label for name, r in rule_of.items()}).to_numpy()
+    result["초과요금"] = np.where(invalid | future, 0, fee).astype(np.int64)
+    result["오류"] = np.where(invalid, "퇴실시각 형식 오류", np.where(future, "퇴실시각이 기준 시각 이후", ""))
+    return result
@@ -0,0 +1,154 @@
+import csv, os, threading
+from collections import Counter
+from datetime import datetime, timezone
+
+
+# ✅ 오프라인 테스트용 가짜 Google Sheets 백엔드
+#    gspread의 Client / Spreadsheet / Worksheet 중 앱에서 사용하는 메서드만 흉내낸다.
+#    FAKE_SHEETS_PATH 환경변수에 CSV 경로를 지정하면 main.py가 실제 시트 대신 사용한다.
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, values, sheet_id=0):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self._values = [list(row) for row in values]
+
+    def get_all_values(self):
+        """전체 값 조회 (읽기 횟수 기록)"""
+        self.spreadsheet.client.calls["get_all_values"] += 1
+        with self.spreadsheet.lock:
+            return [list(row) for row in self._values]
+
+    def update(self, range_name, values=None, **kwargs):
+        """A1 기준 전체 덮어쓰기 (gspread 5.x처럼 값만 넘겨도 동작)"""
+        if values is None:
+            range_name, values = "A1", range_name
+        if range_name != "A1":
+            raise NotImplementedError("FakeWorksheet.update는 'A1' 범위만 지원합니다.")
+        self.spreadsheet.client.calls["update"] += 1
+        with self.spreadsheet.lock:
+            for i, row in enumerate(values):
+                row = [str(v) for v in row]
+                if i < len(self._values):
+                    self._values[i][:len(row)] = row
+                else:
+                    self._values.append(row)
+            self.spreadsheet._touch()
+
+    def clear(self):
+        self.spreadsheet.client.calls["clear"] += 1
+        with self.spreadsheet.lock:
+            self._values = []
+            self.spreadsheet._touch()
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        self.spreadsheet.client.calls["append_rows"] += 1
+        with self.spreadsheet.lock:
+            self._values.extend([str(v) for v in row] for row in values)
+            self.spreadsheet._touch()
+
+    def delete_rows(self, start_index, end_index=None):
+        """1부터 시작하는 행 번호 기준 삭제 (end_index 포함)"""
+        self.spreadsheet.client.calls["delete_rows"] += 1
+        end_index = end_index or start_index
+        with self.spreadsheet.lock:
+            del self._values[start_index - 1:end_index]
+            self.spreadsheet._touch()
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, title, key, worksheets):
+        self.client = client
+        self.title = title
+        self.id = key
+        self.lock = threading.RLock()
+        self.version = 0
+        self.modified_time = datetime.now(timezone.utc).isoformat()
+        self._worksheets = {
+            name: FakeWorksheet(self, name, values, sheet_id=i)
+            for i, (name, values) in enumerate(worksheets.items())
+        }
+
+    def worksheet(self, title):
+        return self._worksheets[title]
+
+    def batch_update(self, body):
+        """spreadsheets.batchUpdate 흉내 (updateCells / appendCells / deleteDimension만 지원)"""
+        self.client.calls["batch_update"] += 1
+        by_id = {ws.id: ws for ws in self._worksheets.values()}
+        with self.lock:
+            for request in body["requests"]:
+                (kind, spec), = request.items()
+                if kind == "updateCells":
+                    ws = by_id[spec["start"]["sheetId"]]
+                    for r, row in enumerate(spec["rows"], start=spec["start"]["rowIndex"]):
+                        while len(ws._values) <= r:
+                            ws._values.append([])
+                        target = ws._values[r]
+                        for c, cell in enumerate(row["values"], start=spec["start"]["columnIndex"]):
+                            target.extend([""] * (c + 1 - len(target)))
+                            target[c] = cell["userEnteredValue"]["stringValue"]
+                elif kind == "appendCells":
+                    ws = by_id[spec["sheetId"]]
+                    ws._values.extend(
+                        [cell["userEnteredValue"]["stringValue"] for cell in row["values"]]
+                        for row in spec["rows"]
+                    )
+                elif kind == "deleteDimension":
+                    rng = spec["range"]
+                    del by_id[rng["sheetId"]]._values[rng["startIndex"]:rng["endIndex"]]
+                else:
+                    raise NotImplementedError(f"FakeSpreadsheet.batch_update: {kind}")
+            self._touch()
+        return {"spreadsheetId": self.id, "replies": [{} for _ in body["requests"]]}
+
+    def get_lastUpdateTime(self):
+        """Drive 메타데이터의 modifiedTime 흉내 (읽기 횟수 기록)"""
+        self.client.calls["get_lastUpdateTime"] += 1
+        return self.modified_time
+
+    def _touch(self):
+        # ✅ 쓰기가 일어날 때마다 수정 시각 갱신 + 파일에 반영
+        self.version += 1
+        self.modified_time = f"{datetime.now(timezone.utc).isoformat()}#{self.version}"
+        self.client._persist(self)
+
+
+class FakeClient:
+    def __init__(self, spreadsheets=None, path=None):
+        self.calls = Counter()  # 메서드별 호출 횟수 (오프라인 테스트에서 API 사용량 확인용)
+        self.path = path
+        self._spreadsheets = {}
+        for title, worksheets in (spreadsheets or {}).items():
+            self._spreadsheets[title] = FakeSpreadsheet(self, title, f"fake-{len(self._spreadsheets)}", worksheets)
+
+    @classmethod
+    def from_csv(cls, path, title="멘토즈 지점 정보", worksheet="시트1"):
+        """CSV 파일 하나를 시트 한 장으로 사용하는 가짜 클라이언트 생성"""
+        values = []
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                values = [row for row in csv.reader(f)]
+        return cls({title: {worksheet: values}}, path=path)
+
+    def open(self, title):
+        self.calls["open"] += 1
+        return self._spreadsheets[title]
+
+    def open_by_key(self, key):
+        self.calls["open_by_key"] += 1
+        for spreadsheet in self._spreadsheets.values():
+            if spreadsheet.id == key:
+                return spreadsheet
+        raise KeyError(key)
+
+    def _persist(self, spreadsheet):
+        # ✅ CSV에서 만든 경우에만 첫 번째 워크시트를 다시 저장
+        if not self.path:
+            return
+        worksheet = next(iter(spreadsheet._worksheets.values()))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(worksheet._values)
+        os.replace(tmp_path, self.path)
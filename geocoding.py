@@ -0,0 +1,201 @@
+import argparse, json, os, threading, time, unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from branch_store import save_snapshot
+from http_client import get_http_client
+
+
+# ✅ 주소 → 좌표 변환 (카카오 로컬 API) + 디스크 캐시
+#    정규화한 주소를 키로 결과를 저장해서 같은 주소는 프로세스가 재시작돼도 다시 조회하지 않는다.
+#    찾지 못한 주소도 저장하되 miss_ttl이 지나면 다시 조회한다 (주소 데이터가 보강될 수 있으므로).
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", os.path.join(".cache", "geocode_cache.json"))
+# 테스트 시 kakao_stub.py 주소로 바꿔서 사용 (예: http://127.0.0.1:8765/v2/local/search/address.json)
+KAKAO_ADDRESS_URL = os.getenv("KAKAO_ADDRESS_URL", "https://dapi.kakao.com/v2/local/search/address.json")
+
+
+def normalize_address(address):
+    """캐시 키용 주소 정규화 (유니코드 NFC, 연속 공백 하나로, 앞뒤 공백 제거)"""
+    if address is None:
+        return ""
+    return " ".join(unicodedata.normalize("NFC", str(address)).split())
+
+
+class GeocodeCache:
+    """정규화된 주소 → {"lat", "lng", "at"} (찾지 못한 주소는 lat/lng가 None)"""
+
+    def __init__(self, path=GEOCODE_CACHE_PATH, miss_ttl=24 * 3600):
+        self.path = path
+        self.miss_ttl = miss_ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, address):
+        """(캐시에 있음 여부, 좌표 또는 None) 반환. 만료된 실패 기록은 없는 것으로 본다"""
+        key = normalize_address(address)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry["lat"] is None:
+            if time.time() - entry["at"] >= self.miss_ttl:
+                return False, None
+            return True, None
+        return True, (entry["lat"], entry["lng"])
+
+    def lookup(self, address):
+        """캐시에 있는 좌표만 반환 (네트워크 호출 없음, 없으면 None)"""
+        return self.get(address)[1]
+
+    def put(self, address, coords, save=True):
+        """조회 결과 기록 (coords가 None이면 '찾지 못함'으로 기록)"""
+        lat, lng = coords if coords else (None, None)
+        with self._lock:
+            self._entries[normalize_address(address)] = {"lat": lat, "lng": lng, "at": time.time()}
+        if save:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            entries = dict(self._entries)
+        save_snapshot(entries, self.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class KakaoGeocoder:
+    """카카오 주소 검색 API로 좌표 조회 (결과는 GeocodeCache에 저장)"""
+
+    def __init__(self, api_key, cache=None, url=KAKAO_ADDRESS_URL, http=None):
+        self.api_key = api_key
+        self.cache = cache if cache is not None else GeocodeCache()
+        self.url = url
+        self.http = http if http is not None else get_http_client()  # 공용 HTTP 클라이언트 (연결 재사용, 재시도)
+
+    def fetch(self, address):
+        """API 직접 호출 (캐시 사용 안 함). 찾지 못하면 None, 통신 오류는 예외 (재시도 후)"""
+        response = self.http.get(
+            "kakao_address", self.url,
+            headers={"Authorization": f"KakaoAK {self.api_key}"}, params={"query": address},
+        )
+        documents = response.json()["documents"]
+        if not documents:
+            return None
+        return float(documents[0]["y"]), float(documents[0]["x"])  # (위도, 경도)
+
+    def geocode(self, address, save=True):
+        """캐시 우선 조회. 통신 오류는 캐시에 남기지 않는다 (다음에 다시 시도)"""
+        if not normalize_address(address):
+            return None
+        cached, coords = self.cache.get(address)
+        if cached:
+            return coords
+        coords = self.fetch(normalize_address(address))
+        self.cache.put(address, coords, save=save)
+        return coords
+
+
+class RateLimiter:
+    """여러 스레드가 공유하는 초당 호출 수 제한 (호출 간격을 1/rate초 이상으로 유지)"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def geocode_all(geocoder, addresses, workers=4, rate=10, progress=None):
+    """모든 주소를 미리 좌표로 변환해 캐시에 저장 (이미 캐시에 있는 주소는 건너뜀)
+
+    workers개의 스레드로 동시에 조회하되 전체 호출은 초당 rate회로 제한한다.
+    progress(완료 수, 전체 수)가 있으면 조회가 끝날 때마다 호출한 스레드에서 부른다. 결과 집계 dict 반환.
+    """
+    unique = {}
+    for address in addresses:
+        key = normalize_address(address)
+        if key and key != "N/A":
+            unique.setdefault(key, address)
+    todo = [key for key in unique if not geocoder.cache.get(key)[0]]
+    stats = {"total": len(unique), "cached": len(unique) - len(todo), "found": 0, "missing": 0, "failed": 0}
+    if not todo:
+        return stats
+
+    limiter = RateLimiter(rate)
+    lock = threading.Lock()
+
+    def work(key):
+        limiter.wait()
+        try:
+            coords = geocoder.fetch(key)
+        except Exception:
+            outcome = "failed"  # 통신 오류는 기록하지 않고 다음 실행 때 다시 시도
+        else:
+            geocoder.cache.put(key, coords, save=False)
+            outcome = "found" if coords else "missing"
+        with lock:
+            stats[outcome] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="geocode") as pool:
+            # progress는 호출한 스레드에서 부른다 (Streamlit 위젯은 화면 스레드에서만 갱신 가능)
+            for done, _ in enumerate(pool.map(work, todo), start=1):
+                if progress is not None:
+                    progress(done, len(todo))
+    finally:
+        geocoder.cache.save()  # 중간에 멈춰도 끝난 결과는 저장
+    return stats
+
+
+def _addresses_from_args(args):
+    from branch_store import build_frame, load_snapshot
+
+    if args.backend == "snapshot":
+        snapshot = load_snapshot(args.path)
+        if snapshot is None:
+            raise SystemExit(f"스냅샷을 읽을 수 없습니다: {args.path}")
+        values = snapshot["values"]
+    else:
+        from storage_backends import create_backend
+        values = create_backend(args.backend, path=args.path).read_values()
+    frame = build_frame(values)
+    return list(frame["주소"]) if "주소" in frame.columns else []
+
+
+def main(argv=None):
+    """CLI: python geocoding.py [--backend snapshot|csv|sqlite] [--path 경로] [--url 주소]"""
+    from branch_store import SNAPSHOT_PATH
+
+    parser = argparse.ArgumentParser(description="전체 지점 주소를 미리 좌표로 변환해 캐시에 저장")
+    parser.add_argument("--backend", choices=["snapshot", "csv", "sqlite"], default="snapshot")
+    parser.add_argument("--path", default=SNAPSHOT_PATH, help="스냅샷 JSON 또는 CSV/SQLite 파일 경로")
+    parser.add_argument("--api-key", default=os.getenv("KAKAO_REST_API_KEY", ""))
+    parser.add_argument("--url", default=KAKAO_ADDRESS_URL)
+    parser.add_argument("--cache", default=GEOCODE_CACHE_PATH)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=10, help="초당 최대 호출 수")
+    args = parser.parse_args(argv)
+
+    geocoder = KakaoGeocoder(args.api_key, GeocodeCache(args.cache), url=args.url)
+    stats = geocode_all(geocoder, _addresses_from_args(args), workers=args.workers, rate=args.rate)
+    print(json.dumps(stats, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import random, threading, time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# ✅ 외부 HTTP 호출 공용 클라이언트
+#    - 프로세스 전체에서 Session 하나를 재사용 (keep-alive 연결 풀, 매번 TLS 핸드셰이크하지 않음)
+#    - 엔드포인트별 타임아웃 (응답이 없다고 화면이 멈추지 않도록)
+#    - 429 / 5xx / 연결 오류는 지수 백오프 + 지터로 재시도 (Retry-After 헤더가 있으면 따름)
+#    - 엔드포인트별 호출 수 / 오류 수 / 재시도 수 / 응답 시간 집계
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+DEFAULT_TIMEOUT = (3.05, 10)  # (연결, 응답) 초
+
+# 엔드포인트 이름 → (연결, 응답) 타임아웃
+ENDPOINT_TIMEOUTS = {
+    "kakao_address": (3.05, 5),
+}
+
+
+class HttpClient:
+    def __init__(self, timeouts=None, retries=3, backoff=0.5, max_backoff=8.0, pool_size=16):
+        self.timeouts = dict(ENDPOINT_TIMEOUTS, **(timeouts or {}))
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def get(self, endpoint, url, **kwargs):
+        return self.request(endpoint, "GET", url, **kwargs)
+
+    def request(self, endpoint, method, url, **kwargs):
+        """endpoint: 타임아웃/집계 구분용 이름. 마지막 시도까지 실패하면 HTTPError/RequestException 발생"""
+        kwargs.setdefault("timeout", self.timeouts.get(endpoint, DEFAULT_TIMEOUT))
+        for attempt in range(self.retries + 1):
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record(endpoint, time.monotonic() - started, error=True)
+                if attempt == self.retries:
+                    raise
+                self._sleep(endpoint, attempt)
+                continue
+
+            retryable = response.status_code in RETRY_STATUS_CODES
+            self._record(endpoint, time.monotonic() - started, error=response.status_code >= 400)
+            if not retryable or attempt == self.retries:
+                response.raise_for_status()  # HTTP 오류 발생 시 예외 처리
+                return response
+            self._sleep(endpoint, attempt, response.headers.get("Retry-After"))
+
+    def _sleep(self, endpoint, attempt, retry_after=None):
+        with self._lock:
+            self._stats[endpoint]["retries"] += 1
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            # 지수 백오프에 지터를 섞어 여러 스레드가 동시에 다시 몰리지 않게 한다
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+        time.sleep(min(delay, self.max_backoff))
+
+    def _record(self, endpoint, elapsed, error=False):
+        with self._lock:
+            stats = self._stats.setdefault(
+                endpoint, {"requests": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            elapsed_ms = elapsed * 1000
+            stats["requests"] += 1
+            stats["errors"] += int(error)
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def stats(self):
+        """엔드포인트별 집계 복사본 (avg_ms 포함)"""
+        with self._lock:
+            return {
+                endpoint: dict(s, avg_ms=s["total_ms"] / s["requests"] if s["requests"] else 0.0)
+                for endpoint, s in self._stats.items()
+            }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """프로세스 전체에서 공유하는 HttpClient"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -0,0 +1,91 @@
+import argparse, hashlib, json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# ✅ 카카오 주소 검색 API 흉내 (오프라인 테스트용)
+#    GET /v2/local/search/address.json?query=주소 → 주소 해시로 만든 서울 근처 고정 좌표
+#    "없는주소"가 들어간 주소는 빈 결과, delay로 응답 지연, fail_every로 N번째 요청마다 429를 흉내낸다.
+#    (fail_status로 429 대신 5xx, retry_after로 실패 응답에 Retry-After 헤더)
+#    사용: python kakao_stub.py --port 8765
+#          KAKAO_ADDRESS_URL=http://127.0.0.1:8765/v2/local/search/address.json streamlit run main.py
+
+ADDRESS_PATH = "/v2/local/search/address.json"
+
+
+def stub_coords(address):
+    """주소마다 항상 같은 좌표 (위도 37.4~37.7, 경도 126.8~127.2)"""
+    digest = hashlib.sha256(address.encode("utf-8")).digest()
+    lat = 37.4 + int.from_bytes(digest[:4], "big") / 2 ** 32 * 0.3
+    lng = 126.8 + int.from_bytes(digest[4:8], "big") / 2 ** 32 * 0.4
+    return round(lat, 7), round(lng, 7)
+
+
+class KakaoStubHandler(BaseHTTPRequestHandler):
+    server_version = "KakaoStub/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != ADDRESS_PATH:
+            return self._send(404, {"errorType": "NotFound"})
+        if not self.headers.get("Authorization", "").startswith("KakaoAK "):
+            return self._send(401, {"errorType": "AccessDeniedError"})
+
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            count = server.request_count
+        if server.delay:
+            time.sleep(server.delay)
+        if server.fail_every and count % server.fail_every == 0:
+            headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else {}
+            return self._send(server.fail_status, {"errorType": "RequestThrottled"}, headers)
+
+        query = parse_qs(url.query).get("query", [""])[0]
+        documents = []
+        if query and "없는주소" not in query:
+            lat, lng = stub_coords(query)
+            documents.append({"address_name": query, "y": str(lat), "x": str(lng)})
+        self._send(200, {"meta": {"total_count": len(documents)}, "documents": documents})
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 로그를 찍지 않음
+
+
+def start_stub(port=0, delay=0.0, fail_every=0, fail_status=429, retry_after=None):
+    """백그라운드 스레드에서 스텁 서버 시작 (port=0이면 빈 포트). (server, 주소 URL) 반환"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), KakaoStubHandler)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.delay = delay
+    server.fail_every = fail_every
+    server.fail_status = fail_status
+    server.retry_after = retry_after
+    threading.Thread(target=server.serve_forever, name="kakao-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}{ADDRESS_PATH}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="카카오 주소 검색 API 스텁 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="응답 지연(초)")
+    parser.add_argument("--fail-every", type=int, default=0, help="N번째 요청마다 429 응답")
+    parser.add_argument("--fail-status", type=int, default=429, help="실패 응답 상태 코드 (예: 503)")
+    parser.add_argument("--retry-after", type=float, default=None, help="실패 응답의 Retry-After(초)")
+    args = parser.parse_args()
+    server, url = start_stub(args.port, args.delay, args.fail_every, args.fail_status, args.retry_after)
+    print(f"Kakao stub listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
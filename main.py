@@ -1,12 +1,32 @@
 import streamlit as st
 from datetime import datetime, timedelta
-import pytz, gspread, random, string, os, json
+import pytz, gspread, random, string, os, json, time
 from google.oauth2.service_account import Credentials
 import pandas as pd
 from streamlit.components.v1 import html  # HTML/JS 사용
 import plotly.express as px
 import folium,requests
 from streamlit_folium import folium_static 
+from branch_store import BranchStore, BranchSync, SPREADSHEET_TITLE, WORKSHEET_TITLE
+from fake_sheets import FakeClient
+from sheets_client import SheetsConnection
+from storage_backends import create_backend
+from geocoding import GeocodeCache, KakaoGeocoder, geocode_all
+from http_client import get_http_client
+from spatial import BranchSpatialIndex, parse_coordinate
+from branch_map import branch_map_html, build_branch_geojson, geojson_bytes, render_overview_map
+from territory import PROJECTED_CRS, TerritoryIndex
+from refund_engine import (
+    CASE_COLUMNS, RefundCase, calculate_refund, calculate_refunds, curve_markers, load_cases, parse_rate, refund_curve,
+)
+import refund_pdf
+from refund_ledger import RefundLedger
+from refund_receipts import iter_receipt_fields, iter_receipt_files, render_receipt, stream_receipts_zip
+from sheet_writes import SheetConflictError, cell_text, diff_frames, empty_ops, is_empty
+from write_queue import SheetWriteQueue
+from checkout_fees import (
+    CHECKOUT_COLUMNS, DEFAULT_FEE_RULE, RULE_COLUMNS, compute_overstay_fees, load_fee_rules, load_table, overstay_fee,
+)
 
 
 # ✅ 페이지 설정
@@ -120,61 +140,157 @@ def authenticate_google_sheets():
         raise Exception(f"🚨 인증 실패: {str(e)}")
 
 
-@st.cache_data(ttl=5)
-def get_real_time_data():
-    try:
-        client = authenticate_google_sheets()
-        spreadsheet = client.open("멘토즈 지점 정보")
-        sheet = spreadsheet.worksheet("시트1")
-        
-        # ✅ 모든 데이터를 텍스트로 가져오기
-        data = sheet.get_all_values()  # 모든 데이터를 텍스트로 가져옴
-        df = pd.DataFrame(data[1:], columns=data[0])  # 첫 번째 행을 컬럼명으로 사용
+# ✅ 프로세스 전체에서 하나만 쓰는 시트 연결 (인증/문서 조회는 최초 1회)
+@st.cache_resource
+def get_sheets_connection():
+    # 오프라인용 가짜 시트 (FAKE_SHEETS_PATH에 CSV 경로 지정 시 사용)
+    fake_path = os.getenv("FAKE_SHEETS_PATH")
+    if fake_path:
+        return SheetsConnection(lambda: FakeClient.from_csv(fake_path), SPREADSHEET_TITLE, WORKSHEET_TITLE)
+
+    # GSPREAD_SPREADSHEET_KEY가 있으면 이름 검색 없이 key로 바로 연다
+    return SheetsConnection(
+        authenticate_google_sheets, SPREADSHEET_TITLE, WORKSHEET_TITLE,
+        key=os.getenv("GSPREAD_SPREADSHEET_KEY")
+    )
+
+
+# ✅ 지점 데이터 저장소 (BRANCH_BACKEND: sheets(기본) / sqlite / csv, 경로는 BRANCH_BACKEND_PATH)
+@st.cache_resource
+def get_storage_backend():
+    kind = os.getenv("BRANCH_BACKEND", "sheets").strip().lower()
+    if kind == "sheets":
+        return create_backend(kind, connection=get_sheets_connection())
+    return create_backend(kind, path=os.getenv("BRANCH_BACKEND_PATH"))
+
+
+# ✅ 프로세스 전체에서 공유하는 지점 스냅샷 (디스크 캐시 + 수정 시각 기반 동기화)
+@st.cache_resource
+def get_branch_sync():
+    # 좌표는 주소 기준 캐시에서만 가져온다 (화면을 그리는 중에는 지오코딩 API를 호출하지 않음)
+    return BranchSync(get_storage_backend(), locate=get_geocode_cache().lookup)
 
-        # ✅ 컬럼명 정규화 (공백 제거 및 대소문자 통일)
-        df.columns = df.columns.str.strip().str.replace(" ", "")
-        
-        # ✅ 필수 컬럼 존재 여부 확인
-        required_columns = ["지점명", "사물함ID", "사물함PWD", "ID", "PWD", 
-                   "지점카카오톡채널", "스터디룸여부", "주차여부", "노트북/프린트"]
-        for col in required_columns:
-            if col not in df.columns:
-                raise KeyError(f"구글 시트에 '{col}' 컬럼이 없습니다. 시트 구조를 확인해주세요.")
-        
-        # ✅ 모든 0 패딩 제거 (사물함ID, 사물함PWD)
-        df["사물함ID"] = df["사물함ID"].astype(str).str.strip()
-        df["사물함PWD"] = df["사물함PWD"].astype(str).str.strip()
 
-        # ✅ ID, PWD 컬럼: 텍스트 형식으로 강제 변환 (앞의 0 유지, 빈 값은 공백 처리)
-        df["ID"] = df["ID"].apply(lambda x: str(x).strip() if x else "")
-        df["PWD"] = df["PWD"].apply(lambda x: str(x).strip() if x else "")
+def warn_duplicate_branch(records, name):
+    """같은 지점명이 여러 행에 있으면 알림 (첫 번째 행 정보를 사용)"""
+    rows = records.duplicate_rows(name)
+    if rows:
+        sheet_rows = ", ".join(str(row + 2) for row in rows)
+        st.warning(f"⚠️ '{name}' 지점명이 시트에 {len(rows)}번 있습니다 (행: {sheet_rows}). 첫 번째 행 정보를 표시합니다.")
 
-        return df
+
+def format_data_age(seconds):
+    """데이터 나이 표시 (예: "12초 전", "3분 전")"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}초 전"
+    if seconds < 3600:
+        return f"{seconds // 60}분 전"
+    return f"{seconds // 3600}시간 전"
+
+
+def get_branch_store():
+    """현재 스냅샷의 공유 BranchStore (DataFrame/지점 레코드/검색 인덱스, 세션마다 복사하지 않음)
+
+    시트 확인은 백그라운드에서 진행되므로 화면은 기다리지 않고 마지막 스냅샷을 바로 보여준다.
+    """
+    try:
+        sync = get_branch_sync()
+        store = sync.store()
+        if sync.last_error is not None:
+            st.warning(f"⚠️ 시트 확인 실패로 저장된 데이터를 표시합니다: {sync.last_error}")
+        age = sync.age()
+        if age is not None:
+            st.caption(f"🕒 데이터 기준 {format_data_age(age)}")
+        return store
 
     except Exception as e:
         st.error(f"📊 데이터 조회 실패: {str(e)}")
-        return pd.DataFrame()  # 빈 데이터프레임 반환
+        return BranchStore.empty()  # 빈 데이터 반환
+
+
+# ✅ PDF 렌더링 워커 풀 (프로세스 전체에서 하나, 처음 쓸 때 워커를 모두 미리 띄움)
+@st.cache_resource
+def get_pdf_renderer():
+    renderer = refund_pdf.PdfRenderer()
+    renderer.warm()
+    return renderer
+
+
+# ✅ 환불 장부 (REFUND_LEDGER_PATH, 계산할 때마다 추가만 함)
+@st.cache_resource
+def get_refund_ledger():
+    return RefundLedger()
+
+
+# ✅ 시트 쓰기 대기열 (백그라운드에서 행 단위로 합쳐 일정 간격으로 batch_update)
+@st.cache_resource
+def get_write_queue():
+    return SheetWriteQueue(get_storage_backend(), get_branch_sync())
+
+
+def submit_sheet_ops(ops, base_revision):
+    """변경 내용을 쓰기 대기열에 넣고 이 세션의 저장 상태 목록에 추가"""
+    ticket = get_write_queue().submit(ops, base_revision)
+    st.session_state.write_tickets.append(ticket)
+    return ticket
+
+
+def render_write_status():
+    """이 세션에서 요청한 저장 작업의 진행 상태 표시"""
+    queue = get_write_queue()
+    still_pending = []
+    for ticket in st.session_state.write_tickets:
+        status, message = queue.status(ticket)
+        if status == "pending":
+            still_pending.append(ticket)
+        elif status == "failed":
+            st.error(f"🚨 저장 실패: {message}")
+        else:
+            st.success("✅ 요청한 변경사항이 시트에 반영되었습니다.")
+    st.session_state.write_tickets = still_pending
+
+    if still_pending:
+        st.info(f"⏳ 저장 대기 중인 요청 {len(still_pending)}건 (전체 대기 변경 {queue.pending_count()}건) - 잠시 후 반영됩니다.")
 
 
 # ✅ 데이터 업데이트 함수
-def update_sheet(new_data):
+def update_sheet(new_data, base, view_index=None):
+    """편집 결과를 편집기를 만든 스냅샷(base: BranchStore)과 비교해 바뀐 셀/추가 행/삭제 행만 쓰기 대기열에 넣음
+
+    base의 revision으로 제출하므로 그 뒤에 시트가 바뀌었으면 대기열이 행 번호를 보정하거나 저장을 거절한다.
+    view_index: 편집기에 표시됐던 행 인덱스 (검색으로 걸러진 경우 나머지 행은 건드리지 않음)
+    """
+    sync = get_branch_sync()
     try:
-        client = authenticate_google_sheets()
-        spreadsheet = client.open("멘토즈 지점 정보")  # Google Sheets 문서 이름
-        sheet = spreadsheet.worksheet("시트1")  # 시트 이름
-
-        # ✅ 헤더 포함 전체 데이터 업데이트
-        sheet.clear()
-        sheet.update(
-            [new_data.columns.tolist()] + 
-            new_data.astype(str).values.tolist()
-        )
-        st.cache_data.clear()  # 캐시 초기화
-        
-    except gspread.exceptions.APIError as e:
-        st.error(f"📤 업데이트 실패: Google API 오류 ({str(e)})")
+        ops = diff_frames(base.frame, new_data, view_index)
+        if is_empty(ops):
+            st.info("ℹ️ 변경된 내용이 없습니다.")
+            return True
+
+        submit_sheet_ops(ops, base.revision)
+        return True
+
+    except SheetConflictError as e:
+        sync.invalidate()
+        st.error(f"📤 업데이트 실패: {str(e)}")
     except Exception as e:
         st.error(f"📤 업데이트 실패: {str(e)}")
+    return False
+
+# ✅ 새 행 추가 함수 (전체를 다시 쓰지 않고 시트 끝에 추가만)
+def append_sheet_rows(rows):
+    sync = get_branch_sync()
+    try:
+        snapshot = sync.current()
+        ops = empty_ops()
+        ops["appends"] = [[cell_text(v) for v in row] for row in rows]
+        submit_sheet_ops(ops, snapshot["revision"])
+        return True
+
+    except Exception as e:
+        st.error(f"📤 추가 실패: {str(e)}")
+    return False
 
 # ✅ 고유한 ID 생성 함수
 def generate_random_id():
@@ -190,24 +306,39 @@ if "can_edit" not in st.session_state:
 if "edited_data" not in st.session_state:
     st.session_state.edited_data = None
 
-if "new_row" not in st.session_state:
-    st.session_state.new_row = {}
+if "edit_base" not in st.session_state:
+    st.session_state.edit_base = None  # 수정 모드의 편집기를 만든 BranchStore (편집 중 백그라운드 갱신과 무관하게 고정)
 
 if "show_add_form" not in st.session_state:
     st.session_state.show_add_form = False
 
+if "write_tickets" not in st.session_state:
+    st.session_state.write_tickets = []  # 쓰기 대기열에 넣은 저장 요청 번호
+
 # ✅ Streamlit UI 시작
 def load_and_display_spreadsheet_data():
     st.title("📊 스프레드시트 데이터 관리")
+    render_write_status()
+
+    # ✅ 실시간 데이터 가져오기 (공유 스토어, 복사 없음)
+    store = get_branch_store()
+    df = store.frame
 
-    # ✅ 실시간 데이터 가져오기``
-    df = get_real_time_data()
+    # ✅ 수정 모드는 편집을 시작한 스냅샷으로 고정 (편집 도중 스토어가 바뀌어도 같은 행/같은 revision 기준으로 저장)
+    view_store = store
+    if st.session_state.can_edit:
+        if st.session_state.edit_base is None:
+            st.session_state.edit_base = store
+        view_store = st.session_state.edit_base
+        if view_store is not store:
+            st.info("ℹ️ 편집을 시작한 뒤 시트가 갱신되었습니다. 저장하면 편집을 시작한 시점 기준으로 반영하고, 그 사이 변경과 겹치면 거절됩니다.")
 
     # ✅ 지점명 검색 필드 추가
-    branch_name = st.text_input("🔍 지점명 입력 후 엔터 (예시: '부산연산점' -> '연산')", key=f"branch_search_{st.session_state.random_id}")
+    branch_name = st.text_input("🔍 지점명 입력 후 엔터 (예시: '부산연산점' -> '연산', 초성 'ㅂㅅㅇㅅ')", key=f"branch_search_{st.session_state.random_id}")
 
-    # ✅ 검색된 지점명에 맞춰 데이터 필터링
-    filtered_df = df[df["지점명"].str.contains(branch_name, case=False, na=False)] if branch_name else df
+    # ✅ 검색된 지점명에 맞춰 데이터 필터링 (초성 검색 지원)
+    view_df = view_store.frame
+    filtered_df = view_df.iloc[view_store.search_index.search_rows(branch_name)] if branch_name else view_df
 
     # ✅ Streamlit 데이터 표시 (읽기 전용)
     st.subheader("📊 지점 데이터 확인")
@@ -219,7 +350,7 @@ def load_and_display_spreadsheet_data():
             use_container_width=True, 
             key=f"editor_{st.session_state.random_id}"
         )
-        st.session_state.edited_data = edited_df.values.tolist()  # ✅ 수정된 데이터 저장
+        st.session_state.edited_data = edited_df  # ✅ 수정된 데이터 저장 (인덱스로 원래 행을 찾음)
     else:
         # ✅ 수정 불가능한 상태에서 표가 꽉 차도록 유지
         st.dataframe(filtered_df, use_container_width=True)
@@ -235,58 +366,35 @@ def load_and_display_spreadsheet_data():
     # ✅ 입력창 표시
     if st.session_state.show_add_form:
         with st.expander("📝 새 지점 정보 추가", expanded=True):
-            new_row = {}
-            for col in df.columns:
-                # ✅ '마스터키 PWD'는 문자열로만 입력받기
-                if col == "마스터키 PWD":
-                    new_row[col] = st.text_input(
-                        f"{col} 입력",
-                        value=st.session_state.new_row.get(col, ""),  # 기존 입력값 유지
-                        key=f"new_{col}_{st.session_state.random_id}"
-                    )
-                else:
-                    # 다른 열의 데이터 타입에 맞게 처리
-                    if df[col].dtype == "int64":
-                        new_row[col] = st.number_input(
-                            f"{col} 입력",
-                            value=st.session_state.new_row.get(col, 0),  # 기존 입력값 유지
-                            key=f"new_{col}_{st.session_state.random_id}"
-                        )
-                    elif df[col].dtype == "float64":
-                        new_row[col] = st.number_input(
-                            f"{col} 입력",
-                            value=st.session_state.new_row.get(col, 0.0),  # 기존 입력값 유지
-                            key=f"new_{col}_{st.session_state.random_id}",
-                            format="%.2f"
-                        )
-                    else:
-                        new_row[col] = st.text_input(
-                            f"{col} 입력",
-                            value=st.session_state.new_row.get(col, ""),  # 기존 입력값 유지
-                            key=f"new_{col}_{st.session_state.random_id}"
-                        )
-            
-            # ✅ 입력값을 세션 상태에 저장
-            st.session_state.new_row = new_row
-
-            if st.button("✅ 새 데이터 추가", key=f"add_data_{st.session_state.random_id}"):
+            # ✅ 여러 지점을 한 번에 입력 (모든 칸은 문자열로 입력받아 앞의 0 유지)
+            with st.form(key=f"add_form_{st.session_state.random_id}"):
+                new_rows_df = st.data_editor(
+                    pd.DataFrame({col: pd.Series(dtype="object") for col in df.columns}),
+                    num_rows="dynamic",
+                    use_container_width=True,
+                    column_config={col: st.column_config.TextColumn(col) for col in df.columns},
+                    key=f"new_rows_{st.session_state.random_id}"
+                )
+                submitted = st.form_submit_button("✅ 새 데이터 추가")
+
+            if submitted:
                 try:
+                    new_rows = [
+                        [cell_text(value).strip() for value in row]
+                        for row in new_rows_df.itertuples(index=False)
+                    ]
+                    new_rows = [row for row in new_rows if any(row)]  # 완전히 빈 행은 무시
+
                     # ✅ 필수 필드 검증
-                    if any(value == "" or value is None for value in new_row.values()):
+                    if not new_rows:
+                        st.error("🚨 추가할 데이터를 입력해주세요!")
+                    elif any(value == "" for row in new_rows for value in row):
                         st.error("🚨 모든 필드를 입력해야 합니다!")
-                    else:
-                        # ✅ '마스터키 PWD'를 문자열로 강제 변환
-                        new_row["마스터키 PWD"] = str(new_row["마스터키 PWD"])
-                        
-                        # ✅ DataFrame에 새로운 행 추가
-                        new_df = pd.DataFrame([new_row])
-                        updated_df = pd.concat([df, new_df], ignore_index=True)
-                        update_sheet(updated_df)  # 데이터 업데이트 함수 호출
-                        st.success("✅ 데이터가 성공적으로 추가되었습니다!")
+                    elif append_sheet_rows(new_rows):  # 새 행만 시트 끝에 추가
+                        st.success(f"✅ {len(new_rows)}개 데이터 추가를 요청했습니다!")
                         
                         # ✅ 입력창 초기화
                         st.session_state.show_add_form = False
-                        st.session_state.new_row = {}
                         st.rerun()
                 except Exception as e:
                     st.error(f"🚨 에러 발생: {str(e)}")
@@ -295,17 +403,19 @@ def load_and_display_spreadsheet_data():
     with button_col2:
         if st.button("✏️ 수정하기", key=f"edit_button_{st.session_state.random_id}"):
             st.session_state.can_edit = True  # ✅ 수정 모드 활성화
+            st.session_state.edit_base = store  # 지금 보고 있는 스냅샷에서 편집 시작
 
     # ✅ 모든 변경사항 저장 버튼
     with button_col3:
         if st.button("💾 모든 변경사항 저장", key=f"save_button_{st.session_state.random_id}"):
             try:
                 if st.session_state.can_edit and st.session_state.edited_data is not None:
-                    edited_df = pd.DataFrame(st.session_state.edited_data, columns=df.columns)
-                    update_sheet(edited_df)  # ✅ 수정된 데이터 반영
-                    st.success("✅ 변경사항이 저장되었습니다! 새로고침 없이 즉시 반영됩니다.")
-                    st.session_state.can_edit = False
-                    st.session_state.edited_data = None
+                    # ✅ 바뀐 셀만 반영 (검색으로 보이지 않던 행은 그대로 유지)
+                    if update_sheet(st.session_state.edited_data, view_store, view_index=filtered_df.index):
+                        st.success("✅ 변경사항 저장을 요청했습니다! 잠시 후 시트에 반영됩니다.")
+                        st.session_state.can_edit = False
+                        st.session_state.edited_data = None
+                        st.session_state.edit_base = None
                 else:
                     st.warning("⚠️ 수정된 데이터가 없습니다.")
             except Exception as e:
@@ -313,35 +423,82 @@ def load_and_display_spreadsheet_data():
 
     # ✅ 데이터 삭제 기능
     with st.expander("⚠️ 데이터 삭제"):
-        row_num = st.number_input("삭제할 행 번호", min_value=2, max_value=len(df)+1, key=f"delete_row_{st.session_state.random_id}")
-        if st.button("🗑️ 선택한 행 삭제", key=f"delete_button_{st.session_state.random_id}"):
+        if df.empty:  # 헤더만 있는 새 저장소 (삭제할 행이 없으면 number_input 범위가 만들어지지 않음)
+            st.info("삭제할 데이터가 없습니다.")
+        else:
+            # 행 번호는 직전 실행에서 보여준 표 기준 → 그 표의 revision으로 제출 (그 뒤 갱신됐으면 대기열이 보정하거나 거절)
+            shown_revision = st.session_state.get("delete_base_revision", store.revision)
+            st.session_state.delete_base_revision = store.revision
+            row_num = st.number_input("삭제할 행 번호", min_value=2, max_value=len(df)+1, key=f"delete_row_{st.session_state.random_id}")
+            if st.button("🗑️ 선택한 행 삭제", key=f"delete_button_{st.session_state.random_id}"):
+                try:
+                    ops = empty_ops()
+                    ops["deletes"] = [int(row_num)]
+                    submit_sheet_ops(ops, shown_revision)  # ✅ 쓰기 대기열로 삭제
+                    st.success(f"✅ {row_num}번 행 삭제를 요청했습니다!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"🚨 삭제 실패: {e}")
+
+    # ✅ 환불 정책 해석 실패 (스냅샷을 불러올 때 한 번 확인한 결과)
+    if store.policies.issues:
+        with st.expander(f"⚠️ 환불 정책 확인 필요 ({len(store.policies.issues)}건)"):
+            st.caption("시간권금액/기간권금액/환불기간 값을 해석하지 못한 지점입니다. 해당 값은 비어 있는 것으로 계산됩니다.")
+            st.dataframe(store.policies.issues_frame(), use_container_width=True, hide_index=True)
+
+    # ✅ 전체 지점 좌표 미리 변환 (지도/거리 기능이 화면을 그리는 중에 API를 호출하지 않도록)
+    with st.expander("📍 지점 좌표 관리"):
+        located = int(store.locations["위도"].notna().sum())
+        st.caption(f"좌표가 있는 지점: {located} / {len(store.locations)}")
+        kakao_stats = get_http_client().stats().get("kakao_address")
+        if kakao_stats:
+            st.caption(
+                f"카카오 주소 API: 호출 {kakao_stats['requests']}회, 평균 {kakao_stats['avg_ms']:.0f}ms, "
+                f"최대 {kakao_stats['max_ms']:.0f}ms, 재시도 {kakao_stats['retries']}회, 오류 {kakao_stats['errors']}회"
+            )
+        if st.button("📍 전체 지점 좌표 변환", key=f"geocode_button_{st.session_state.random_id}"):
             try:
-                client = authenticate_google_sheets()
-                spreadsheet = client.open("멘토즈 지점 정보")
-                sheet = spreadsheet.worksheet("시트1")
-                sheet.delete_rows(row_num)
-                st.cache_data.clear()  # ✅ 캐시 초기화
-                st.success(f"✅ {row_num}번 행이 삭제되었습니다!")
-                st.rerun()
+                pregeocode_branches()
             except Exception as e:
-                st.error(f"🚨 삭제 실패: {e}")
+                st.error(f"🚨 좌표 변환 실패: {e}")
 
 # ✅ Google Sheets 인증 함수 (end)
 
+# ✅ 좌표 캐시 (주소 기준, 디스크에 보관)
+@st.cache_resource
+def get_geocode_cache():
+    return GeocodeCache()
+
+# ✅ 주소 → 좌표 변환기 (디스크 캐시 공유, 같은 주소는 한 번만 조회)
+@st.cache_resource
+def get_geocoder():
+    return KakaoGeocoder(st.secrets['KAKAO']['REST_API_KEY'], get_geocode_cache())
+
+
+def pregeocode_branches():
+    """전체 지점 주소를 미리 좌표로 변환 (이미 변환된 주소는 건너뜀) 후 지점 데이터에 반영"""
+    store = get_branch_store()
+    if "주소" not in store.frame.columns:
+        st.warning("⚠️ 주소 정보가 없습니다.")
+        return
+    progress = st.progress(0.0, text="📍 좌표 변환 중...")
+    stats = geocode_all(
+        get_geocoder(), store.frame["주소"],
+        progress=lambda done, total: progress.progress(done / total, text=f"📍 좌표 변환 중... ({done}/{total})"),
+    )
+    progress.empty()
+    get_branch_sync().refresh_locations()
+    st.success(
+        f"✅ 좌표 변환 완료: 주소 {stats['total']}개 중 기존 {stats['cached']}개, 새로 변환 {stats['found']}개, "
+        f"찾지 못함 {stats['missing']}개, 실패 {stats['failed']}개"
+    )
+
+
 def get_address_coordinates(address):
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
-    headers = {"Authorization": f"KakaoAK {st.secrets['KAKAO']['REST_API_KEY']}"}
-    params = {"query": address}
-    
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()  # HTTP 오류 발생 시 예외 처리
-        result = response.json()
-        
-        if result["documents"]:
-            y = result["documents"][0]["y"]  # 위도
-            x = result["documents"][0]["x"]  # 경도
-            return y, x
+        coords = get_geocoder().geocode(address)
+        if coords:
+            return coords  # (위도, 경도)
         else:
             st.error("⚠️ 해당 주소를 찾을 수 없습니다.")
             return None, None
@@ -351,9 +508,34 @@ def get_address_coordinates(address):
 
 # ✅ 지점 정보 확인 페이지
 
+# ✅ 지점 정보 화면의 버튼은 fragment로 분리
+#    버튼을 눌러도 그 부분만 다시 실행되므로 아래 지도 iframe(카카오 SDK 로딩)과 나머지 화면을 다시 보내지 않는다
+@st.fragment
+def link_button(label, url, key):
+    if st.button(label, key=key):
+        open_link_in_new_tab(url)
+
+
+@st.fragment
+def channel_message_button(selected_branch, channel_info):
+    if st.button("📩 지점채널 안내문 생성", key="generate_channel_message"):
+        message = f"""
+        안녕하세요, 멘토즈스터디카페 운영본부입니다.
+        유선상 전달드린 카카오톡 지점 채널 안내드립니다.
+
+        {channel_info}
+        ▶ 카카오톡 지점 채널 [ 멘토즈 {selected_branch} ]
+
+        ※ 상담 가능 시간 이외라도 긴급 건의 경우 점주님이 확인 후 답변 주시고 있으며, 
+        전화 문의는 불가한 점 양해 부탁드립니다.
+        """
+        st.code(message)
+
+
 def branch_info_page():
     st.title("🏢 지점 정보 확인")
-    df = get_real_time_data()
+    store = get_branch_store()
+    df = store.frame
     
     required_columns = ["지점명", "사물함ID", "사물함PWD", "ID", "PWD", 
                         "지점카카오톡채널", "스터디룸여부", "특이사항", "주차여부", "노트북/프린트", "주소"]
@@ -363,27 +545,26 @@ def branch_info_page():
             return
 
     # 지점명 검색 입력
-    search_term = st.text_input("🔍 지점명 검색 (예시: '부산연산점' -> '연산')", key="branch_info_search")
+    search_term = st.text_input("🔍 지점명 검색 (예시: '부산연산점' -> '연산', 초성 'ㅂㅅㅇㅅ')", key="branch_info_search")
     
-    if search_term:
-        filtered = df[df["지점명"].str.contains(search_term, case=False, na=False)]
-        filtered = filtered.drop_duplicates(subset=["지점명"])
-    else:
-        filtered = pd.DataFrame()
+    # ✅ 공유 검색 인덱스 사용 (중복 지점명은 인덱스에서 한 번만 나옴)
+    branch_names = store.search_index.search(search_term) if search_term else []
 
-    if not filtered.empty:
-        branch_names = filtered["지점명"].tolist()
+    if branch_names:
         selected_branch = st.selectbox("지점 선택", branch_names, key="branch_select")
         
-        branch_data = filtered[filtered["지점명"] == selected_branch].iloc[0]
-        id_val = str(branch_data["ID"]).strip()
-        pw_val = str(branch_data["PWD"]).strip()
-        channel_info = str(branch_data.get("지점카카오톡채널", "N/A")).strip()
-        special_notes = str(branch_data.get("특이사항", "")).strip()
-        parking = str(branch_data.get("주차여부", "N/A")).strip()
-        laptop_printer = str(branch_data.get("노트북/프린트", "N/A")).strip()
-        address = str(branch_data.get("주소", "N/A")).strip()
-        study_room = str(branch_data.get("스터디룸여부", "N/A")).strip()
+        # ✅ 미리 정규화된 지점 레코드를 바로 조회
+        records = store.records
+        warn_duplicate_branch(records, selected_branch)
+        record = records.get(selected_branch)
+        id_val = record.login_id
+        pw_val = record.login_pwd
+        channel_info = record.channel
+        special_notes = record.special_notes
+        parking = record.parking
+        laptop_printer = record.laptop_printer
+        address = record.address
+        study_room = record.study_room
 
         # 상단 2단 레이아웃
         col1, col2 = st.columns(2)
@@ -423,13 +604,11 @@ def branch_info_page():
                     st.markdown("👉 비밀번호 옆 👁️‍🗨️ 선택하고 `Ctrl+C`로 복사하세요.")
 
                     # "제로아이즈 관리자 홈페이지" 버튼 추가
-                    if st.button("🖥️ 제로아이즈 관리자 홈페이지", key="open_zeroeyes_admin"):
-                        open_link_in_new_tab("https://mentors.mooin.kr/login")  # 실제 URL로 변경 필요
+                    link_button("🖥️ 제로아이즈 관리자 홈페이지", "https://mentors.mooin.kr/login", "open_zeroeyes_admin")  # 실제 URL로 변경 필요
 
                 else:
                     st.warning("컴앤패스 관리자앱을 이용해주세요")
-                    if st.button("🖥️ 관리자앱 열기", key="open_admin_app"):
-                        open_link_in_new_tab("https://mg.smonster.kr/")
+                    link_button("🖥️ 관리자앱 열기", "https://mg.smonster.kr/", "open_admin_app")
 
         # 오른쪽: 부가 정보
         with col2:
@@ -441,18 +620,7 @@ def branch_info_page():
                     st.write(f"카카오톡 채널: {channel_info}")
                     
                     # ✅ 지점채널 안내문 생성 버튼 추가
-                    if st.button("📩 지점채널 안내문 생성", key="generate_channel_message"):
-                        message = f"""
-                        안녕하세요, 멘토즈스터디카페 운영본부입니다.
-                        유선상 전달드린 카카오톡 지점 채널 안내드립니다.
-
-                        {channel_info}
-                        ▶ 카카오톡 지점 채널 [ 멘토즈 {selected_branch} ]
-
-                        ※ 상담 가능 시간 이외라도 긴급 건의 경우 점주님이 확인 후 답변 주시고 있으며, 
-                        전화 문의는 불가한 점 양해 부탁드립니다.
-                        """
-                        st.code(message)
+                    channel_message_button(selected_branch, channel_info)
                 else:
                     st.warning("지점 채널 정보가 없습니다.")
     
@@ -485,7 +653,6 @@ def branch_info_page():
                 """, unsafe_allow_html=True)
             
             # ✅ 스터디룸 정보
-            study_room = str(branch_data.get("스터디룸여부", "N/A")).strip()
             with st.expander("📚 스터디룸 여부", expanded=True):
                 st.write(f"{study_room}")
 
@@ -535,53 +702,15 @@ def branch_info_page():
 
         # ✅ REST API를 사용하여 주소를 좌표로 변환
         if address != "N/A":
-            y, x = get_address_coordinates(address)
+            if record.latitude is not None:
+                y, x = record.latitude, record.longitude  # 미리 변환해 둔 좌표
+            else:
+                y, x = get_address_coordinates(address)
             if y and x:
-                # ✅ 지도 표시 (Material Design 스타일 적용)
-                map_html = f"""
-                <meta http-equiv="Content-Security-Policy" content="upgrade-insecure-requests">
-                <div id="map" style="width:100%;height:400px;border-radius:12px;margin:0 auto;box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);"></div>
-                <script type="text/javascript" src="//dapi.kakao.com/v2/maps/sdk.js?appkey={st.secrets['KAKAO']['MAP_API_KEY']}&libraries=services"></script>
-                <script>
-                    var mapContainer = document.getElementById('map');
-                    var mapOption = {{
-                        center: new kakao.maps.LatLng({y}, {x}), // 변환된 좌표 사용
-                        level: 3
-                    }};
-                    var map = new kakao.maps.Map(mapContainer, mapOption);
-
-                    // 마커 생성
-                    var marker = new kakao.maps.Marker({{
-                        map: map,
-                        position: new kakao.maps.LatLng({y}, {x})
-                    }});
-
-                    // 인포윈도우 생성
-                    var infowindow = new kakao.maps.InfoWindow({{
-                        content: '<div style="padding:10px;font-size:14px;background-color:#ffffff;border-radius:8px;box-shadow: 0 2px 6px rgba(0,0,0,0.1);">{selected_branch}</div>'
-                    }});
-                    infowindow.open(map, marker);
-
-                    // 지도 컨트롤 스타일 변경
-                    var zoomControl = new kakao.maps.ZoomControl();
-                    map.addControl(zoomControl, kakao.maps.ControlPosition.RIGHT);
-
-                    // 지도 스타일 커스텀
-                    map.setOptions({{
-                        mapTypeControl: true,
-                        mapTypeId: kakao.maps.MapTypeId.ROADMAP,
-                        zoomControl: true,
-                        zoomControlOptions: {{
-                            position: kakao.maps.ControlPosition.RIGHT
-                        }},
-                        scaleControl: true,
-                        streetViewControl: false,
-                        rotateControl: false,
-                        fullscreenControl: false,
-                        keyboardShortcuts: false
-                    }});
-                </script>
-                """
+                # ✅ 지도 표시 (지점/좌표마다 한 번만 만든 HTML 재사용, SDK를 못 쓰면 folium 지도)
+                map_html = branch_map_html(
+                    selected_branch, float(y), float(x), st.secrets['KAKAO'].get('MAP_API_KEY')
+                )
                 st.components.v1.html(map_html, height=420)
             else:
                 st.error("⚠️ 주소를 좌표로 변환할 수 없습니다.")
@@ -591,6 +720,120 @@ def branch_info_page():
 
         
 
+# ✅ 가까운 지점 찾기용 공간 인덱스 (프로세스 전체 공유, 좌표가 바뀐 지점만 갱신)
+@st.cache_resource
+def get_spatial_index():
+    return BranchSpatialIndex()
+
+
+def get_branch_spatial_index(store):
+    index = get_spatial_index()
+    index.sync(store.locations)  # 같은 스냅샷이면 바로 반환
+    return index
+
+
+# ✅ 가까운 지점 찾기 페이지
+def nearest_branch_page():
+    st.title("📍 가까운 지점 찾기")
+    store = get_branch_store()
+    index = get_branch_spatial_index(store)
+    if len(index) == 0:
+        st.warning("⚠️ 좌표가 있는 지점이 없습니다. '전체 지점 리스트 > 지점 좌표 관리'에서 좌표를 먼저 변환해주세요.")
+        return
+    st.caption(f"좌표가 있는 지점 {len(index)}개 기준")
+
+    query = st.text_input("🔍 고객 주소 또는 좌표 입력 (예시: '서울 강남구 테헤란로 152' 또는 '37.5, 127.03')", key="nearest_query")
+    k = st.slider("표시할 지점 수", min_value=1, max_value=20, value=5, key="nearest_k")
+    if not query:
+        return
+
+    coords = parse_coordinate(query)
+    if coords is None:
+        lat, lng = get_address_coordinates(query)
+        if lat is None:
+            return
+        coords = (lat, lng)
+
+    results = index.nearest(coords[0], coords[1], k)
+    st.dataframe(
+        pd.DataFrame(
+            [(name, address, round(distance, 2)) for name, address, distance in results],
+            columns=["지점명", "주소", "거리(km)"],
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+# ✅ 전체 지점 지도 (GeoJSON/HTML은 스냅샷 버전마다 한 번만 생성)
+@st.cache_data(max_entries=4)
+def build_overview_map(version, _locations):
+    geojson = build_branch_geojson(_locations)
+    return geojson, render_overview_map(geojson)
+
+
+def overview_map_page():
+    st.title("🗺️ 전체 지점 지도")
+    store = get_branch_store()
+    geojson, map_html = build_overview_map(store.version, store.locations)
+
+    located = len(geojson["features"])
+    if located == 0:
+        st.warning("⚠️ 좌표가 있는 지점이 없습니다. '전체 지점 리스트 > 지점 좌표 관리'에서 좌표를 먼저 변환해주세요.")
+        return
+    missing = store.locations["지점명"].nunique() - located
+    st.caption(f"지점 {located}개 표시" + (f" (좌표 없는 지점 {missing}개 제외)" if missing > 0 else ""))
+
+    html(map_html, height=620)
+    st.download_button(
+        "⬇️ GeoJSON 다운로드", geojson_bytes(geojson),
+        file_name="branches.geojson", mime="application/geo+json", key="overview_geojson",
+    )
+
+
+# ✅ 상권 중복 분석 (상권 원/STRtree는 스냅샷 버전 + 반경마다 한 번만 생성)
+@st.cache_resource(max_entries=4)
+def build_territory_index(version, radius_m, _locations):
+    return TerritoryIndex(_locations, radius_m)
+
+
+def territory_overlap_page():
+    st.title("🧭 상권 중복 분석")
+    store = get_branch_store()
+    radius_m = st.number_input("상권 반경 (m)", min_value=50, max_value=5000, value=500, step=50, key="territory_radius")
+    territories = build_territory_index(store.version, int(radius_m), store.locations)
+    if len(territories) == 0:
+        st.warning("⚠️ 좌표가 있는 지점이 없습니다. '전체 지점 리스트 > 지점 좌표 관리'에서 좌표를 먼저 변환해주세요.")
+        return
+    st.caption(f"좌표가 있는 지점 {len(territories)}개 기준 (투영 좌표계 {PROJECTED_CRS})")
+
+    tab_candidate, tab_pairs = st.tabs(["📌 후보지 검토", "🔁 기존 지점 간 중복"])
+    with tab_candidate:
+        query = st.text_input("🔍 후보지 주소 또는 좌표 (예시: '37.5, 127.03')", key="territory_query")
+        if query:
+            coords = parse_coordinate(query)
+            if coords is None:
+                lat, lng = get_address_coordinates(query)
+                coords = (lat, lng) if lat is not None else None
+            if coords is not None:
+                overlaps = territories.candidate_overlaps(*coords)
+                if overlaps:
+                    st.warning(f"⚠️ 기존 지점 {len(overlaps)}곳의 상권과 겹칩니다.")
+                    st.dataframe(pd.DataFrame(overlaps), use_container_width=True, hide_index=True)
+                else:
+                    st.success("✅ 겹치는 기존 지점 상권이 없습니다.")
+
+    with tab_pairs:
+        started = time.perf_counter()
+        pairs = territories.pairwise_overlaps()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        st.caption(f"전체 쌍 검사 {elapsed_ms:.0f}ms")
+        if pairs:
+            st.dataframe(pd.DataFrame(pairs), use_container_width=True, hide_index=True)
+        else:
+            st.success("✅ 서로 겹치는 지점 상권이 없습니다.")
+
+
 # ✅ 새 탭에서 링크 열기 함수 (JavaScript 사용)
 def open_link_in_new_tab(url):
     # JavaScript 실행 방식 개선
@@ -710,39 +953,36 @@ def home_page():
 
 def locker_masterkey_page():
     st.title("🔑 사물함 마스터키 안내")
-    df = get_real_time_data()
+    store = get_branch_store()
     
     # ✅ 지점 검색 로직
-    search_term = st.text_input("🔍 지점명 검색 (예시: '부산연산점' -> '연산')", key="branch_search")
+    search_term = st.text_input("🔍 지점명 검색 (예시: '부산연산점' -> '연산', 초성 'ㅂㅅㅇㅅ')", key="branch_search")
     
-    # ✅ 검색 결과 필터링
-    if search_term:
-        # 검색어가 있는 경우, 필터링된 결과를 DataFrame으로 유지
-        filtered_branches = df[df["지점명"].str.contains(search_term, case=False, na=False)]
-    else:
-        # 검색어가 없는 경우, 빈 DataFrame 반환
-        filtered_branches = pd.DataFrame(columns=df.columns)
+    # ✅ 검색 결과 필터링 (공유 검색 인덱스, 일치도 순 정렬)
+    filtered_branches = store.search_index.search(search_term) if search_term else []
     
     # ✅ 검색 결과가 없는 경우 처리
-    if search_term and filtered_branches.empty:
+    if search_term and not filtered_branches:
         st.warning("⚠️ 일치하는 지점이 없습니다.")
         return
     
     # ✅ 지점 선택 드롭다운
-    if not filtered_branches.empty:
-        selected_branch = st.selectbox("지점 선택", filtered_branches["지점명"].unique())
+    if filtered_branches:
+        selected_branch = st.selectbox("지점 선택", filtered_branches)
     else:
         selected_branch = None
     
     # ✅ 선택된 지점 정보 표시
     if selected_branch:
-        branch_data = df[df["지점명"] == selected_branch].iloc[0]
-        locker_number = str(branch_data["사물함ID"]).strip()
-        locker_password = str(branch_data["사물함PWD"]).strip()
-        special_notes = branch_data.get("특이사항", "")  # 특이사항 컬럼 값 가져오기
+        records = store.records
+        warn_duplicate_branch(records, selected_branch)
+        record = records.get(selected_branch)
+        locker_number = record.locker_id
+        locker_password = record.locker_pwd
+        special_notes = record.special_notes  # 특이사항 컬럼 값 가져오기
         
         # ✅ 특이사항 팝업 (항상 표시)
-        if special_notes and pd.notna(special_notes) and special_notes != "":
+        if special_notes:
             with st.expander("🚨 특이사항 알림", expanded=True):
                 st.write(special_notes)
         
@@ -778,30 +1018,19 @@ def locker_masterkey_page():
         # ✅ 안내문 출력
         st.text_area("📌 마스터키 안내", info_text, height=400)
 
-def convert_currency(currency_str):
-    """통화 형식 문자열을 숫자로 변환 (예: '10,000원' → 10000)"""
-    if not currency_str:
-        return 0
-    # 숫자와 쉼표만 추출
-    cleaned = ''.join(filter(str.isdigit, currency_str))
-    return int(cleaned) if cleaned else 0
-
 def refund_calculator_page():
     st.title("💰 이용권 환불 계산")
+    if refund_pdf.available():
+        get_pdf_renderer()  # 화면에 들어올 때 워커를 띄워 두면 계산/계좌 입력 동안 폰트 로딩이 끝난다
     
-    # Google Sheets에서 데이터 가져오기
-    df = get_real_time_data()
+    # Google Sheets에서 데이터 가져오기 (공유 스토어)
+    store = get_branch_store()
     
-    # 지점명 목록
-    branch_list = df["지점명"].dropna().unique().tolist()
-
     # 지점명 검색 기능 (자동완성)
-    search_term = st.text_input("🔍 지점명 입력 후 엔터 (예시: '부산연산점' -> '연산')", key="branch_search_refund")
+    search_term = st.text_input("🔍 지점명 입력 후 엔터 (예시: '부산연산점' -> '연산', 초성 'ㅂㅅㅇㅅ')", key="branch_search_refund")
     
-    # 검색어 기반 지점명 필터링
-    filtered_branches = []
-    if search_term:
-        filtered_branches = [branch for branch in branch_list if search_term.lower() in branch.lower()]
+    # 검색어 기반 지점명 필터링 (공유 검색 인덱스)
+    filtered_branches = store.search_index.search(search_term) if search_term else []
     
     # 지점명 선택 (드롭다운)
     selected_branch = None
@@ -812,14 +1041,22 @@ def refund_calculator_page():
 
     # 선택된 지점의 추가 정보 조회
     if selected_branch:
-        branch_data = df[df["지점명"] == selected_branch].iloc[0]
+        records = store.records
+        warn_duplicate_branch(records, selected_branch)
+        branch_record = records.get(selected_branch)
+        branch_policy = store.policies.get(selected_branch)  # 스냅샷마다 한 번 해석해 둔 정책
         
         # 환불 정책 팝업
         with st.expander("📌 해당 지점 환불 정책", expanded=True):
             cols = st.columns(3)
-            cols[0].metric("환불기간", branch_data.get("환불기간", "미입력"))
-            cols[1].metric("환불응대금지", branch_data.get("환불응대금지", "미입력"))
-            cols[2].metric("스터디룸 여부", branch_data.get("스터디룸 여부", "미입력"))
+            cols[0].metric("환불기간", branch_policy.refund_period or "미입력")
+            cols[1].metric("환불응대금지", branch_policy.restriction or "미입력")
+            cols[2].metric("스터디룸 여부", branch_record.study_room or "미입력")
+            if branch_policy.refund_blocked:
+                st.error("⛔ 환불 응대 금지 지점입니다. 본사 확인 후 안내해주세요.")
+            for name, field, error in store.policies.issues:
+                if name == selected_branch:
+                    st.warning(f"⚠️ 시트의 {field} 값을 확인해주세요 ({error}). 0원으로 보고 규정을 정했습니다.")
 
     # 기본 정보 입력 (지점명은 선택된 값으로 고정)
     branch = selected_branch if selected_branch else st.text_input("지점명 (수동입력)")
@@ -831,24 +1068,12 @@ def refund_calculator_page():
 
     # 환불 규정 자동 선택
     if selected_branch:
-        branch_data = df[df["지점명"] == selected_branch].iloc[0]
-    
-        # 통화 형식 변환 적용
-        time_price_str = branch_data.get("시간권금액", "0")
-        period_price_str = branch_data.get("기간권금액", "0")
-    
-        # 통화 형식 변환 함수 호출
-        time_price = convert_currency(time_price_str)
-        period_price = convert_currency(period_price_str)
-    
-        # 시간권/기간권 금액이 유효한지 확인
-        has_time_period_pricing = (time_price > 0) or (period_price > 0)
-    
-        if has_time_period_pricing:
-            policy = "일반"
-            st.info(f"📌 일반 환불 규정 적용 (시간권: {int(time_price):,}원, 기간권: {int(period_price):,}원)")
+        time_price = branch_policy.hourly_rate
+        period_price = branch_policy.daily_rate
+        policy = branch_policy.policy
+        if policy == "일반":
+            st.info(f"📌 일반 환불 규정 적용 (시간권: {time_price:,}원, 기간권: {period_price:,}원)")
         else:
-            policy = "% 규정"
             st.info("📌 % 환불 규정 적용")
     else:
         policy = st.radio("환불 규정", ["일반", "% 규정"])
@@ -888,84 +1113,53 @@ def refund_calculator_page():
         valid_period = f"{purchase_date.strftime('%Y-%m-%d')} ~ {(purchase_date + timedelta(days=days_given - 1)).strftime('%Y-%m-%d')}" if days_given else "정보 없음"
     # ▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲
 
+    # 날짜별/사용시간별 환불 금액 시뮬레이션 (현재 입력값 기준)
+    refund_what_if_panel(RefundCase(
+        ticket_type=ticket_type,
+        policy=policy,
+        ticket_price=ticket_price,
+        purchase_date=purchase_date,
+        refund_date=refund_date,
+        days_given=days_given,
+        hours_used=hours_used,
+        total_hours=total_hours,
+        daily_rate=period_price if selected_branch else None,
+        hourly_rate=time_price if selected_branch else None,
+        noble_rate=noble_rate,
+        penalty_rate=parse_rate(penalty_rate),
+    ))
+
     # ▼▼▼ 환불 계산 로직 수정 ▼▼▼
     if st.button("환불 금액 계산"):
-        # used_days 초기화 (모든 조건에서 사용 가능하도록)
-        used_days = (refund_date - purchase_date).days + 1  # 결제일 포함
-
-        # daily_rate, hourly_rate, noble_rate 설정
-        daily_rate = period_price if ticket_type == "기간권" else 11000  # 시트의 기간권 금액 사용
-        hourly_rate = time_price if ticket_type == "시간권" else 2000  # 시트의 시간권 금액 사용
-        noble_rate = noble_rate if ticket_type == "노블레스석" else 0  # 노블레스석 1일 요금
-
-        used_amount = 0
-        refund_amount = 0  # refund_amount 초기화 추가
+        # ✅ 공용 환불 엔진으로 계산 (시트의 기간권/시간권 금액을 1일/시간당 요금으로 사용)
+        result = calculate_refund(RefundCase(
+            ticket_type=ticket_type,
+            policy=policy,
+            ticket_price=ticket_price,
+            purchase_date=purchase_date,
+            refund_date=refund_date,
+            days_given=days_given,
+            hours_used=hours_used,
+            total_hours=total_hours,
+            daily_rate=period_price if selected_branch else None,
+            hourly_rate=time_price if selected_branch else None,
+            noble_rate=noble_rate,
+            penalty_rate=parse_rate(penalty_rate),
+        ))
+        usage_info = result.usage_info
+        deduction_detail = result.deduction_detail
+        used_amount = deduction_amount = result.deduction_amount
+        penalty_amount = result.penalty_amount
+        final_refund_amount = result.final_refund_amount
+        deposit_amount = result.deposit_amount  # 입금하실 금액 (공제금액 + 위약금)
 
         # 결제일자 30일 초과 시 팝업 알림
-        if (refund_date - purchase_date).days > 30:
+        if result.over_limit:
             st.warning("결제한지 30일이 지났으므로 위약금이 발생하거나, 환불이 불가할 수 있습니다.")
+        if selected_branch and branch_policy.refund_days is not None \
+                and (refund_date - purchase_date).days > branch_policy.refund_days:
+            st.warning(f"지점 환불기간({branch_policy.refund_days}일)이 지난 결제건입니다. 지점 규정을 확인해주세요.")
 
-        # 환불 규정에 따른 계산
-        if policy == "% 규정":
-            percent_used = (used_days / days_given) * 100 if ticket_type in ["기간권", "노블레스석"] else (hours_used / total_hours) * 100
-        
-            if percent_used < 25:
-                refund_amount = ticket_price * 0.5
-                used_amount = ticket_price * 0.5  # 실제 사용량은 50%로 계산
-            elif percent_used < 50:
-                refund_amount = ticket_price * 0.25
-                used_amount = ticket_price * 0.75  # 실제 사용량은 75%로 계산
-            else:
-                refund_amount = 0
-                used_amount = ticket_price  # 실제 사용량은 100%로 계산
-        
-            # deduction_amount는 실제 사용량으로 계산
-            deduction_amount = used_amount
-        
-            # 사용량 정보 포맷 변경
-            usage_info = (
-                f"{percent_used:.1f}% 사용 ({used_days}일 사용)" 
-                if ticket_type in ["기간권", "노블레스석"] 
-                else f"{percent_used:.1f}% 사용 ({hours_used}시간 사용)"
-            )
-        
-            # deduction_detail 설정
-            if percent_used < 25:
-                deduction_detail = f"0~24% 환불 구간 : 결제금액의 50% 환불 ({int(refund_amount):,}원)"
-            elif percent_used < 50:
-                deduction_detail = f"25~50% 환불 구간 : 결제금액의 25% 환불 ({int(refund_amount):,}원)"
-            else:
-                deduction_detail = f"50% 이상 사용 구간 : 환불 불가 ({int(deduction_amount):,}원)"
-        else:
-            # 일반 환불 규정
-            if ticket_type == "기간권":
-                used_amount = used_days * daily_rate
-                usage_info = f"{used_days}일 사용"
-                deduction_detail = f"{used_days}일 × {int(daily_rate):,}원"
-            elif ticket_type == "노블레스석":
-                used_amount = used_days * noble_rate
-                usage_info = f"{used_days}일 사용"
-                deduction_detail = f"{used_days}일 × {int(noble_rate):,}원 (노블레스석 1일 요금)"
-            elif ticket_type == "시간권":
-                used_amount = hours_used * hourly_rate
-                usage_info = f"{hours_used}시간 사용"
-                deduction_detail = f"{hours_used}시간 × {int(hourly_rate):,}원"
-            else:
-                used_amount = 0  # 기본값
-                usage_info = "정보 없음"
-                deduction_detail = "정보 없음"
-
-            refund_amount = max(ticket_price - used_amount, 0)
-            deduction_amount = used_amount  # 일반 환불 규정에서는 used_amount가 deduction_amount
-
-        # 위약금 계산 (결제금액 기준)
-        penalty_rate_value = int(penalty_rate.strip("%")) / 100  # 위약금 비율 (10% → 0.1)
-        penalty_amount = ticket_price * penalty_rate_value  # 위약금 금액 (결제금액 기준)
-        final_refund_amount = max(refund_amount - penalty_amount, 0)  # 최종 환불 금액 (음수 방지)
-    
-        # ✅ 입금하실 금액 계산 (공제금액 + 위약금)
-        deposit_amount = deduction_amount + penalty_amount
-    
         # 한국 시간대 (KST)로 현재 시간 설정
         kst = pytz.timezone('Asia/Seoul')
         current_time_kst = datetime.now(kst).strftime('%Y-%m-%d %H:%M')
@@ -1012,6 +1206,7 @@ def refund_calculator_page():
         st.text_area("📄 환불 내역서 (Ctrl+C로 복사 가능)", refund_detail.strip(), height=400)
 
         # 계산 결과를 세션 상태에 저장
+        st.session_state.pop('refund_pdf', None)  # 이전 계산의 PDF는 버림
         st.session_state['refund_data'] = {
             'branch': branch,
             'phone': phone,
@@ -1026,8 +1221,10 @@ def refund_calculator_page():
             'penalty_amount': penalty_amount,
             'final_refund_amount': final_refund_amount,
             'deposit_amount': deposit_amount,
-            'refund_date': refund_date
+            'refund_date': refund_date,
+            'policy': policy
         }
+        record_refund(st.session_state['refund_data'])  # 장부에 계산 결과 기록
 
     # 계산 완료 후 계좌 정보 입력 폼 표시
     if 'refund_data' in st.session_state:
@@ -1050,6 +1247,7 @@ def refund_calculator_page():
                     'bank_name': bank_name,
                     'account_number': account_number
                 }
+                record_refund(st.session_state['refund_data'], st.session_state["account_info"], kind="account")
                 st.success("계좌 정보가 저장되었습니다.")
                 st.rerun()  # 즉시 페이지 리로드
 
@@ -1058,7 +1256,7 @@ def refund_calculator_page():
         refund_data = st.session_state['refund_data']
         account_info = st.session_state['account_info']
         
-        html_content = generate_refund_html(
+        receipt_fields = dict(
             branch=refund_data['branch'],
             phone=refund_data['phone'],
             formatted_ticket_type=refund_data['formatted_ticket_type'],
@@ -1077,6 +1275,7 @@ def refund_calculator_page():
             bank_name=account_info['bank_name'],
             account_number=account_info['account_number']
         )
+        html_content = generate_refund_html(**receipt_fields)
         
         st.download_button(
             label="📥 환불 영수증 다운로드 (HTML)",
@@ -1084,243 +1283,208 @@ def refund_calculator_page():
             file_name="refund_receipt.html",
             mime="text/html"
         )
-        
-# ✅ HTML 템플릿 (기존과 동일)
-def generate_refund_html(
-    branch, phone, formatted_ticket_type, purchase_date, valid_period,
-    ticket_price, usage_info, deduction_amount, deduction_detail, penalty_rate,
-    penalty_amount, final_refund_amount, deposit_amount, refund_date,
-    account_holder="", bank_name="", account_number=""
-):
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            @import url('https://cdn.jsdelivr.net/gh/orioncactus/Pretendard/dist/web/static/pretendard.css');
-            * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }}
-            body {{
-                font-family: 'Pretendard', sans-serif;
-                background-color: #f5f7fa;
-                color: #333;
-                line-height: 1.5;
-            }}
-            .container {{
-                max-width: 780px;
-                margin: 20px auto;
-                padding: 0 15px;
-            }}
-            .receipt {{
-                background-color: white;
-                padding: 25px;
-                border-radius: 12px;
-                box-shadow: 0 4px 12px rgba(0,0,0,0.08);
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 25px;
-                min-height: 580px;
-            }}
-            .header {{
-                grid-column: 1 / -1;
-                text-align: center;
-                padding-bottom: 15px;
-                margin-bottom: 15px;
-                border-bottom: 1px solid #e0e0e0;
-            }}
-            .title {{
-                font-size: 22px;
-                font-weight: 800;
-                color: #2c3e50;
-                margin-bottom: 5px;
-            }}
-            .subtitle {{
-                font-size: 14px;
-                color: #7f8c8d;
-                font-weight: 500;
-            }}
-            .section {{
-                margin-bottom: 20px;
-            }}
-            .section-title {{
-                font-size: 16px;
-                font-weight: 700;
-                color: #2c3e50;
-                margin-bottom: 12px;
-                padding-bottom: 6px;
-                border-bottom: 1px solid #f0f0f0;
-                position: relative;
-            }}
-            .section-title:after {{
-                content: "";
-                position: absolute;
-                bottom: -1px;
-                left: 0;
-                width: 50px;
-                height: 2px;
-                background-color: #4e73df;
-            }}
-            .info-table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin: 8px 0;
-                font-size: 14px;
-            }}
-            .info-table td {{
-                padding: 10px 8px;
-                border-bottom: 1px solid #f5f5f5;
-                vertical-align: top;
-            }}
-            .info-table tr:last-child td {{
-                border-bottom: none;
-            }}
-            .highlight {{
-                color: #e74c3c;
-                font-weight: 700;
-            }}
-            .positive {{
-                color: #2ecc71;
-                font-weight: 700;
-            }}
-            .account-info {{
-                background-color: #f8fafc;
-                padding: 18px;
-                border-radius: 8px;
-                border: 1px solid #e9ecef;
-                margin-top: 10px;
-            }}
-            .account-item {{
-                margin-bottom: 10px;
-            }}
-            .account-label {{
-                font-size: 13px;
-                color: #7f8c8d;
-                margin-bottom: 3px;
-            }}
-            .account-value {{
-                font-weight: 600;
-                font-size: 15px;
-            }}
-            .deposit-box {{
-                background: linear-gradient(135deg, #f6f9ff, #e9f0ff);
-                padding: 20px;
-                border-radius: 8px;
-                text-align: center;
-                border: 1px solid #e0e8ff;
-                margin-top: 15px;
-            }}
-            .deposit-amount {{
-                font-size: 26px;
-                font-weight: 800;
-                color: #4e73df;
-                margin: 10px 0;
-            }}
-            .footer {{
-                grid-column: 1 / -1;
-                text-align: center;
-                margin-top: 15px;
-                font-size: 12px;
-                color: #95a5a6;
-                padding-top: 15px;
-                border-top: 1px solid #eee;
-            }}
-            @media (max-width: 768px) {{
-                .receipt {{
-                    grid-template-columns: 1fr;
-                    min-height: auto;
-                    padding: 20px;
-                }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="receipt">
-                <div class="header">
-                    <div class="title">멘토즈 스터디카페</div>
-                    <div class="subtitle">환불 요금 안내문</div>
-                </div>
 
-                <!-- 왼쪽 컬럼 -->
-                <div class="left-column">
-                    <!-- 기본 정보 -->
-                    <div class="section">
-                        <div class="section-title">기본 정보</div>
-                        <table class="info-table">
-                            <tr><td width="35%">지점명</td><td>{branch}</td></tr>
-                            <tr><td>연락처</td><td>{phone}</td></tr>
-                            <tr><td>이용권</td><td>{formatted_ticket_type}</td></tr>
-                            <tr><td>결제일</td><td>{purchase_date.strftime('%Y-%m-%d')}</td></tr>
-                            <tr><td>환불요청일</td><td>{refund_date.strftime('%Y-%m-%d')}</td></tr>
-                            <tr><td>유효기간</td><td>{valid_period}</td></tr>
-                        </table>
-                    </div>
+        # PDF는 미리 띄워 둔 워커 프로세스에서 렌더링 (화면 프로세스는 결과만 기다림)
+        if refund_pdf.available():
+            renderer = get_pdf_renderer()  # 워커는 화면에 들어올 때 이미 띄워 둠 (refund_calculator_page 맨 앞)
+            if st.button("📄 PDF로 만들기", key="refund_pdf_render"):
+                try:
+                    st.session_state["refund_pdf"] = renderer.render(receipt_fields)
+                    st.caption(f"PDF 렌더링 {renderer.stats()['last_ms']:.0f}ms")
+                except Exception as e:
+                    st.error(f"🚨 PDF 생성 실패: {e}")
+            if "refund_pdf" in st.session_state:
+                st.download_button(
+                    label="📥 환불 영수증 다운로드 (PDF)",
+                    data=st.session_state["refund_pdf"],
+                    file_name="refund_receipt.pdf",
+                    mime="application/pdf",
+                    key="refund_pdf_download",
+                )
+
+    refund_history_panel(branch, phone)
+
+
+def refund_what_if_panel(case):
+    """환불 요청일(기간권/노블레스석) 또는 사용 시간(시간권)별 환불/공제/입금액 그래프"""
+    with st.expander("📈 환불 시뮬레이션 (언제 환불하면 얼마?)"):
+        if not case.ticket_price:
+            st.caption("결제 금액을 입력하면 날짜별 환불 금액을 보여줍니다.")
+            return
+        try:
+            curve = refund_curve(case)
+        except ValueError as e:
+            st.caption(str(e))
+            return
 
-                    <!-- 결제 정보 -->
-                    <div class="section">
-                        <div class="section-title">결제 및 공제 정보</div>
-                        <table class="info-table">
-                            <tr><td width="40%">결제 금액</td><td>{ticket_price:,}원</td></tr>
-                            <tr><td>사용량</td><td>{usage_info}</td></tr>
-                            <tr><td>공제 금액</td><td class="highlight">-{deduction_amount:,}원</td></tr>
-                            <tr><td>공제 내역</td><td>{deduction_detail}</td></tr>
-                            <tr><td>위약금 ({penalty_rate})</td><td class="highlight">-{penalty_amount:,}원</td></tr>
-                        </table>
-                    </div>
-                </div>
+        x = "환불요청일" if case.ticket_type in ("기간권", "노블레스석") else "사용시간"
+        fig = px.line(
+            curve, x=x, y=["최종환불금액", "공제금액", "입금액"], markers=len(curve) <= 60,
+            labels={"value": "금액 (원)", "variable": "구분"},
+        )
+        for value, label in curve_markers(case):
+            # 날짜 축에서는 add_vline의 annotation 위치 계산이 맞지 않아 주석을 따로 붙인다
+            fig.add_vline(x=value, line_dash="dash", line_color="gray")
+            fig.add_annotation(x=value, y=1, yref="paper", text=label, showarrow=False, yanchor="bottom")
+        fig.update_layout(height=380, margin=dict(t=40, b=10), hovermode="x unified")
+        st.plotly_chart(fig, use_container_width=True)
+        if x == "사용시간":
+            st.caption(f"환불 요청일 {case.refund_date} 기준, 사용 시간만 바꿔 계산했습니다.")
+
+
+def record_refund(refund_data, account_info=None, kind="calculation"):
+    """환불 장부에 한 건 기록 (장부 오류로 계산 화면이 멈추지 않게 경고만 표시)"""
+    try:
+        get_refund_ledger().record(refund_data, account_info, kind=kind)
+    except Exception as e:
+        st.warning(f"⚠️ 환불 장부 기록 실패: {e}")
+
+
+def refund_history_panel(branch, phone):
+    """환불 장부 조회 (전화번호 전체/뒤 4자리, 지점명, 환불요청일 범위 기준)"""
+    with st.expander("🗂️ 환불 계산 이력"):
+        cols = st.columns([2, 2, 2, 1])
+        search_phone = cols[0].text_input("전화번호 (전체 또는 뒤 4자리)", value=phone or "", key="refund_history_phone")
+        search_branch = cols[1].text_input("지점명 (정확히 일치)", value=branch or "", key="refund_history_branch")
+        # 날짜를 하나만 고르면 그날 하루, 두 개면 그 사이 (양 끝 포함)
+        dates = cols[2].date_input("환불요청일 범위", value=(), key="refund_history_dates")
+        limit = cols[3].number_input("최대 건수", min_value=10, max_value=1000, value=50, step=10, key="refund_history_limit")
+        since, until = (tuple(dates) * 2)[:2] if dates else (None, None)
+        if not search_phone.strip() and not search_branch.strip() and since is None:
+            st.caption("전화번호, 지점명, 환불요청일 중 하나를 입력하면 이전 계산 내역을 보여줍니다.")
+            return
+        try:
+            history, elapsed_ms = get_refund_ledger().history(
+                phone=search_phone, branch=search_branch.strip(), since=since, until=until, limit=limit
+            )
+        except Exception as e:
+            st.error(f"🚨 이력 조회 실패: {e}")
+            return
+        st.caption(f"{len(history):,}건 (조회 {elapsed_ms:.1f}ms)")
+        if len(history):
+            st.dataframe(history, use_container_width=True, hide_index=True)
+
+
+# ✅ 환불 일괄 검토 페이지 (CSV/XLSX 업로드 → 한 번에 계산)
+def refund_batch_page():
+    st.title("🧾 환불 일괄 검토")
+    st.caption("필수 열: 이용권종류, 환불규정, 결제금액, 결제일, 환불요청일 / 선택 열: " + ", ".join(list(CASE_COLUMNS)[5:]))
+    if refund_pdf.available():
+        get_pdf_renderer()  # PDF ZIP을 만들 때 워커 시작을 기다리지 않게 화면에 들어올 때 미리 띄움
+    uploaded = st.file_uploader("환불 건 파일 업로드 (CSV/XLSX)", type=["csv", "xlsx"], key="refund_batch_file")
+    if uploaded is None:
+        return
 
-                <!-- 오른쪽 컬럼 -->
-                <div class="right-column">
-                    <!-- 환불 정보 -->
-                    <div class="section">
-                        <div class="section-title">환불 정보</div>
-                        <table class="info-table">
-                            <tr><td width="45%">환불 금액</td><td class="positive">{final_refund_amount:,}원</td></tr>
-                        </table>
-                    </div>
+    try:
+        cases = load_cases(uploaded)
+        # 지점명 열이 있으면 비어 있는 환불규정/요금을 지점 정책표에서 채움
+        cases = get_branch_store().policies.fill_cases(cases)
+        started = time.perf_counter()
+        results = calculate_refunds(cases)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    except Exception as e:
+        st.error(f"🚨 계산 실패: {e}")
+        return
 
-                    <!-- 환불 계좌 정보 -->
-                    <div class="section">
-                        <div class="section-title">환불 계좌 정보</div>
-                        <div class="account-info">
-                            <div class="account-item">
-                                <div class="account-label">예금주</div>
-                                <div class="account-value">{account_holder}</div>
-                            </div>
-                            <div class="account-item">
-                                <div class="account-label">은행명</div>
-                                <div class="account-value">{bank_name}</div>
-                            </div>
-                            <div class="account-item">
-                                <div class="account-label">계좌번호</div>
-                                <div class="account-value">{account_number}</div>
-                            </div>
-                        </div>
-                    </div>
+    errors = results["오류"] != ""
+    cols = st.columns(5)
+    cols[0].metric("환불 건수", f"{len(results):,}건")
+    cols[1].metric("최종 환불 합계", f"{int(results['최종환불금액'].sum()):,}원")
+    cols[2].metric("입금액 합계", f"{int(results['입금액'].sum()):,}원")
+    cols[3].metric("30일 초과", f"{int(results['30일초과'].sum()):,}건")
+    cols[4].metric("확인 필요", f"{int(errors.sum()):,}건")
+    st.caption(f"계산 시간 {elapsed_ms:.0f}ms")
+    st.dataframe(results, use_container_width=True, hide_index=True)
+    st.download_button(
+        "⬇️ 결과 다운로드 (CSV)", results.to_csv(index=False).encode("utf-8-sig"),
+        file_name="refund_review.csv", mime="text/csv", key="refund_batch_download",
+    )
 
-                    <!-- 입금 금액 -->
-                    <div class="deposit-box">
-                        <div style="font-weight:600; color:#5a6c90;">입금 하실 금액</div>
-                        <div class="deposit-amount">{deposit_amount:,}원</div>
-                        <div style="font-size:13px; color:#7f8c8d;">입금 확인 후 결제 내역이 전체 취소 됩니다.</div>
-                    </div>
-                </div>
+    # 환불 안내문 일괄 생성: 한 장씩 만들어 ZIP 스트림에 바로 기록 (CSS는 ZIP 안에 한 번만)
+    with st.expander("📦 환불 안내문 일괄 다운로드 (ZIP)"):
+        formats = ["HTML", "PDF"] if refund_pdf.available() else ["HTML"]
+        file_format = st.radio("형식", formats, horizontal=True, key="refund_batch_format")
+        with_index = st.checkbox("목록 페이지(index.html) 포함", value=True, key="refund_batch_index")
+        if errors.any():
+            st.caption(f"오류 열이 채워진 {int(errors.sum()):,}건은 안내문을 만들지 않습니다.")
+        receipt_cases = cases[~errors.to_numpy()]
+        if st.button("안내문 ZIP 만들기", key="refund_batch_zip"):
+            try:
+                started = time.perf_counter()
+                if file_format == "PDF":
+                    # PDF는 워커 프로세스들이 나눠서 렌더링
+                    receipts = get_pdf_renderer().iter_pdf_files(iter_receipt_fields(receipt_cases))
+                else:
+                    receipts = iter_receipt_files(iter_receipt_fields(receipt_cases))
+                # download_button은 완성된 바이트를 받으므로 ZIP 전체(PDF면 수십 MB까지)를 메모리에 모은다.
+                # 메모리가 일정해야 하는 대량 생성은 파일로 바로 쓰는 CLI(python refund_receipts.py)를 사용
+                st.session_state["refund_batch_zip_data"] = b"".join(
+                    stream_receipts_zip(receipts, index=with_index, stylesheet=file_format == "HTML")
+                )
+                st.caption(f"{len(receipt_cases):,}건 생성 {(time.perf_counter() - started) * 1000:.0f}ms")
+                if file_format == "PDF":
+                    stats = get_pdf_renderer().stats()
+                    st.caption(f"PDF 렌더링 평균 {stats['avg_ms']:.0f}ms / 최대 {stats['max_ms']:.0f}ms (누적 {stats['renders']:,}건)")
+            except Exception as e:
+                st.error(f"🚨 안내문 생성 실패: {e}")
+        if "refund_batch_zip_data" in st.session_state:
+            st.download_button(
+                "⬇️ 안내문 ZIP 다운로드", st.session_state["refund_batch_zip_data"],
+                file_name="refund_receipts.zip", mime="application/zip", key="refund_batch_zip_download",
+            )
 
-                <div class="footer">
-                    발급일: {datetime.now(pytz.timezone('Asia/Seoul')).strftime('%Y-%m-%d %H:%M')}
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return html_content
 
+# ✅ HTML 템플릿 (refund_receipts의 미리 만든 템플릿 사용)
+def generate_refund_html(
+    branch, phone, formatted_ticket_type, purchase_date, valid_period,
+    ticket_price, usage_info, deduction_amount, deduction_detail, penalty_rate,
+    penalty_amount, final_refund_amount, deposit_amount, refund_date,
+    account_holder="", bank_name="", account_number=""
+):
+    return render_receipt(dict(
+        branch=branch, phone=phone, formatted_ticket_type=formatted_ticket_type,
+        purchase_date=purchase_date, refund_date=refund_date, valid_period=valid_period,
+        ticket_price=ticket_price, usage_info=usage_info, deduction_amount=deduction_amount,
+        deduction_detail=deduction_detail, penalty_rate=penalty_rate, penalty_amount=penalty_amount,
+        final_refund_amount=final_refund_amount, deposit_amount=deposit_amount,
+        account_holder=account_holder, bank_name=bank_name, account_number=account_number,
+    ))
+
+
+# ✅ 일괄 계산: 퇴실 기록 파일 전체를 기준 시각(now)으로 한 번에 계산
+def checkout_batch_panel(now):
+    with st.expander("📦 퇴실 미처리 일괄 계산 (CSV/XLSX)"):
+        st.caption(
+            f"열: {', '.join(CHECKOUT_COLUMNS)} (퇴실시각 대신 퇴실일자 + 퇴실시간도 가능) / "
+            f"요금 규정 파일 열: {', '.join(RULE_COLUMNS)} (없는 지점은 {DEFAULT_FEE_RULE.label})"
+        )
+        uploaded = st.file_uploader("퇴실 기록 업로드", type=["csv", "xlsx"], key="checkout_batch_file")
+        rules_file = st.file_uploader("지점별 요금 규정 (선택)", type=["csv", "xlsx"], key="checkout_rules_file")
+        if uploaded is None:
+            return
+        if now is None:
+            st.info("기준 시각(HH:MM)을 올바르게 입력하면 계산합니다.")
+            return
+        try:
+            rules = load_fee_rules(rules_file) if rules_file is not None else {}
+            started = time.perf_counter()
+            results = compute_overstay_fees(load_table(uploaded), now, rules)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        except Exception as e:
+            st.error(f"🚨 계산 실패: {e}")
+            return
+
+        errors = int((results["오류"] != "").sum())
+        cols = st.columns(3)
+        cols[0].metric("건수", f"{len(results):,}건")
+        cols[1].metric("초과 요금 합계", f"{int(results['초과요금'].sum()):,}원")
+        cols[2].metric("확인 필요", f"{errors:,}건")
+        st.caption(f"기준 시각 {now.strftime('%Y-%m-%d %H:%M')} / 계산 시간 {elapsed_ms:.0f}ms")
+        st.dataframe(results, use_container_width=True, hide_index=True)
+        st.download_button(
+            "⬇️ 결과 다운로드 (CSV)", results.to_csv(index=False).encode("utf-8-sig"),
+            file_name="overstay_fees.csv", mime="text/csv", key="checkout_batch_download",
+        )
 
 def restore_checkout_page():
     st.title("🛠️ 퇴실 미처리 복구")
@@ -1344,7 +1508,12 @@ def restore_checkout_page():
             now = pytz.timezone('Asia/Seoul').localize(now)
         except ValueError:
             st.error("❌ 올바른 시간 형식(HH:MM)을 입력하세요!")
-            return
+            now = None
+
+    # ✅ 일괄 계산은 아래 단건 계산의 오류(return)와 관계없이 항상 표시
+    checkout_batch_panel(now)
+    if now is None:
+        return
 
     # ✅ 폼 제출 버튼
     if st.button("미처리 시간 계산"):
@@ -1364,12 +1533,12 @@ def restore_checkout_page():
             lost_minutes = int(lost_time.total_seconds() // 60)
             lost_hours = lost_minutes // 60
             remaining_minutes = lost_minutes % 60
-            extra_fee = (lost_minutes // 30) * 1000  # 30분당 1000원 초과 요금 계산
+            extra_fee = overstay_fee(lost_minutes)  # 기본 규정: 30분당 1,000원
 
             # ✅ 결과 출력
             st.success(f"📅 미처리 기간: {checkout_datetime.strftime('%Y-%m-%d %H:%M')} ~ {now.strftime('%Y-%m-%d %H:%M')}")
             st.success(f"⏳ 미처리 시간: {lost_hours}시간 {remaining_minutes}분")
-            st.success(f"💰 초과 요금: {extra_fee:,}원 (30분당 1,000원)")
+            st.success(f"💰 초과 요금: {extra_fee:,}원 ({DEFAULT_FEE_RULE.label})")
         except ValueError:
             st.error("❌ 올바른 시간 형식(HH:MM)을 입력하세요!")
         except Exception as e:
@@ -1637,10 +1806,16 @@ def main():
         ]},
         {"icon": "💰", "label": "환불 관리", "key": "refund", "sub": [
             {"label": "환불 계산", "key": "refund_calc"},
+            {"label": "환불 일괄 검토", "key": "refund_batch"},
         ]},
         {"icon": "📊", "label": "데이터 관리", "key": "data", "sub": [
             {"label": "전체 지점 리스트", "key": "spreadsheet"},
         ]},
+        {"icon": "🗺️", "label": "지도", "key": "map", "sub": [
+            {"label": "전체 지점 지도", "key": "overview_map"},
+            {"label": "가까운 지점 찾기", "key": "nearest"},
+            {"label": "상권 중복 분석", "key": "territory"},
+        ]},
     ]
 
     # 메뉴 버튼 클릭 이벤트 처리
@@ -1672,10 +1847,18 @@ def main():
             restore_checkout_page()
         elif st.session_state.page == "refund_calc":
             refund_calculator_page()
+        elif st.session_state.page == "refund_batch":
+            refund_batch_page()
         elif st.session_state.page == "spreadsheet":
             load_and_display_spreadsheet_data()
         elif st.session_state.page == "branch_info":
             branch_info_page()
+        elif st.session_state.page == "overview_map":
+            overview_map_page()
+        elif st.session_state.page == "nearest":
+            nearest_branch_page()
+        elif st.session_state.page == "territory":
+            territory_overlap_page()
 
     # ✅ 메뉴 렌더링 함수 호출
     render_page()
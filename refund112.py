@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 from datetime import datetime, timedelta
+from refund_engine import RefundCase, calculate_refund, percent_band
 
 # 동적 UI 관리를 위한 클래스
 class DynamicUI:
@@ -135,21 +136,29 @@ class RefundCalculator:
         else:
             return self.calculate_percent(ticket_type, data, used_days)
 
+    def _engine_case(self, ticket_type, policy, data):
+        # 공용 환불 엔진 입력 (노블레스석 1일 요금은 입력받은 값 사용)
+        return RefundCase(
+            ticket_type=ticket_type,
+            policy=policy,
+            ticket_price=data['ticket_price'],
+            purchase_date=data['purchase_date'],
+            refund_date=data['refund_date'],
+            days_given=data['days_given'],
+            hours_used=data['hours_used'],
+            total_hours=data['total_hours'],
+            noble_rate=self.daily_rate,
+        )
+
     def calculate_normal(self, ticket_type, data, used_days):
-        if ticket_type == "기간권":
-            used_amount = used_days * 11000
-            policy_str = f"{used_days}일 × 11,000원"
-        elif ticket_type == "시간권":
-            used_amount = data['hours_used'] * 2000
-            policy_str = f"{data['hours_used']}시간 × 2,000원"
-        else:  # 노블레스석
-            used_amount = used_days * self.daily_rate
-            policy_str = f"{used_days}일 × {self.daily_rate:,}원"
+        result = calculate_refund(self._engine_case(ticket_type, "일반", data))
+        used_amount = int(result.deduction_amount)
 
         return {
-            'policy': policy_str,
+            'policy': result.deduction_detail,
+            'price': data['ticket_price'],
             'used': used_amount,
-            'refund': data['ticket_price'] - used_amount,
+            'refund': int(result.refund_amount),  # 공제 금액이 결제 금액보다 크면 0원 (음수 환불 없음)
             'usage_info': self.get_usage_info(ticket_type, data, used_days)
         }
     
@@ -159,7 +168,7 @@ class RefundCalculator:
         return f"- 사용 일수 : {usage_info.replace('중', '')}"
     
     def _format_refund_info(self, result):
-        return f"""▣ 결제 금액 : {result['refund'] + result['used']:,}원
+        return f"""▣ 결제 금액 : {result['price']:,}원
         ▣ 공제 금액 : {result['used']:,}원 ({result['policy']})
         ▣ 환불 금액 : {result['refund']:,}원
         ▶ 회원 정보 : {self.entry_phone.get()} (고객 전화번호 기준)"""
@@ -172,23 +181,21 @@ class RefundCalculator:
             total = data['total_hours']
             used = data['hours_used']
 
-        percent = int((used / total) * 100)  # 소수점 제거 후 정수로 변환
-        policy_info = self.get_policy_by_percent(percent, data['ticket_price'])
+        result = calculate_refund(self._engine_case(ticket_type, "% 규정", data))
+        percent = int(result.percent_used)  # 소수점 제거 후 정수로 변환 (표시용)
+        policy_info = self.get_policy_by_percent(result.percent_used, data['ticket_price'])
     
         return {
             'policy': policy_info['desc'],
+            'price': data['ticket_price'],
             'used': policy_info['amount'],
             'refund': data['ticket_price'] - policy_info['amount'],
             'usage_info': f"{total}중 {used} 사용 ({percent}%)"  # 소수점 없이 정수로 표시
     }
 
     def get_policy_by_percent(self, percent, price):
-        if percent <= 25:
-            return {'amount': price * 0.5, 'desc': "0~25% 사용 → 50% 환불"}
-        elif percent <= 50:
-            return {'amount': price * 0.75, 'desc': "26~50% 사용 → 25% 환불"}
-        else:
-            return {'amount': price, 'desc': "50% 초과 → 환불 불가"}
+        ratio, label = percent_band(percent)
+        return {'amount': price * (1 - ratio), 'desc': label}
 
     def get_usage_info(self, ticket_type, data, used_days):
         if ticket_type == "시간권":
@@ -217,7 +224,7 @@ class RefundCalculator:
         # 결과 텍스트 구성
         text = f"""
         {result['usage_info']}
-        [결제금액] {result['refund'] + result['used']:,}원
+        [결제금액] {result['price']:,}원
         [사용금액] {result['used']:,}원 ({result['policy']})
         --------------------------
         [환불금액] {result['refund']:,}원
@@ -247,7 +254,7 @@ class RefundCalculator:
         [구 매 정 보]
         - 이용권 종류 : {self.ticket_var.get()}
         - 결 제 일 자 : {self.entry_purchase_date.get()}
-        - 결제 금액 : {result['refund'] + result['used']:,}원
+        - 결제 금액 : {result['price']:,}원
         - 유효 기간 : {self._get_valid_period()}
         {'-'*45}
         [사 용 내 역]
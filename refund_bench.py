@@ -0,0 +1,311 @@
+import argparse, json, math, os, random, sys, time
+from dataclasses import asdict, replace
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from refund_engine import (
+    DEFAULT_DAILY_RATE, DEFAULT_HOURLY_RATE, LIMIT_DAYS, RefundCase, calculate_refund, calculate_refunds, refund_curve,
+)
+
+
+# ✅ 환불 계산 일치 검사 + 성능 측정 (오프라인, 외부 서비스 없음)
+#    무작위 환불 건을 대량으로 만들어 아래 구현을 모두 돌리고, 규정대로 직접 계산한 기준값과 다르면 입력값 그대로 보고한다.
+#      - engine   : refund_engine.calculate_refund (main 환불 계산 화면)
+#      - batch    : refund_engine.calculate_refunds (환불 일괄 검토)
+#      - curve    : refund_engine.refund_curve (환불 시뮬레이션, 같은 날짜의 값과 비교)
+#      - refund112: RefundCalculator.process_calculation (tkinter 창 없이 호출)
+#      - app      : app.py 환불 계산기 (streamlit AppTest, % 구간 경계 케이스 + --app 건수만큼)
+#    사용법: python refund_bench.py [--cases 20000] [--seed 0] [--app 4]   (불일치가 있으면 종료 코드 1)
+#    같은 검사를 작은 고정 시드로 돌리는 pytest 테스트: tests/test_refund_conformance.py
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+AMOUNT_TOLERANCE = 0.5  # 원 단위 비교 허용 오차 (부동소수점)
+COMPARED_FIELDS = ("used_days", "deduction_amount", "refund_amount", "penalty_amount",
+                   "final_refund_amount", "deposit_amount", "over_limit")
+
+
+def reference_refund(case):
+    """규정을 그대로 옮긴 기준 계산 (엔진과 독립적으로 작성, 최적화 없음)"""
+    used_days = (case.refund_date - case.purchase_date).days + 1
+    price = case.ticket_price
+    if case.policy == "% 규정":
+        if case.ticket_type == "시간권":
+            percent = case.hours_used / case.total_hours * 100
+        else:
+            percent = used_days / case.days_given * 100
+        if percent < 25:
+            refund = price * 0.5
+        elif percent < 50:
+            refund = price * 0.25
+        else:
+            refund = 0
+        deduction = price - refund
+    else:
+        if case.ticket_type == "기간권":
+            deduction = used_days * (case.daily_rate or DEFAULT_DAILY_RATE)
+        elif case.ticket_type == "노블레스석":
+            deduction = used_days * (case.noble_rate or 0)
+        else:
+            deduction = case.hours_used * (case.hourly_rate or DEFAULT_HOURLY_RATE)
+        refund = max(price - deduction, 0)
+    penalty = price * case.penalty_rate
+    return {
+        "used_days": used_days,
+        "deduction_amount": deduction,
+        "refund_amount": refund,
+        "penalty_amount": penalty,
+        "final_refund_amount": max(refund - penalty, 0),
+        "deposit_amount": deduction + penalty,
+        "over_limit": (case.refund_date - case.purchase_date).days > LIMIT_DAYS,
+    }
+
+
+def random_cases(count, seed=0):
+    """무작위 환불 건 (% 구간 경계/30일 경계가 자주 나오도록 일부는 경계값으로 맞춤)"""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        ticket_type = rng.choice(("기간권", "시간권", "노블레스석"))
+        policy = rng.choice(("일반", "% 규정"))
+        purchase = date(2025, 1, 1) + timedelta(days=rng.randint(0, 600))
+        days_given = total_hours = None
+        hours_used = 0
+        if ticket_type == "시간권":
+            total_hours = rng.choice((10, 20, 30, 50, 100, 150, 200))
+            hours_used = rng.choice((
+                rng.randint(0, total_hours),
+                math.ceil(total_hours * rng.choice((0.25, 0.5))),  # % 구간 경계
+                int(total_hours * rng.choice((0.25, 0.5))) - 1,
+            ))
+            hours_used = max(hours_used, 0)
+            elapsed = rng.randint(0, 60)
+        else:
+            days_given = rng.choice((7, 14, 28, 30, 31, 56, 60, 84, 90, 180))
+            elapsed = rng.choice((
+                rng.randint(0, days_given + 10),
+                math.ceil(days_given * rng.choice((0.25, 0.5))) - 1,  # 사용일수가 정확히 경계
+                LIMIT_DAYS, LIMIT_DAYS + 1,  # 30일 경계
+            ))
+            elapsed = max(elapsed, 0)
+        cases.append(RefundCase(
+            ticket_type=ticket_type,
+            policy=policy,
+            ticket_price=rng.randint(1, 60) * 5000,
+            purchase_date=purchase,
+            refund_date=purchase + timedelta(days=elapsed),
+            days_given=days_given,
+            hours_used=hours_used,
+            total_hours=total_hours,
+            daily_rate=rng.choice((None, 9000, 10000, 11000, 12000)),
+            hourly_rate=rng.choice((None, 1500, 2000, 2500)),
+            noble_rate=rng.choice((0, 13000, 15000, 20000)) if ticket_type == "노블레스석" else None,
+            penalty_rate=rng.choice((0.0, 0.1, 0.2)),
+        ))
+    return cases
+
+
+def boundary_cases():
+    """% 규정 구간 경계(정확히 25% / 50%, 바로 아래) 고정 케이스 (예전 main은 < 25, app은 <= 25로 달랐던 지점)"""
+    purchase = date(2025, 3, 1)
+    cases = []
+    for used_days in (24, 25, 26, 49, 50, 51):  # 부여일수 100일 → 사용률 = 사용일수
+        cases.append(RefundCase("기간권", "% 규정", 100000, purchase, purchase + timedelta(days=used_days - 1),
+                                days_given=100))
+    for hours_used in (24, 25, 49, 50):  # 부여시간 100시간
+        cases.append(RefundCase("시간권", "% 규정", 100000, purchase, purchase, hours_used=hours_used, total_hours=100))
+    return cases
+
+
+def cases_frame(cases):
+    """RefundCase 목록 → calculate_refunds 입력 DataFrame (CASE_COLUMNS 한글 열)"""
+    return pd.DataFrame({
+        "이용권종류": [c.ticket_type for c in cases],
+        "환불규정": [c.policy for c in cases],
+        "결제금액": [c.ticket_price for c in cases],
+        "결제일": [c.purchase_date for c in cases],
+        "환불요청일": [c.refund_date for c in cases],
+        "부여일수": [c.days_given for c in cases],
+        "사용시간": [c.hours_used for c in cases],
+        "부여시간": [c.total_hours for c in cases],
+        "1일요금": [c.daily_rate for c in cases],
+        "시간당요금": [c.hourly_rate for c in cases],
+        "노블레스석1일요금": [c.noble_rate for c in cases],
+        "위약금": [c.penalty_rate for c in cases],
+    })
+
+
+def _diff(expected, actual, fields=COMPARED_FIELDS):
+    """다른 항목만 {항목: (기준, 구현)}"""
+    diff = {}
+    for field in fields:
+        a, b = expected[field], actual[field]
+        if isinstance(a, bool) or isinstance(b, bool):
+            same = bool(a) == bool(b)
+        else:
+            same = abs(float(a) - float(b)) <= AMOUNT_TOLERANCE
+        if not same:
+            diff[field] = (a, b)
+    return diff
+
+
+def _case_json(case):
+    return json.dumps({k: str(v) if isinstance(v, date) else v for k, v in asdict(case).items()}, ensure_ascii=False)
+
+
+# --- 구현별 실행기: 기준값과 같은 키의 dict를 돌려준다 ---
+def run_engine(cases):
+    return [asdict(calculate_refund(case)) for case in cases]
+
+
+def run_batch(cases):
+    result = calculate_refunds(cases_frame(cases))
+    return [
+        {
+            "used_days": row["사용일수"], "deduction_amount": row["공제금액"], "refund_amount": row["환불금액"],
+            "penalty_amount": row["위약금액"], "final_refund_amount": row["최종환불금액"],
+            "deposit_amount": row["입금액"], "over_limit": row["30일초과"],
+        }
+        for row in result[["사용일수", "공제금액", "환불금액", "위약금액", "최종환불금액", "입금액", "30일초과"]]
+        .to_dict("records")
+    ]
+
+
+def run_curve(cases):
+    """시뮬레이션 곡선에서 각 건의 환불요청일(시간권은 사용시간) 지점 값을 꺼냄"""
+    outputs = []
+    for case in cases:
+        curve = refund_curve(case)
+        if case.ticket_type == "시간권":
+            row = curve[curve["사용시간"] == case.hours_used]
+        else:
+            row = curve[curve["환불요청일"] == pd.Timestamp(case.refund_date)]
+        if row.empty:  # 유효기간 밖의 환불요청일은 곡선에 없음
+            outputs.append(None)
+            continue
+        row = row.iloc[0]
+        outputs.append({
+            "used_days": row["사용일수"], "deduction_amount": row["공제금액"], "refund_amount": row["환불금액"],
+            "penalty_amount": row["위약금액"], "final_refund_amount": row["최종환불금액"],
+            "deposit_amount": row["입금액"], "over_limit": row["30일초과"],
+        })
+    return outputs
+
+
+def refund112_case(case):
+    """refund112가 받을 수 있는 입력만 남긴 건 (위약금/지점 요금 입력 없음, 노블레스석 1일 요금은 입력값)"""
+    return replace(case, daily_rate=None, hourly_rate=None, penalty_rate=0.0)
+
+
+def run_refund112(cases):
+    """RefundCalculator.process_calculation을 창 없이 호출 → {used_days, deduction_amount, refund_amount}"""
+    from refund112 import RefundCalculator
+
+    calculator = RefundCalculator.__new__(RefundCalculator)  # tk.Tk()를 만들지 않음
+    outputs = []
+    for case in cases:
+        calculator.daily_rate = case.noble_rate
+        data = {
+            "purchase_date": datetime.combine(case.purchase_date, datetime.min.time()),
+            "refund_date": datetime.combine(case.refund_date, datetime.min.time()),
+            "ticket_price": case.ticket_price,
+            "days_given": case.days_given or 0,
+            "hours_used": case.hours_used or 0,
+            "total_hours": case.total_hours or 0,
+            "valid_weeks": 0,
+        }
+        result = calculator.process_calculation(case.ticket_type, case.policy, data)
+        outputs.append({
+            "used_days": (case.refund_date - case.purchase_date).days + 1,
+            "deduction_amount": result["used"],
+            "refund_amount": result["refund"],
+        })
+    return outputs
+
+
+def run_app(cases):
+    """app.py 환불 계산기를 AppTest로 실행해 내역서의 공제/환불 금액을 읽음 (건마다 스크립트 1회 실행)"""
+    from streamlit.testing.v1 import AppTest
+
+    outputs = []
+    for case in cases:
+        at = AppTest.from_file(APP_PATH, default_timeout=30)
+        at.run()  # 첫 화면(사물함 마스터키)은 app.py 단독 실행 시 없는 함수라 예외가 날 수 있음
+        at.sidebar.radio[0].set_value("환불 계산기").run()
+        at.radio[0].set_value(case.ticket_type)
+        at.radio[1].set_value(case.policy).run()
+        at.number_input[0].set_value(case.ticket_price)
+        at.date_input[0].set_value(case.purchase_date)
+        at.date_input[1].set_value(case.refund_date)
+        if case.ticket_type == "시간권":
+            at.number_input[2].set_value(case.hours_used)
+            at.number_input[3].set_value(case.total_hours)
+        else:
+            at.number_input[1].set_value(case.days_given)
+            if case.ticket_type == "노블레스석":
+                at.number_input[2].set_value(case.noble_rate)
+        at.button[0].click().run()
+        text = at.text_area[0].value
+        amount = lambda label: int(text.split(label, 1)[1].split("원", 1)[0].replace(",", "").replace("-", "").strip())
+        outputs.append({
+            "used_days": (case.refund_date - case.purchase_date).days + 1,
+            "deduction_amount": amount("공제 금액 :"),
+            "refund_amount": amount("환불 금액 :"),
+        })
+    return outputs
+
+
+def app_case(case):
+    """app.py가 받을 수 있는 입력만 남긴 건 (위약금/지점 요금 입력 없음)"""
+    return replace(case, daily_rate=None, hourly_rate=None, penalty_rate=0.0)
+
+
+def check(name, runner, cases, fields=COMPARED_FIELDS, show=5):
+    """구현 하나 실행 → (불일치 목록, 초당 건수)"""
+    started = time.perf_counter()
+    outputs = runner(cases)
+    elapsed = time.perf_counter() - started
+    mismatches = []
+    for case, actual in zip(cases, outputs):
+        if actual is None:
+            continue
+        diff = _diff(reference_refund(case), actual, fields)
+        if diff:
+            mismatches.append((case, diff))
+    rate = len(cases) / elapsed if elapsed > 0 else float("inf")
+    print(f"{name:<10} {len(cases):>8,}건  {rate:>12,.0f}건/초  불일치 {len(mismatches):,}건")
+    for case, diff in mismatches[:show]:
+        print(f"    입력 {_case_json(case)}")
+        print(f"    차이 {json.dumps({k: [str(a), str(b)] for k, (a, b) in diff.items()}, ensure_ascii=False)}")
+    return mismatches, rate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="환불 계산 구현 일치 검사 + 성능 측정")
+    parser.add_argument("--cases", type=int, default=20000, help="무작위 환불 건 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--curves", type=int, default=200, help="시뮬레이션 곡선으로 확인할 건 수")
+    parser.add_argument("--app", type=int, default=4, help="경계 케이스 외에 app.py를 AppTest로 확인할 무작위 건 수 (느림)")
+    parser.add_argument("--show", type=int, default=5, help="구현마다 출력할 불일치 예시 수")
+    args = parser.parse_args(argv)
+
+    cases = boundary_cases() + random_cases(args.cases, args.seed)
+    legacy_fields = ("used_days", "deduction_amount", "refund_amount")
+    failed = 0
+    for name, runner, subset, fields in (
+        ("reference", lambda cs: [reference_refund(c) for c in cs], cases, COMPARED_FIELDS),
+        ("engine", run_engine, cases, COMPARED_FIELDS),
+        ("batch", run_batch, cases, COMPARED_FIELDS),
+        ("curve", run_curve, cases[:args.curves], COMPARED_FIELDS),
+        ("refund112", run_refund112, [refund112_case(c) for c in cases], legacy_fields),
+        ("app", run_app, [app_case(c) for c in cases[:len(boundary_cases()) + args.app]], legacy_fields),
+    ):
+        if not subset:
+            continue
+        mismatches, _ = check(name, runner, subset, fields, args.show)
+        failed += len(mismatches)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+# ✅ 이용권 환불 계산 엔진 (main / app / refund112가 모두 이 모듈을 사용)
+#    화면이나 입출력 없이 숫자만 계산한다.
+#
+#    일반 규정: 공제 금액 = 사용일수 × 1일 요금 (기간권/노블레스석) 또는 사용시간 × 시간당 요금 (시간권)
+#    % 규정   : 사용률 25% 미만 → 결제금액의 50% 환불, 50% 미만 → 25% 환불, 50% 이상 → 환불 불가
+#    위약금   : 결제금액 × 위약금률 (환불 금액에서 차감, 입금하실 금액에 추가)
+#    사용일수는 결제일을 포함해서 센다 (결제일 = 환불요청일이면 1일).
+
+TICKET_TYPES = ("기간권", "시간권", "노블레스석")
+POLICIES = ("일반", "% 규정")
+PENALTY_RATES = ("0%", "10%", "20%")
+
+DEFAULT_DAILY_RATE = 11000  # 기간권 1일 요금 (시트에 기간권금액이 없을 때)
+DEFAULT_HOURLY_RATE = 2000  # 시간권 시간당 요금 (시트에 시간권금액이 없을 때)
+LIMIT_DAYS = 30  # 결제 후 이 일수가 지나면 위약금/환불 제한 안내
+
+# % 규정 구간: (사용률 상한(미만), 환불 비율, 구간 설명)
+PERCENT_BANDS = (
+    (25, 0.5, "0~24% 환불 구간 : 결제금액의 50% 환불"),
+    (50, 0.25, "25~49% 환불 구간 : 결제금액의 25% 환불"),
+    (np.inf, 0.0, "50% 이상 사용 구간 : 환불 불가"),
+)
+
+
+def parse_rate(value):
+    """위약금률 입력값 → 비율 ("10%" → 0.1, 10 → 0.1, 0.1 → 0.1, 빈 값 → 0)"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return 0.0
+    if isinstance(value, str):
+        value = value.strip().rstrip("%").strip()
+        if not value:
+            return 0.0
+        return float(value) / 100
+    value = float(value)
+    return value / 100 if value > 1 else value
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+@dataclass(frozen=True)
+class RefundCase:
+    ticket_type: str  # 기간권 / 시간권 / 노블레스석
+    policy: str  # 일반 / % 규정
+    ticket_price: int
+    purchase_date: date
+    refund_date: date
+    days_given: int = None  # 기간권/노블레스석 전체 부여 일수
+    hours_used: float = None  # 시간권 사용 시간
+    total_hours: float = None  # 시간권 전체 부여 시간
+    daily_rate: int = None  # 기간권 1일 요금 (없으면 DEFAULT_DAILY_RATE)
+    hourly_rate: int = None  # 시간권 시간당 요금 (없으면 DEFAULT_HOURLY_RATE)
+    noble_rate: int = None  # 노블레스석 1일 요금
+    penalty_rate: float = 0.0  # 위약금률 (0.1 = 10%)
+
+
+@dataclass(frozen=True)
+class RefundResult:
+    used_days: int
+    percent_used: float  # % 규정일 때만 (일반 규정은 None)
+    deduction_amount: float  # 공제 금액 (사용 금액)
+    refund_amount: float  # 위약금 차감 전 환불 금액
+    penalty_amount: float
+    final_refund_amount: float
+    deposit_amount: float  # 입금하실 금액 (공제 금액 + 위약금)
+    usage_info: str
+    deduction_detail: str
+    over_limit: bool  # 결제 후 LIMIT_DAYS 초과 여부
+
+
+def percent_band(percent_used):
+    """사용률(%) → (환불 비율, 구간 설명)"""
+    for upper, ratio, label in PERCENT_BANDS:
+        if percent_used < upper:
+            return ratio, label
+    return PERCENT_BANDS[-1][1], PERCENT_BANDS[-1][2]
+
+
+def calculate_refund(case):
+    """환불 건 하나 계산 (이용권 종류가 TICKET_TYPES에 없으면 ValueError)"""
+    if case.ticket_type not in TICKET_TYPES:
+        raise ValueError(f"알 수 없는 이용권 종류: {case.ticket_type!r} ({', '.join(TICKET_TYPES)} 중 하나)")
+    purchase_date, refund_date = _as_date(case.purchase_date), _as_date(case.refund_date)
+    used_days = (refund_date - purchase_date).days + 1  # 결제일 포함
+    price = case.ticket_price
+    is_days = case.ticket_type in ("기간권", "노블레스석")
+
+    if case.policy == "% 규정":
+        if is_days:
+            percent_used = used_days / case.days_given * 100
+            usage_info = f"{percent_used:.1f}% 사용 ({used_days}일 사용)"
+        else:
+            percent_used = case.hours_used / case.total_hours * 100
+            usage_info = f"{percent_used:.1f}% 사용 ({case.hours_used}시간 사용)"
+        ratio, label = percent_band(percent_used)
+        refund_amount = price * ratio
+        deduction_amount = price - refund_amount
+        shown = refund_amount if ratio > 0 else deduction_amount
+        deduction_detail = f"{label} ({int(shown):,}원)"
+    else:
+        percent_used = None
+        if case.ticket_type == "기간권":
+            rate = case.daily_rate or DEFAULT_DAILY_RATE
+            deduction_amount = used_days * rate
+            usage_info = f"{used_days}일 사용"
+            deduction_detail = f"{used_days}일 × {int(rate):,}원"
+        elif case.ticket_type == "노블레스석":
+            rate = case.noble_rate or 0
+            deduction_amount = used_days * rate
+            usage_info = f"{used_days}일 사용"
+            deduction_detail = f"{used_days}일 × {int(rate):,}원 (노블레스석 1일 요금)"
+        else:
+            rate = case.hourly_rate or DEFAULT_HOURLY_RATE
+            deduction_amount = case.hours_used * rate
+            usage_info = f"{case.hours_used}시간 사용"
+            deduction_detail = f"{case.hours_used}시간 × {int(rate):,}원"
+        refund_amount = max(price - deduction_amount, 0)
+
+    penalty_amount = price * case.penalty_rate  # 결제금액 기준
+    return RefundResult(
+        used_days=used_days,
+        percent_used=percent_used,
+        deduction_amount=deduction_amount,
+        refund_amount=refund_amount,
+        penalty_amount=penalty_amount,
+        final_refund_amount=max(refund_amount - penalty_amount, 0),  # 음수 방지
+        deposit_amount=deduction_amount + penalty_amount,
+        usage_info=usage_info,
+        deduction_detail=deduction_detail,
+        over_limit=(refund_date - purchase_date).days > LIMIT_DAYS,
+    )
+
+
+# ✅ 일괄 계산 (월말 환불 검토 등): 입력 열 이름 → RefundCase 필드
+CASE_COLUMNS = {
+    "이용권종류": "ticket_type",
+    "환불규정": "policy",
+    "결제금액": "ticket_price",
+    "결제일": "purchase_date",
+    "환불요청일": "refund_date",
+    "부여일수": "days_given",
+    "사용시간": "hours_used",
+    "부여시간": "total_hours",
+    "1일요금": "daily_rate",
+    "시간당요금": "hourly_rate",
+    "노블레스석1일요금": "noble_rate",
+    "위약금": "penalty_rate",
+}
+REQUIRED_CASE_COLUMNS = ["이용권종류", "환불규정", "결제금액", "결제일", "환불요청일"]
+RESULT_COLUMNS = [
+    "사용일수", "사용률(%)", "환불구간", "공제금액", "위약금액", "환불금액", "최종환불금액", "입금액", "30일초과", "오류",
+]
+
+
+def load_cases(source):
+    """CSV/XLSX 경로 또는 파일 객체 → 환불 건 DataFrame (열 이름 공백 제거)"""
+    name = getattr(source, "name", source)
+    if str(name).lower().endswith((".xlsx", ".xls")):
+        frame = pd.read_excel(source, dtype=str)
+    else:
+        frame = pd.read_csv(source, dtype=str, encoding="utf-8-sig")
+    frame.columns = frame.columns.str.strip().str.replace(" ", "")
+    return frame
+
+
+def parse_number(value):
+    """셀 값 → 숫자 ("10,000원" → 10000.0, 빈 값/NaN → None)"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    text = "".join(ch for ch in str(value) if ch.isdigit() or ch in ".-")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def case_from_row(row):
+    """한글 열 이름의 행(dict) 하나 → RefundCase (영수증 생성 등 건별 처리용)"""
+    number = lambda key: parse_number(row.get(key))
+    integer = lambda key: int(number(key)) if number(key) is not None else None
+    policy = str(row.get("환불규정", "")).replace(" ", "")
+    return RefundCase(
+        ticket_type=str(row["이용권종류"]).strip(),
+        policy="% 규정" if policy in ("%규정", "%") else "일반",
+        ticket_price=integer("결제금액") or 0,
+        purchase_date=_as_date(row["결제일"]),
+        refund_date=_as_date(row["환불요청일"]),
+        days_given=integer("부여일수"),
+        hours_used=number("사용시간") or 0,
+        total_hours=number("부여시간"),
+        daily_rate=number("1일요금"),
+        hourly_rate=number("시간당요금"),
+        noble_rate=number("노블레스석1일요금"),
+        penalty_rate=parse_rate(row.get("위약금")),
+    )
+
+
+def _numeric(frame, column, default=np.nan):
+    if column not in frame.columns:
+        return np.full(len(frame), default, dtype=float)
+    values = frame[column].astype(str).str.replace(r"[^0-9.\-]", "", regex=True)
+    return pd.to_numeric(values, errors="coerce").fillna(default).to_numpy(dtype=float)
+
+
+def calculate_refunds(frame):
+    """환불 건 DataFrame을 한 번에 계산 (NumPy 벡터 연산, 행마다 파이썬 루프 없음)
+
+    입력 열은 CASE_COLUMNS의 한글 이름 (필수: REQUIRED_CASE_COLUMNS). 원래 열 뒤에 RESULT_COLUMNS를 붙여 반환한다.
+    이용권 종류가 TICKET_TYPES에 없는 행은 금액을 비우고 오류 열에 사유를 적는다 (calculate_refund는 ValueError).
+    """
+    missing = [col for col in REQUIRED_CASE_COLUMNS if col not in frame.columns]
+    if missing:
+        raise KeyError(f"환불 데이터에 {', '.join(missing)} 열이 없습니다.")
+
+    ticket_type = frame["이용권종류"].astype(str).str.strip().to_numpy()
+    percent_policy = frame["환불규정"].astype(str).str.replace(" ", "").isin(["%규정", "%"]).to_numpy()
+    price = _numeric(frame, "결제금액", 0.0)
+    purchase = pd.to_datetime(frame["결제일"], errors="coerce").to_numpy(dtype="datetime64[D]")
+    refund = pd.to_datetime(frame["환불요청일"], errors="coerce").to_numpy(dtype="datetime64[D]")
+    elapsed = (refund - purchase).astype("timedelta64[D]").astype(float)  # NaT → nan
+    used_days = elapsed + 1  # 결제일 포함
+
+    days_given = _numeric(frame, "부여일수")
+    hours_used = _numeric(frame, "사용시간", 0.0)
+    total_hours = _numeric(frame, "부여시간")
+    daily_rate = _numeric(frame, "1일요금", 0.0)
+    daily_rate = np.where(daily_rate > 0, daily_rate, DEFAULT_DAILY_RATE)
+    hourly_rate = _numeric(frame, "시간당요금", 0.0)
+    hourly_rate = np.where(hourly_rate > 0, hourly_rate, DEFAULT_HOURLY_RATE)
+    noble_rate = _numeric(frame, "노블레스석1일요금", 0.0)
+    if "위약금" in frame.columns:
+        penalty_rate = np.array([parse_rate(v) for v in frame["위약금"].to_numpy()], dtype=float)
+    else:
+        penalty_rate = np.zeros(len(frame))
+
+    unknown = ~np.isin(ticket_type, TICKET_TYPES)
+    is_time = ticket_type == "시간권"
+    is_noble = ticket_type == "노블레스석"
+
+    # % 규정
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent_used = np.where(is_time, hours_used / total_hours, used_days / days_given) * 100
+    uppers = np.array([band[0] for band in PERCENT_BANDS])
+    ratios = np.array([band[1] for band in PERCENT_BANDS])
+    labels = np.array([band[2] for band in PERCENT_BANDS], dtype=object)
+    band = np.searchsorted(uppers, percent_used, side="right").clip(0, len(PERCENT_BANDS) - 1)
+    percent_refund = price * ratios[band]
+    percent_deduction = price - percent_refund
+
+    # 일반 규정
+    normal_deduction = np.where(
+        is_time, hours_used * hourly_rate, used_days * np.where(is_noble, noble_rate, daily_rate)
+    )
+    normal_refund = np.maximum(price - normal_deduction, 0)
+
+    deduction = np.where(percent_policy, percent_deduction, normal_deduction)
+    refund_amount = np.where(percent_policy, percent_refund, normal_refund)
+    penalty = price * penalty_rate
+    valid_percent = percent_policy & np.isfinite(percent_used)
+
+    result = frame.copy()
+    result["사용일수"] = used_days
+    result["사용률(%)"] = np.where(valid_percent & ~unknown, np.round(percent_used, 1), np.nan)
+    result["환불구간"] = np.where(
+        unknown, "", np.where(valid_percent, labels[band], np.where(percent_policy, "", "일반 규정"))
+    )
+    result["공제금액"] = np.where(unknown, np.nan, deduction)
+    result["위약금액"] = np.where(unknown, np.nan, penalty)
+    result["환불금액"] = np.where(unknown, np.nan, refund_amount)
+    result["최종환불금액"] = np.where(unknown, np.nan, np.maximum(refund_amount - penalty, 0))
+    result["입금액"] = np.where(unknown, np.nan, deduction + penalty)
+    result["30일초과"] = elapsed > LIMIT_DAYS
+    result["오류"] = np.where(unknown, "알 수 없는 이용권종류 (" + ticket_type.astype(object) + ")", "")
+    return result
+
+
+# ✅ 환불 시뮬레이션 (what-if): 환불 요청일/사용 시간을 처음부터 끝까지 바꿔 가며 한 번에 계산
+def refund_curve(case):
+    """기간권/노블레스석은 결제일 ~ 만료일의 모든 환불요청일, 시간권은 사용시간 0 ~ 부여시간(1시간 단위, 마지막은
+    부여시간)을 calculate_refunds 한 번으로 계산한 DataFrame (나머지 조건은 case 그대로)
+    """
+    purchase = np.datetime64(_as_date(case.purchase_date), "D")
+    if case.ticket_type in ("기간권", "노블레스석"):
+        if not case.days_given:
+            raise ValueError("전체 부여 일수를 입력해야 시뮬레이션할 수 있습니다.")
+        refund_dates = purchase + np.arange(int(case.days_given))
+        hours_used = np.full(len(refund_dates), float(case.hours_used or 0))
+    else:
+        if not case.total_hours:
+            raise ValueError("전체 부여 시간을 입력해야 시뮬레이션할 수 있습니다.")
+        # 올림한 마지막 점은 부여시간으로 자른다 (10.5시간 → 0, 1, ..., 10, 10.5)
+        hours_used = np.unique(np.minimum(np.arange(int(np.ceil(case.total_hours)) + 1, dtype=float), case.total_hours))
+        refund_dates = np.full(len(hours_used), np.datetime64(_as_date(case.refund_date), "D"))
+
+    frame = pd.DataFrame({
+        "이용권종류": case.ticket_type,
+        "환불규정": case.policy,
+        "결제금액": float(case.ticket_price),
+        "결제일": np.full(len(refund_dates), purchase),
+        "환불요청일": refund_dates,
+        "부여일수": case.days_given,
+        "사용시간": hours_used,
+        "부여시간": case.total_hours,
+        "1일요금": case.daily_rate,
+        "시간당요금": case.hourly_rate,
+        "노블레스석1일요금": case.noble_rate,
+        "위약금": case.penalty_rate,
+    })
+    return calculate_refunds(frame)
+
+
+def curve_markers(case):
+    """시뮬레이션 그래프 기준선: [(x 값, 설명)] (% 구간 경계, 결제 후 LIMIT_DAYS 초과 시점)
+
+    x 값은 기간권/노블레스석이면 환불요청일(date), 시간권이면 사용시간.
+    """
+    markers = []
+    purchase = _as_date(case.purchase_date)
+    if case.ticket_type in ("기간권", "노블레스석"):
+        if not case.days_given:
+            return markers
+        for upper, _, _ in PERCENT_BANDS[:-1]:
+            used_days = int(np.ceil(case.days_given * upper / 100))  # 사용률이 처음 upper% 이상이 되는 사용일수
+            if used_days <= case.days_given:
+                markers.append((purchase + timedelta(days=used_days - 1), f"{upper:g}% 사용"))
+        if LIMIT_DAYS + 1 < case.days_given:  # 곡선의 마지막 환불요청일은 결제일 + (부여일수 - 1)
+            markers.append((purchase + timedelta(days=LIMIT_DAYS + 1), f"결제 후 {LIMIT_DAYS}일 초과"))
+    elif case.total_hours:
+        for upper, _, _ in PERCENT_BANDS[:-1]:
+            markers.append((case.total_hours * upper / 100, f"{upper:g}% 사용"))
+    return markers
@@ -0,0 +1,163 @@
+import os, sqlite3, time
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+import pytz
+
+
+# ✅ 환불 계산 장부 (로컬 SQLite, 추가만 가능)
+#    환불 금액을 계산할 때마다, 그리고 계좌 정보를 입력할 때마다 한 행씩 쌓는다 (수정/삭제는 트리거로 막음).
+#    전화번호(전체/뒤 4자리), 지점명, 환불요청일에 인덱스를 두어 수십만 건이어도 조회는 인덱스 범위 검색으로 끝난다.
+
+LEDGER_PATH = os.getenv("REFUND_LEDGER_PATH", os.path.join(".cache", "refund_ledger.db"))
+
+# 장부 열 → 화면 표시 이름
+LEDGER_COLUMNS = {
+    "created_at": "기록시각",
+    "kind": "구분",
+    "branch": "지점명",
+    "phone": "전화번호",
+    "ticket_type": "이용권",
+    "policy": "환불규정",
+    "purchase_date": "결제일",
+    "refund_date": "환불요청일",
+    "ticket_price": "결제금액",
+    "usage_info": "사용량",
+    "deduction_amount": "공제금액",
+    "penalty_rate": "위약금률",
+    "penalty_amount": "위약금액",
+    "final_refund_amount": "환불금액",
+    "deposit_amount": "입금액",
+    "account_holder": "예금주",
+    "bank_name": "은행명",
+    "account_number": "계좌번호",
+}
+KINDS = {"calculation": "계산", "account": "계좌입력"}
+
+
+def phone_digits(phone):
+    return "".join(ch for ch in str(phone or "") if ch.isdigit())
+
+
+def _text(value):
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return "" if value is None else str(value).strip()
+
+
+class RefundLedger:
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")  # 기록 중에도 다른 세션의 조회가 막히지 않게
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS refunds (
+                    id INTEGER PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    branch TEXT NOT NULL DEFAULT '',
+                    phone TEXT NOT NULL DEFAULT '',
+                    phone_digits TEXT NOT NULL DEFAULT '',
+                    phone_last4 TEXT NOT NULL DEFAULT '',
+                    ticket_type TEXT, policy TEXT, purchase_date TEXT, refund_date TEXT NOT NULL DEFAULT '',
+                    ticket_price INTEGER, usage_info TEXT, deduction_amount INTEGER,
+                    penalty_rate TEXT, penalty_amount INTEGER, final_refund_amount INTEGER, deposit_amount INTEGER,
+                    account_holder TEXT, bank_name TEXT, account_number TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_refunds_phone ON refunds (phone_digits, created_at);
+                CREATE INDEX IF NOT EXISTS idx_refunds_phone_last4 ON refunds (phone_last4, created_at);
+                CREATE INDEX IF NOT EXISTS idx_refunds_branch ON refunds (branch, created_at);
+                CREATE INDEX IF NOT EXISTS idx_refunds_refund_date ON refunds (refund_date);
+                CREATE TRIGGER IF NOT EXISTS refunds_no_update BEFORE UPDATE ON refunds
+                    BEGIN SELECT RAISE(ABORT, 'refund ledger is append-only'); END;
+                CREATE TRIGGER IF NOT EXISTS refunds_no_delete BEFORE DELETE ON refunds
+                    BEGIN SELECT RAISE(ABORT, 'refund ledger is append-only'); END;
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # 호출마다 새 연결 (세션 스레드마다 따로 사용), 성공 시 커밋 후 닫는다
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def record(self, refund, account=None, kind="calculation"):
+        """환불 계산 결과(st.session_state['refund_data'] 형식) 한 건 추가 → 행 id
+
+        account: {'account_holder', 'bank_name', 'account_number'} (계좌 입력 시)
+        """
+        return self.record_many([(refund, account, kind)])[0]
+
+    def record_many(self, entries):
+        """[(refund, account, kind)] 한 트랜잭션으로 추가 → 행 id 목록"""
+        now = datetime.now(pytz.timezone("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+        ids = []
+        with self._connect() as db:
+            for refund, account, kind in entries:
+                account = account or {}
+                digits = phone_digits(refund.get("phone"))
+                cursor = db.execute(
+                    """INSERT INTO refunds (
+                        created_at, kind, branch, phone, phone_digits, phone_last4,
+                        ticket_type, policy, purchase_date, refund_date, ticket_price, usage_info, deduction_amount,
+                        penalty_rate, penalty_amount, final_refund_amount, deposit_amount,
+                        account_holder, bank_name, account_number
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        refund.get("created_at") or now, kind, _text(refund.get("branch")),
+                        _text(refund.get("phone")), digits, digits[-4:],
+                        _text(refund.get("formatted_ticket_type")), _text(refund.get("policy")),
+                        _text(refund.get("purchase_date")), _text(refund.get("refund_date")),
+                        int(refund.get("ticket_price") or 0), _text(refund.get("usage_info")),
+                        int(refund.get("used_amount") or 0), _text(refund.get("penalty_rate")),
+                        int(refund.get("penalty_amount") or 0), int(refund.get("final_refund_amount") or 0),
+                        int(refund.get("deposit_amount") or 0),
+                        _text(account.get("account_holder")), _text(account.get("bank_name")),
+                        _text(account.get("account_number")),
+                    ),
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def history(self, phone=None, branch=None, since=None, until=None, limit=50):
+        """조건에 맞는 기록을 최신순으로 (DataFrame, 조회 ms)
+
+        phone: 전체 번호 또는 뒤 4자리, branch: 정확한 지점명, since/until: 환불요청일 범위 (포함)
+        """
+        where, params = [], []
+        digits = phone_digits(phone)
+        if digits:
+            where.append("phone_last4 = ?" if len(digits) == 4 else "phone_digits = ?")
+            params.append(digits)
+        if branch:
+            where.append("branch = ?")
+            params.append(branch)
+        if since:
+            where.append("refund_date >= ?")
+            params.append(_text(since))
+        if until:
+            where.append("refund_date <= ?")
+            params.append(_text(until))
+        sql = f"SELECT {', '.join(LEDGER_COLUMNS)} FROM refunds"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(int(limit))
+
+        started = time.perf_counter()
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        frame = pd.DataFrame(rows, columns=list(LEDGER_COLUMNS.values()))
+        frame["구분"] = frame["구분"].map(KINDS).fillna(frame["구분"])
+        return frame, elapsed_ms
+
+    def __len__(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM refunds").fetchone()[0]
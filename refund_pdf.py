@@ -0,0 +1,194 @@
+import collections, importlib.util, multiprocessing, os, sys, threading, time, types
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as RenderTimeout  # 3.11 전에는 내장 TimeoutError와 다른 클래스
+from concurrent.futures.process import BrokenProcessPool
+
+from refund_receipts import RECEIPT_CSS, receipt_filename, render_receipt
+
+
+# ✅ 환불 안내문 PDF (WeasyPrint)
+#    WeasyPrint는 CPU를 많이 쓰고 처음 폰트를 읽는 데 오래 걸리므로 Streamlit 프로세스에서 직접 렌더링하지 않고
+#    미리 띄워 둔 워커 프로세스 풀에서 만든다.
+#    - 워커는 시작할 때 weasyprint를 불러와 폰트 설정과 안내문 CSS를 한 번만 파싱하고, 빈 안내문을 한 장 그려 폰트 캐시를 채운다.
+#    - 웹폰트/외부 CSS(@import)는 워커마다 한 번만 내려받는다.
+#    - 안내문 HTML은 CSS 없이 넘기고 미리 파싱한 CSS를 적용한다 (한 장마다 수 KB짜리 CSS를 다시 파싱하지 않음).
+#    Streamlit 프로세스는 스레드가 많으므로 fork 대신 spawn으로 워커를 띄운다.
+#    spawn은 워커에서 __main__ 모듈을 다시 실행하는데, Streamlit은 __main__을 페이지 스크립트(main.py)로 바꿔 두므로
+#    워커를 띄우는 순간에만 빈 __main__으로 바꿔 둔다 (워커마다 앱 전체를 다시 불러오거나 실행하지 않도록).
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", max(1, min(4, (os.cpu_count() or 2) - 1))))
+RENDER_TIMEOUT = 60  # 한 장 렌더링 대기 한도 (초)
+
+_WARMUP_FIELDS = {
+    "branch": "", "phone": "", "formatted_ticket_type": "", "purchase_date": "", "refund_date": "",
+    "valid_period": "", "ticket_price": 0, "usage_info": "", "deduction_amount": 0, "deduction_detail": "",
+    "penalty_rate": "0%", "penalty_amount": 0, "final_refund_amount": 0, "deposit_amount": 0, "issued_at": "",
+}
+
+
+def available():
+    """weasyprint가 설치되어 있는지 (부모 프로세스는 weasyprint를 불러오지 않는다)"""
+    return importlib.util.find_spec("weasyprint") is not None
+
+
+# --- 워커 프로세스 쪽 (프로세스마다 한 번 준비) ---
+_weasyprint = _fonts = _stylesheet = None
+_fetched = {}
+
+
+def _fetch(url, *args, **kwargs):
+    """웹폰트/외부 CSS는 워커당 한 번만 내려받아 재사용"""
+    if url not in _fetched:
+        result = _weasyprint.default_url_fetcher(url, *args, **kwargs)
+        if "file_obj" in result:
+            result["string"] = result.pop("file_obj").read()
+        _fetched[url] = result
+    return dict(_fetched[url])
+
+
+def _init_worker():
+    global _weasyprint, _fonts, _stylesheet
+    import weasyprint
+    from weasyprint.text.fonts import FontConfiguration
+
+    _weasyprint = weasyprint
+    _fonts = FontConfiguration()
+    _stylesheet = weasyprint.CSS(string=RECEIPT_CSS, font_config=_fonts, url_fetcher=_fetch)
+    _render(_WARMUP_FIELDS)  # 폰트 로딩을 첫 요청 전에 끝내 둔다
+
+
+def _render(fields):
+    """영수증 필드 → (PDF 바이트, 렌더링 ms)"""
+    started = time.perf_counter()
+    document = _weasyprint.HTML(string=render_receipt(fields, embed_css=False), url_fetcher=_fetch)
+    pdf = document.write_pdf(stylesheets=[_stylesheet], font_config=_fonts)
+    return pdf, (time.perf_counter() - started) * 1000
+
+
+def _ready():
+    return os.getpid()
+
+
+# --- 부모 프로세스 쪽 ---
+class PdfRenderer:
+    """워커 프로세스 풀 + 렌더링 시간 집계 (프로세스 전체에서 하나)"""
+
+    def __init__(self, workers=PDF_WORKERS):
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._stats = {"renders": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0, "wait_ms": 0.0}
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                # 워커는 submit할 때 뜬다 → 워커 수만큼 바로 제출해 모두 띄우고, 그동안만 __main__을 비워 둔다
+                main = sys.modules.get("__main__")
+                sys.modules["__main__"] = types.ModuleType("__main__")
+                try:
+                    for _ in range(self.workers):
+                        pool.submit(_ready)
+                finally:
+                    sys.modules["__main__"] = main
+                self._pool = pool
+            return self._pool
+
+    def warm(self):
+        """워커를 모두 미리 띄움 (기다리지 않음). 첫 PDF 요청이 프로세스 시작/폰트 로딩을 기다리지 않게 한다"""
+        self._executor()
+
+    def render(self, fields):
+        """영수증 한 장 → PDF 바이트"""
+        started = time.perf_counter()
+        try:
+            pdf, render_ms = self._executor().submit(_render, fields).result(timeout=RENDER_TIMEOUT)
+        except BrokenProcessPool:
+            self._reset()
+            raise
+        except RenderTimeout:
+            self._reset(kill=True)
+            raise
+        except Exception:
+            self._record(error=True)
+            raise
+        self._record(render_ms, (time.perf_counter() - started) * 1000 - render_ms)
+        return pdf
+
+    def iter_pdf_files(self, receipt_fields, prefetch=None):
+        """영수증 필드들 → (파일 이름, PDF 바이트) 순서대로 생성 (모든 워커가 나눠서 렌더링)
+
+        입력은 한 번에 펼치지 않고 prefetch건(기본: 워커 수의 2배)만 앞서 제출한다.
+        한 장이 RENDER_TIMEOUT 안에 끝나지 않으면 풀을 버리고(멈춘 워커 종료) concurrent.futures.TimeoutError.
+        """
+        prefetch = prefetch or self.workers * 2
+        pool = self._executor()
+        pending = collections.deque()
+        fields_iter = iter(receipt_fields)
+        number = 0
+        try:
+            while True:
+                while len(pending) < prefetch:
+                    fields = next(fields_iter, None)
+                    if fields is None:
+                        break
+                    pending.append((fields, pool.submit(_render, fields)))
+                if not pending:
+                    return
+                fields, future = pending.popleft()
+                pdf, render_ms = future.result(timeout=RENDER_TIMEOUT)
+                self._record(render_ms)
+                number += 1
+                yield receipt_filename(number, fields, ".pdf"), pdf
+        except BrokenProcessPool:
+            self._reset()
+            raise
+        except RenderTimeout:
+            self._reset(kill=True)  # 멈춘 워커는 취소할 수 없으므로 풀째 버린다
+            raise
+        except Exception:
+            self._record(error=True)
+            raise
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _record(self, render_ms=0.0, wait_ms=0.0, error=False):
+        with self._lock:
+            stats = self._stats
+            if error:
+                stats["errors"] += 1
+                return
+            stats["renders"] += 1
+            stats["total_ms"] += render_ms
+            stats["wait_ms"] += max(wait_ms, 0.0)
+            stats["max_ms"] = max(stats["max_ms"], render_ms)
+            stats["last_ms"] = render_ms
+
+    def _reset(self, kill=False):
+        # 워커가 죽거나(메모리 부족 등) 멈추면 다음 요청 때 풀을 새로 만든다
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._stats["errors"] += 1
+        if pool is None:
+            return
+        processes = list((pool._processes or {}).values()) if kill else []
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()  # 멈춘 렌더링은 취소할 방법이 없어 워커를 종료한다 (CPU/메모리를 계속 잡지 않도록)
+
+    def stats(self):
+        """렌더링 집계 복사본 (avg_ms: 워커 안 렌더링 평균, wait_ms는 대기/전송 포함 누적)"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_ms"] = stats["total_ms"] / stats["renders"] if stats["renders"] else 0.0
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
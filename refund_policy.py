@@ -0,0 +1,110 @@
+import re
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+# ✅ 지점별 환불 정책표 (스냅샷마다 한 번만 생성)
+#    시트의 시간권금액/기간권금액/환불기간/환불응대금지 문자열을 미리 해석해 두고,
+#    환불 계산 화면과 일괄 검토는 이 표만 읽는다 (입력할 때마다 문자열을 다시 해석하지 않음).
+#    해석할 수 없는 값은 0으로 넘기지 않고 issues에 모아 스냅샷마다 한 번 알린다.
+
+BLANK_VALUES = {"", "0", "-", "N/A", "미입력", "없음", "X"}  # 값이 없는 것으로 보는 입력
+BLOCKED_VALUES = {"O", "Y", "예", "금지", "불가"}  # 환불응대금지 = 환불 응대 안 함
+
+_NUMBER = re.compile(r"\d[\d,]*")
+_DAYS = re.compile(r"^(\d+)\s*일?$")
+
+
+@dataclass(frozen=True)
+class BranchPolicy:
+    name: str
+    hourly_rate: int  # 시간권 시간당 요금 (없거나 해석 실패면 0)
+    daily_rate: int  # 기간권 1일 요금 (없거나 해석 실패면 0)
+    policy: str  # 일반 (시간권/기간권 금액이 있음) / % 규정
+    refund_days: int = None  # 환불 가능 기간 (일), 없으면 None
+    refund_period: str = ""  # 환불기간 원문
+    refund_blocked: bool = False  # 환불응대금지
+    restriction: str = ""  # 환불응대금지 원문 (O/X가 아닌 안내 문구 포함)
+
+
+def parse_amount(text):
+    """금액 문자열 → 정수 ("2,000원" → 2000, 빈 값 → 0). 숫자가 없거나 여러 개면 ValueError"""
+    text = str(text or "").strip()
+    if text in BLANK_VALUES:
+        return 0
+    numbers = _NUMBER.findall(text)
+    if len(numbers) != 1:
+        raise ValueError(f"금액을 해석할 수 없습니다: '{text}'")
+    return int(numbers[0].replace(",", ""))
+
+
+def parse_days(text):
+    """환불기간 문자열 → 일수 ("7일" → 7, 빈 값 → None). 형식이 다르면 ValueError"""
+    text = str(text or "").strip()
+    if text in BLANK_VALUES:
+        return None
+    match = _DAYS.match(text.replace("결제후", "").replace("결제 후", "").strip())
+    if not match:
+        raise ValueError(f"환불기간을 해석할 수 없습니다: '{text}'")
+    return int(match.group(1))
+
+
+def compile_policy(record, issues=None):
+    """BranchRecord → BranchPolicy (해석 실패는 issues에 (지점명, 항목, 오류) 추가)"""
+    def parse(parser, field, label):
+        try:
+            return parser(getattr(record, field))
+        except ValueError as e:
+            if issues is not None:
+                issues.append((record.name, label, str(e)))
+            return parser("")
+
+    hourly_rate = parse(parse_amount, "time_price", "시간권금액")
+    daily_rate = parse(parse_amount, "period_price", "기간권금액")
+    restriction = (record.refund_restriction or "").strip()
+    return BranchPolicy(
+        name=record.name,
+        hourly_rate=hourly_rate,
+        daily_rate=daily_rate,
+        policy="일반" if hourly_rate > 0 or daily_rate > 0 else "% 규정",
+        refund_days=parse(parse_days, "refund_period", "환불기간"),
+        refund_period=(record.refund_period or "").strip(),
+        refund_blocked=restriction.upper() in BLOCKED_VALUES,
+        restriction=restriction,
+    )
+
+
+class PolicyTable:
+    """지점명 → BranchPolicy (BranchStore.records로 한 번 생성)"""
+
+    def __init__(self, records):
+        self.issues = []  # [(지점명, 항목, 오류)]
+        self.by_name = {
+            name: compile_policy(record, self.issues) for name, record in records.by_name.items()
+        }
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def __len__(self):
+        return len(self.by_name)
+
+    def issues_frame(self):
+        return pd.DataFrame(self.issues, columns=["지점명", "항목", "오류"])
+
+    def fill_cases(self, frame):
+        """일괄 검토용: 지점명 열이 있으면 빈 환불규정/1일요금/시간당요금을 지점 정책으로 채운 복사본"""
+        if "지점명" not in frame.columns:
+            return frame
+        frame = frame.copy()
+        policies = [self.get(str(name).strip()) for name in frame["지점명"]]
+        for column, field in (("환불규정", "policy"), ("1일요금", "daily_rate"), ("시간당요금", "hourly_rate")):
+            values = [getattr(p, field) if p is not None and getattr(p, field) else None for p in policies]
+            filled = pd.Series(values, index=frame.index, dtype=object)
+            if column in frame.columns:
+                blank = frame[column].isna() | (frame[column].astype(str).str.strip() == "")
+                frame[column] = frame[column].where(~blank, filled)
+            else:
+                frame[column] = filled
+        return frame
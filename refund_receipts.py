@@ -0,0 +1,437 @@
+import html, io, os, zipfile
+from datetime import datetime, timedelta
+from string import Template
+
+import pytz
+
+from refund_engine import calculate_refund, case_from_row, parse_number
+
+
+# ✅ 환불 영수증 HTML
+#    CSS와 본문 템플릿은 모듈을 불러올 때 한 번만 만든다 (영수증마다 수 KB짜리 f-string을 다시 만들지 않음).
+#    한 장 다운로드는 CSS를 <style>로 넣은 단독 파일, 일괄 ZIP은 receipt.css 하나를 모든 영수증이 <link>로 참조한다.
+#    일괄 생성은 제너레이터로 한 장씩 만들어 ZIP 스트림에 바로 쓰므로 파일로 쓰면(write_receipts_zip, CLI) 건수와 상관없이
+#    메모리가 일정하다. 화면의 다운로드 버튼은 완성된 바이트가 필요해서 ZIP 전체를 메모리에 모은다 (main.refund_batch_page).
+
+RECEIPT_CSS = """
+@import url('https://cdn.jsdelivr.net/gh/orioncactus/Pretendard/dist/web/static/pretendard.css');
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+body {
+    font-family: 'Pretendard', sans-serif;
+    background-color: #f5f7fa;
+    color: #333;
+    line-height: 1.5;
+}
+.container {
+    max-width: 780px;
+    margin: 20px auto;
+    padding: 0 15px;
+}
+.receipt {
+    background-color: white;
+    padding: 25px;
+    border-radius: 12px;
+    box-shadow: 0 4px 12px rgba(0,0,0,0.08);
+    display: grid;
+    grid-template-columns: 1fr 1fr;
+    gap: 25px;
+    min-height: 580px;
+}
+.header {
+    grid-column: 1 / -1;
+    text-align: center;
+    padding-bottom: 15px;
+    margin-bottom: 15px;
+    border-bottom: 1px solid #e0e0e0;
+}
+.title {
+    font-size: 22px;
+    font-weight: 800;
+    color: #2c3e50;
+    margin-bottom: 5px;
+}
+.subtitle {
+    font-size: 14px;
+    color: #7f8c8d;
+    font-weight: 500;
+}
+.section {
+    margin-bottom: 20px;
+}
+.section-title {
+    font-size: 16px;
+    font-weight: 700;
+    color: #2c3e50;
+    margin-bottom: 12px;
+    padding-bottom: 6px;
+    border-bottom: 1px solid #f0f0f0;
+    position: relative;
+}
+.section-title:after {
+    content: "";
+    position: absolute;
+    bottom: -1px;
+    left: 0;
+    width: 50px;
+    height: 2px;
+    background-color: #4e73df;
+}
+.info-table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 8px 0;
+    font-size: 14px;
+}
+.info-table td {
+    padding: 10px 8px;
+    border-bottom: 1px solid #f5f5f5;
+    vertical-align: top;
+}
+.info-table tr:last-child td {
+    border-bottom: none;
+}
+.highlight {
+    color: #e74c3c;
+    font-weight: 700;
+}
+.positive {
+    color: #2ecc71;
+    font-weight: 700;
+}
+.account-info {
+    background-color: #f8fafc;
+    padding: 18px;
+    border-radius: 8px;
+    border: 1px solid #e9ecef;
+    margin-top: 10px;
+}
+.account-item {
+    margin-bottom: 10px;
+}
+.account-label {
+    font-size: 13px;
+    color: #7f8c8d;
+    margin-bottom: 3px;
+}
+.account-value {
+    font-weight: 600;
+    font-size: 15px;
+}
+.deposit-box {
+    background: linear-gradient(135deg, #f6f9ff, #e9f0ff);
+    padding: 20px;
+    border-radius: 8px;
+    text-align: center;
+    border: 1px solid #e0e8ff;
+    margin-top: 15px;
+}
+.deposit-amount {
+    font-size: 26px;
+    font-weight: 800;
+    color: #4e73df;
+    margin: 10px 0;
+}
+.footer {
+    grid-column: 1 / -1;
+    text-align: center;
+    margin-top: 15px;
+    font-size: 12px;
+    color: #95a5a6;
+    padding-top: 15px;
+    border-top: 1px solid #eee;
+}
+@media (max-width: 768px) {
+    .receipt {
+        grid-template-columns: 1fr;
+        min-height: auto;
+        padding: 20px;
+    }
+}
+"""
+
+_RECEIPT_BODY = Template("""
+<div class="container">
+    <div class="receipt">
+        <div class="header">
+            <div class="title">멘토즈 스터디카페</div>
+            <div class="subtitle">환불 요금 안내문</div>
+        </div>
+
+        <!-- 왼쪽 컬럼 -->
+        <div class="left-column">
+            <!-- 기본 정보 -->
+            <div class="section">
+                <div class="section-title">기본 정보</div>
+                <table class="info-table">
+                    <tr><td width="35%">지점명</td><td>$branch</td></tr>
+                    <tr><td>연락처</td><td>$phone</td></tr>
+                    <tr><td>이용권</td><td>$ticket_type</td></tr>
+                    <tr><td>결제일</td><td>$purchase_date</td></tr>
+                    <tr><td>환불요청일</td><td>$refund_date</td></tr>
+                    <tr><td>유효기간</td><td>$valid_period</td></tr>
+                </table>
+            </div>
+
+            <!-- 결제 정보 -->
+            <div class="section">
+                <div class="section-title">결제 및 공제 정보</div>
+                <table class="info-table">
+                    <tr><td width="40%">결제 금액</td><td>$ticket_price원</td></tr>
+                    <tr><td>사용량</td><td>$usage_info</td></tr>
+                    <tr><td>공제 금액</td><td class="highlight">-$deduction_amount원</td></tr>
+                    <tr><td>공제 내역</td><td>$deduction_detail</td></tr>
+                    <tr><td>위약금 ($penalty_rate)</td><td class="highlight">-$penalty_amount원</td></tr>
+                </table>
+            </div>
+        </div>
+
+        <!-- 오른쪽 컬럼 -->
+        <div class="right-column">
+            <!-- 환불 정보 -->
+            <div class="section">
+                <div class="section-title">환불 정보</div>
+                <table class="info-table">
+                    <tr><td width="45%">환불 금액</td><td class="positive">$final_refund_amount원</td></tr>
+                </table>
+            </div>
+
+            <!-- 환불 계좌 정보 -->
+            <div class="section">
+                <div class="section-title">환불 계좌 정보</div>
+                <div class="account-info">
+                    <div class="account-item">
+                        <div class="account-label">예금주</div>
+                        <div class="account-value">$account_holder</div>
+                    </div>
+                    <div class="account-item">
+                        <div class="account-label">은행명</div>
+                        <div class="account-value">$bank_name</div>
+                    </div>
+                    <div class="account-item">
+                        <div class="account-label">계좌번호</div>
+                        <div class="account-value">$account_number</div>
+                    </div>
+                </div>
+            </div>
+
+            <!-- 입금 금액 -->
+            <div class="deposit-box">
+                <div style="font-weight:600; color:#5a6c90;">입금 하실 금액</div>
+                <div class="deposit-amount">$deposit_amount원</div>
+                <div style="font-size:13px; color:#7f8c8d;">입금 확인 후 결제 내역이 전체 취소 됩니다.</div>
+            </div>
+        </div>
+
+        <div class="footer">
+            발급일: $issued_at
+        </div>
+    </div>
+</div>
+""")
+
+_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title</title>
+    $style
+</head>
+<body>
+$body
+</body>
+</html>
+""")
+
+CSS_FILENAME = "receipt.css"
+
+
+def _won(value):
+    return f"{int(value):,}"
+
+
+def _date(value):
+    return value.strftime("%Y-%m-%d") if hasattr(value, "strftime") else str(value)
+
+
+def render_receipt(fields, css_href=None, embed_css=True):
+    """영수증 한 장 HTML (css_href가 있으면 외부 CSS 참조, 없으면 CSS를 직접 포함. embed_css=False면 CSS 없음)
+
+    fields: branch, phone, formatted_ticket_type, purchase_date, refund_date, valid_period, ticket_price,
+    usage_info, deduction_amount, deduction_detail, penalty_rate, penalty_amount, final_refund_amount,
+    deposit_amount, account_holder, bank_name, account_number (없으면 빈 칸), issued_at (없으면 현재 시각)
+    """
+    text = lambda key: html.escape(str(fields.get(key) or ""))
+    issued_at = fields.get("issued_at") or datetime.now(pytz.timezone("Asia/Seoul")).strftime("%Y-%m-%d %H:%M")
+    body = _RECEIPT_BODY.substitute(
+        branch=text("branch"),
+        phone=text("phone"),
+        ticket_type=text("formatted_ticket_type"),
+        purchase_date=_date(fields["purchase_date"]),
+        refund_date=_date(fields["refund_date"]),
+        valid_period=text("valid_period"),
+        ticket_price=_won(fields["ticket_price"]),
+        usage_info=text("usage_info"),
+        deduction_amount=_won(fields["deduction_amount"]),
+        deduction_detail=text("deduction_detail"),
+        penalty_rate=text("penalty_rate"),
+        penalty_amount=_won(fields["penalty_amount"]),
+        final_refund_amount=_won(fields["final_refund_amount"]),
+        account_holder=text("account_holder"),
+        bank_name=text("bank_name"),
+        account_number=text("account_number"),
+        deposit_amount=_won(fields["deposit_amount"]),
+        issued_at=issued_at,
+    )
+    if css_href:
+        style = f'<link rel="stylesheet" href="{css_href}">'
+    elif embed_css:
+        style = f"<style>{RECEIPT_CSS}</style>"
+    else:
+        style = ""  # PDF 렌더러처럼 미리 파싱한 CSS를 따로 적용하는 경우
+    return _PAGE.substitute(title=f"환불 안내문 - {text('branch')}", style=style, body=body)
+
+
+def formatted_ticket_type(case):
+    if case.ticket_type == "시간권":
+        return f"시간권 ({case.total_hours}시간)"
+    return f"{case.ticket_type} ({case.days_given}일)"
+
+
+def valid_period(case, weeks_given=None):
+    """유효기간 문자열 (결제일 포함)"""
+    start = case.purchase_date
+    if case.ticket_type == "시간권":
+        if not weeks_given:
+            return "정보 없음"
+        end = start + timedelta(days=weeks_given * 7 - 1)
+    elif case.days_given:
+        end = start + timedelta(days=case.days_given - 1)
+    else:
+        return "정보 없음"
+    return f"{_date(start)} ~ {_date(end)}"
+
+
+def iter_receipt_fields(frame, issued_at=None):
+    """환불 건 DataFrame(refund_engine.CASE_COLUMNS 형식) → 영수증 필드 dict를 한 건씩 생성"""
+    issued_at = issued_at or datetime.now(pytz.timezone("Asia/Seoul")).strftime("%Y-%m-%d %H:%M")
+    for row in frame.to_dict("records"):
+        case = case_from_row(row)
+        result = calculate_refund(case)
+        weeks = parse_number(row.get("유효기간(주)"))
+        yield {
+            "branch": row.get("지점명", ""),
+            "phone": row.get("전화번호", ""),
+            "formatted_ticket_type": formatted_ticket_type(case),
+            "purchase_date": case.purchase_date,
+            "refund_date": case.refund_date,
+            "valid_period": valid_period(case, int(weeks) if weeks else None),
+            "ticket_price": case.ticket_price,
+            "usage_info": result.usage_info,
+            "deduction_amount": result.deduction_amount,
+            "deduction_detail": result.deduction_detail,
+            "penalty_rate": f"{case.penalty_rate * 100:g}%",
+            "penalty_amount": result.penalty_amount,
+            "final_refund_amount": result.final_refund_amount,
+            "deposit_amount": result.deposit_amount,
+            "account_holder": row.get("예금주", ""),
+            "bank_name": row.get("은행명", ""),
+            "account_number": row.get("계좌번호", ""),
+            "issued_at": issued_at,
+        }
+
+
+def receipt_filename(number, fields, extension=".html"):
+    """ZIP 안 파일 이름 (순번_지점명_전화번호뒤4자리.html)"""
+    keep = lambda text: "".join(ch for ch in str(text or "") if ch.isalnum())
+    phone = keep(fields.get("phone"))[-4:]
+    parts = [f"{number:05d}", keep(fields.get("branch")) or "지점", phone]
+    return "_".join(part for part in parts if part) + extension
+
+
+def iter_receipt_files(receipt_fields):
+    """(파일 이름, HTML) 생성 (모두 CSS_FILENAME 참조)"""
+    for number, fields in enumerate(receipt_fields, start=1):
+        yield receipt_filename(number, fields), render_receipt(fields, css_href=CSS_FILENAME)
+
+
+class _ChunkWriter(io.RawIOBase):
+    """zipfile이 쓴 바이트를 모아 두었다가 꺼내 가는 쓰기 전용 스트림 (seek 불가 → zipfile이 데이터 디스크립터 사용)"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_receipts_zip(receipt_files, index=False, stylesheet=True):
+    """(파일 이름, HTML 또는 PDF 바이트)들을 ZIP 바이트 조각으로 흘려보냄 (파일 하나를 쓸 때마다 조각 하나)
+
+    index=True면 전체 목록 index.html을 마지막에 추가한다 (목록은 파일 이름만 보관).
+    stylesheet=False면 receipt.css를 넣지 않는다 (PDF 묶음).
+    """
+    writer = _ChunkWriter()
+    entries = []
+    with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        if stylesheet:
+            archive.writestr(CSS_FILENAME, RECEIPT_CSS)
+            yield writer.take()
+        for filename, content in receipt_files:
+            archive.writestr(filename, content)
+            if index:
+                entries.append(filename)
+            yield writer.take()
+        if index:
+            archive.writestr("index.html", _index_page(entries, stylesheet))
+    yield writer.take()
+
+
+def _index_page(filenames, stylesheet=True):
+    """목록 페이지 (ZIP에 receipt.css가 없으면 CSS를 페이지 안에 넣는다)"""
+    items = "\n".join(
+        f'<li><a href="{html.escape(name)}">{html.escape(name)}</a></li>' for name in filenames
+    )
+    body = f"<div class=\"container\"><h2>환불 안내문 목록 ({len(filenames):,}건)</h2><ol>{items}</ol></div>"
+    style = f'<link rel="stylesheet" href="{CSS_FILENAME}">' if stylesheet else f"<style>{RECEIPT_CSS}</style>"
+    return _PAGE.substitute(title="환불 안내문 목록", style=style, body=body)
+
+
+def write_receipts_zip(frame, path, index=False):
+    """CLI/배치용: 환불 건 DataFrame → ZIP 파일 (스트리밍으로 기록)"""
+    with open(path, "wb") as f:
+        for chunk in stream_receipts_zip(iter_receipt_files(iter_receipt_fields(frame)), index=index):
+            f.write(chunk)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from refund_engine import load_cases
+
+    parser = argparse.ArgumentParser(description="환불 건 CSV/XLSX → 환불 안내문 HTML ZIP")
+    parser.add_argument("cases")
+    parser.add_argument("output")
+    parser.add_argument("--index", action="store_true", help="index.html 목록 페이지 포함")
+    args = parser.parse_args()
+    write_receipts_zip(load_cases(args.cases), args.output, index=args.index)
+    print(f"{args.output} ({os.path.getsize(args.output):,} bytes)")
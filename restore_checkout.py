@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime, timedelta
+from checkout_fees import DEFAULT_FEE_RULE, overstay_fee
 
 class RestoreCheckoutApp:
     def __init__(self, root):
@@ -57,18 +58,17 @@ class RestoreCheckoutApp:
             lost_hours = lost_minutes // 60
             remaining_minutes = lost_minutes % 60  # 초과된 분 계산
 
-            # 초과 요금 계산 (30분당 1,000원)
-            extra_fee_units = lost_minutes // 30  # 30분 단위로 나누기
-            extra_fee = extra_fee_units * 1000  # 30분당 1,000원 적용
+            # 초과 요금 계산 (기본 규정: 30분당 1,000원)
+            extra_fee = overstay_fee(lost_minutes)
 
             # ✅ 미처리된 기간 (퇴실 시간 ~ 현재 시간)
             period_text = f"📅 미처리 기간: {checkout_datetime.strftime('%Y%m%d %H:%M')} ~ {now.strftime('%Y%m%d %H:%M')}"
 
-            # ✅ 초과 요금 설명 추가 (30분당 1,000원 고정 표시)
+            # ✅ 초과 요금 설명 추가 (적용한 규정 표시)
             result_text = (
                 f"{period_text}\n"
                 f"⏳ 미처리 시간: {lost_hours}시간 {remaining_minutes}분\n"
-                f"💰 초과 요금: {extra_fee:,}원 (30분당 1,000원)"
+                f"💰 초과 요금: {extra_fee:,}원 ({DEFAULT_FEE_RULE.label})"
             )
 
             self.result_label.config(text=result_text, justify="left", anchor="w")  # ✅ 왼쪽 정렬 적용
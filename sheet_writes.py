@@ -0,0 +1,179 @@
+import bisect, math
+
+
+# ✅ 시트 쓰기: 편집 전/후 DataFrame을 비교해 바뀐 셀·추가 행·삭제 행만 한 번의 batch_update로 전송
+#    ops 형식: {"updates": {행번호: {열번호: 값}}, "appends": [[값, ...]], "deletes": [행번호, ...]}
+#    행번호는 시트 기준 1부터 (1행은 헤더, DataFrame 인덱스 i → i + 2행), 열번호는 0부터
+
+
+class SheetConflictError(Exception):
+    """마지막으로 읽은 뒤 다른 곳에서 시트가 수정된 경우"""
+
+
+def cell_text(value):
+    """셀에 쓸 문자열로 변환 (None/NaN은 빈 칸)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def empty_ops():
+    return {"updates": {}, "appends": [], "deletes": []}
+
+
+def is_empty(ops):
+    return not (ops["updates"] or ops["appends"] or ops["deletes"])
+
+
+def diff_frames(original, edited, view_index=None):
+    """original(시트 전체)과 edited(편집 결과)를 비교해 ops 생성
+
+    view_index: 편집기에 표시됐던 행의 인덱스 (검색으로 걸러진 경우). 이 중 edited에 없는 행은 삭제로,
+    original에 없는 인덱스의 행은 추가로 처리한다. 표시되지 않았던 행은 건드리지 않는다.
+    """
+    view_index = original.index if view_index is None else view_index
+    edited = edited.reindex(columns=original.columns)  # 열은 이름 기준으로 맞춘다
+    visible = set(view_index)
+    ops = empty_ops()
+
+    seen = set()
+    for label, row in zip(edited.index, edited.itertuples(index=False)):
+        values = [cell_text(v) for v in row]
+        if label in visible and label not in seen:
+            seen.add(label)
+            before = original.loc[label]
+            changed = {
+                col: value for col, value in enumerate(values)
+                if value != cell_text(before.iloc[col])
+            }
+            if changed:
+                ops["updates"][original.index.get_loc(label) + 2] = changed
+        elif any(values):
+            ops["appends"].append(values)
+
+    ops["deletes"] = sorted(original.index.get_loc(label) + 2 for label in visible - seen)
+    return ops
+
+
+def merge_ops(older, newer):
+    """같은 스냅샷 기준의 두 ops를 하나로 합침 (같은 행 수정은 셀 단위로 합치고, 삭제된 행의 수정은 버림)"""
+    merged = empty_ops()
+    deletes = set(older["deletes"]) | set(newer["deletes"])
+    for ops in (older, newer):
+        for row_number, cells in ops["updates"].items():
+            if row_number not in deletes:
+                merged["updates"].setdefault(row_number, {}).update(cells)
+        merged["appends"].extend(ops["appends"])
+    merged["deletes"] = sorted(deletes)
+    return merged
+
+
+def shift_ops(ops, deleted_rows):
+    """deleted_rows가 삭제된 뒤의 행 번호로 ops를 옮김 (삭제된 행을 대상으로 한 변경은 버림)"""
+    deleted_rows = sorted(set(deleted_rows))
+    if not deleted_rows:
+        return ops
+    gone = set(deleted_rows)
+
+    def shifted(row_number):
+        return row_number - bisect.bisect_left(deleted_rows, row_number)
+
+    return {
+        "updates": {shifted(r): cells for r, cells in ops["updates"].items() if r not in gone},
+        "appends": ops["appends"],
+        "deletes": [shifted(r) for r in ops["deletes"] if r not in gone],
+    }
+
+
+def _cell_data(values):
+    return {"values": [{"userEnteredValue": {"stringValue": v}} for v in values]}
+
+
+def build_batch_requests(sheet_id, ops):
+    """ops를 spreadsheets.batchUpdate 요청 목록으로 변환 (수정 → 추가 → 삭제 순서)"""
+    requests = []
+
+    # ✅ 수정: 한 행에서 연속된 열은 하나의 updateCells로 묶는다
+    for row_number, cells in sorted(ops["updates"].items()):
+        run = []
+        for col in sorted(cells) + [None]:
+            if run and (col is None or col != run[-1] + 1):
+                requests.append({"updateCells": {
+                    "start": {"sheetId": sheet_id, "rowIndex": row_number - 1, "columnIndex": run[0]},
+                    "rows": [_cell_data([cells[c] for c in run])],
+                    "fields": "userEnteredValue",
+                }})
+                run = []
+            if col is not None:
+                run.append(col)
+
+    # ✅ 추가: 마지막 행 뒤에 한 번에 붙인다
+    if ops["appends"]:
+        requests.append({"appendCells": {
+            "sheetId": sheet_id,
+            "rows": [_cell_data(row) for row in ops["appends"]],
+            "fields": "userEnteredValue",
+        }})
+
+    # ✅ 삭제: 아래쪽 행부터 지워야 위쪽 행 번호가 밀리지 않는다 (연속된 행은 한 범위로)
+    for start, end in reversed(_row_ranges(ops["deletes"])):
+        requests.append({"deleteDimension": {"range": {
+            "sheetId": sheet_id, "dimension": "ROWS", "startIndex": start - 1, "endIndex": end,
+        }}})
+    return requests
+
+
+def _row_ranges(row_numbers):
+    ranges = []
+    for row_number in sorted(set(row_numbers)):
+        if ranges and ranges[-1][1] == row_number - 1:
+            ranges[-1][1] = row_number
+        else:
+            ranges.append([row_number, row_number])
+    return ranges
+
+
+def apply_ops_to_values(values, ops):
+    """로컬 스냅샷 값에 ops 반영 (시트에 쓴 결과와 같은 새 목록 반환)"""
+    values = [list(row) for row in values]
+    for row_number, cells in ops["updates"].items():
+        row = values[row_number - 1]
+        for col, value in cells.items():
+            row.extend([""] * (col + 1 - len(row)))
+            row[col] = value
+    values.extend(list(row) for row in ops["appends"])
+    for row_number in sorted(set(ops["deletes"]), reverse=True):
+        del values[row_number - 1]
+    return values
+
+
+def write_ops(connection, ops, expected_revision=None):
+    """ops를 batch_update 한 번으로 전송하고 쓰기 후 수정 시각 반환
+
+    expected_revision이 현재 시트 수정 시각과 다르면 행 번호가 어긋날 수 있으므로 쓰지 않는다.
+    """
+    def write(c):
+        spreadsheet = c.spreadsheet()
+        if expected_revision is not None and spreadsheet.get_lastUpdateTime() != expected_revision:
+            raise SheetConflictError("다른 사용자가 먼저 시트를 수정했습니다. 새로고침 후 다시 저장해주세요.")
+        spreadsheet.batch_update({"requests": build_batch_requests(c.worksheet().id, ops)})
+        return spreadsheet.get_lastUpdateTime()
+
+    return connection.call(write)
+
+
+def append_rows(connection, rows, expected_revision=None):
+    """행 추가만 필요한 경우의 빠른 경로 (values.append 호출 1회)
+
+    쓰기 후 수정 시각을 반환한다. 쓰기 전 시트가 expected_revision과 달랐다면(다른 곳에서 수정됨)
+    로컬 스냅샷에 그대로 붙일 수 없으므로 None을 반환한다.
+    """
+    rows = [[cell_text(v) for v in row] for row in rows]
+
+    def write(c):
+        spreadsheet = c.spreadsheet()
+        unchanged = spreadsheet.get_lastUpdateTime() == expected_revision
+        c.worksheet().append_rows(rows, value_input_option="RAW")
+        return spreadsheet.get_lastUpdateTime() if unchanged else None
+
+    return connection.call(write)
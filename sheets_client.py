@@ -0,0 +1,82 @@
+import threading
+
+import gspread
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+
+
+# ✅ 프로세스 전체에서 재사용하는 Google Sheets 연결
+#    인증/문서 조회는 처음 한 번만 하고, 토큰 만료 시 갱신, 인증 오류 시 재연결한다.
+
+def is_auth_error(error):
+    """재연결로 해결될 수 있는 인증 오류인지 확인"""
+    if isinstance(error, RefreshError):
+        return True
+    if isinstance(error, gspread.exceptions.APIError):
+        return getattr(error.response, "status_code", None) == 401
+    return False
+
+
+class SheetsConnection:
+    def __init__(self, authorize, title, worksheet_title, key=None):
+        self.authorize = authorize  # 인자 없이 호출하면 gspread 클라이언트를 반환하는 함수
+        self.title = title
+        self.worksheet_title = worksheet_title
+        self.key = key  # 문서 key (없으면 처음 한 번만 이름으로 찾고 기억)
+        self._client = None
+        self._spreadsheet = None
+        self._worksheet = None
+        self._lock = threading.RLock()
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self.authorize()
+            else:
+                self._refresh_token()
+            return self._client
+
+    def spreadsheet(self):
+        with self._lock:
+            if self._spreadsheet is None:
+                client = self.client()
+                if self.key:
+                    self._spreadsheet = client.open_by_key(self.key)
+                else:
+                    # ✅ 이름 조회(Drive 검색)는 최초 1회만, 이후에는 key로 연다
+                    self._spreadsheet = client.open(self.title)
+                    self.key = self._spreadsheet.id
+            else:
+                self._refresh_token()
+            return self._spreadsheet
+
+    def worksheet(self):
+        with self._lock:
+            if self._worksheet is None:
+                self._worksheet = self.spreadsheet().worksheet(self.worksheet_title)
+            else:
+                self._refresh_token()
+            return self._worksheet
+
+    def reset(self):
+        """클라이언트와 핸들을 버리고 다음 호출 때 다시 인증 (문서 key는 유지)"""
+        with self._lock:
+            self._client = None
+            self._spreadsheet = None
+            self._worksheet = None
+
+    def call(self, fn):
+        """fn(connection) 실행, 인증 오류가 나면 재연결 후 한 번만 다시 시도"""
+        try:
+            return fn(self)
+        except Exception as e:
+            if not is_auth_error(e):
+                raise
+            self.reset()
+            return fn(self)
+
+    def _refresh_token(self):
+        # ✅ 만료된 토큰은 요청 전에 미리 갱신 (가짜 클라이언트에는 auth가 없음)
+        credentials = getattr(self._client, "auth", None)
+        if credentials is not None and getattr(credentials, "expired", False):
+            credentials.refresh(Request())
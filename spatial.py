@@ -0,0 +1,98 @@
+import math, threading
+
+from rtree import index as rtree_index
+
+
+# ✅ 가까운 지점 찾기용 공간 인덱스 (R-tree)
+#    좌표는 서울 위도 기준 등장방형 투영(km)으로 넣어서 평면 거리 순서가 실제 거리 순서와 거의 같게 하고,
+#    후보를 조금 넉넉히 뽑은 뒤 하버사인 거리로 다시 정렬한다.
+#    지점 좌표가 바뀌면 바뀐 지점만 지우고 다시 넣는다 (전체 재생성 없음).
+
+EARTH_RADIUS_KM = 6371.0088
+_REF_LAT = math.radians(37.5)
+_KM_PER_DEG_LAT = 110.574
+_KM_PER_DEG_LNG = 111.320 * math.cos(_REF_LAT)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """두 좌표 사이의 거리 (km)"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _project(lat, lng):
+    x, y = lng * _KM_PER_DEG_LNG, lat * _KM_PER_DEG_LAT
+    return (x, y, x, y)
+
+
+def parse_coordinate(text):
+    """"37.5, 127.0" 형식이면 (위도, 경도), 아니면 None"""
+    parts = str(text).replace(" ", "").split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lng = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if -90 <= lat <= 90 and -180 <= lng <= 180:
+        return lat, lng
+    return None
+
+
+class BranchSpatialIndex:
+    def __init__(self):
+        self._index = rtree_index.Index()
+        self._entries = {}  # 지점명 → (id, 위도, 경도, 주소)
+        self._names = {}  # id → 지점명
+        self._ids = iter(range(1, 2 ** 62))
+        self._source = None  # 마지막으로 반영한 BranchStore.locations
+        self._lock = threading.Lock()
+
+    def sync(self, locations):
+        """지점 좌표표(BranchStore.locations)를 반영 (같은 표면 바로 반환, 바뀐 지점만 갱신)
+
+        반환값: (추가, 삭제) 건수. 좌표가 바뀐 지점은 삭제 1 + 추가 1로 센다.
+        """
+        with self._lock:
+            if locations is self._source:
+                return 0, 0
+            wanted = {}
+            for name, address, lat, lng in zip(locations["지점명"], locations["주소"], locations["위도"], locations["경도"]):
+                name = str(name).strip()
+                if name and name not in wanted and not (math.isnan(lat) or math.isnan(lng)):
+                    wanted[name] = (float(lat), float(lng), address)
+
+            removed = added = 0
+            for name, (entry_id, lat, lng, address) in list(self._entries.items()):
+                if wanted.get(name) != (lat, lng, address):
+                    self._index.delete(entry_id, _project(lat, lng))
+                    del self._entries[name], self._names[entry_id]
+                    removed += 1
+            for name, (lat, lng, address) in wanted.items():
+                if name not in self._entries:
+                    entry_id = next(self._ids)
+                    self._index.insert(entry_id, _project(lat, lng))
+                    self._entries[name] = (entry_id, lat, lng, address)
+                    self._names[entry_id] = name
+                    added += 1
+            self._source = locations
+            return added, removed
+
+    def nearest(self, lat, lng, k=5):
+        """(lat, lng)에서 가까운 지점 k개: [(지점명, 주소, 거리 km)] 가까운 순"""
+        with self._lock:
+            if not self._entries:
+                return []
+            # 투영 오차를 감안해 후보를 넉넉히 뽑고 실제 거리로 다시 정렬
+            candidates = list(self._index.nearest(_project(lat, lng), min(len(self._entries), k * 2 + 4)))
+            results = []
+            for entry_id in candidates:
+                name = self._names[entry_id]
+                _, b_lat, b_lng, address = self._entries[name]
+                results.append((name, address, haversine_km(lat, lng, b_lat, b_lng)))
+        results.sort(key=lambda r: r[2])
+        return results[:k]
+
+    def __len__(self):
+        return len(self._entries)
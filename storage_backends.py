@@ -0,0 +1,218 @@
+import csv, json, os, sqlite3, tempfile, threading
+from contextlib import contextmanager
+
+import sheet_writes
+from branch_store import SHEET_COLUMNS
+from sheet_writes import SheetConflictError, apply_ops_to_values, cell_text
+
+
+# ✅ 지점 데이터 저장소 (Google Sheets / SQLite / CSV)
+#    모든 백엔드는 같은 인터페이스를 제공한다:
+#      revision()                       → 변경 여부 확인용 값 (바뀌었을 때만 전체를 다시 읽음)
+#      read_values()                    → 헤더 포함 전체 값 (시트와 같은 2차원 문자열 목록)
+#      write_ops(ops, expected_revision) → ops 반영 후 새 revision (다르면 SheetConflictError)
+#      append_rows(rows, expected_revision) → 행 추가 후 새 revision (미리 바뀌어 있었으면 None)
+#    행 번호와 ops 형식은 sheet_writes와 같다 (1행은 헤더).
+#
+#    BRANCH_BACKEND 환경변수로 선택: "sheets"(기본) / "sqlite" / "csv", 경로는 BRANCH_BACKEND_PATH
+#    (sqlite/csv 파일이 없거나 비어 있으면 시트와 같은 헤더 행만 있는 상태로 만든다)
+#    SQLite 파일 초기화: SqliteBackend("branches.db").replace_values(CsvBackend("branches.csv").read_values())
+
+BACKENDS = ("sheets", "sqlite", "csv")
+
+
+class SheetsBackend:
+    """Google Sheets (sheets_client.SheetsConnection 사용)"""
+
+    name = "sheets"
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def revision(self):
+        # Drive 메타데이터(modifiedTime)만 조회하므로 전체 값 조회보다 훨씬 가볍다
+        return self.connection.call(lambda c: c.spreadsheet().get_lastUpdateTime())
+
+    def read_values(self):
+        return self.connection.call(lambda c: c.worksheet().get_all_values())
+
+    def write_ops(self, ops, expected_revision=None):
+        return sheet_writes.write_ops(self.connection, ops, expected_revision=expected_revision)
+
+    def append_rows(self, rows, expected_revision=None):
+        return sheet_writes.append_rows(self.connection, rows, expected_revision=expected_revision)
+
+
+class CsvBackend:
+    """CSV 파일 하나 (오프라인 모드). 파일 수정 시각과 크기를 revision으로 사용"""
+
+    name = "csv"
+
+    def __init__(self, path, header=None):
+        self.path = path
+        self._lock = threading.Lock()
+        if header and not os.path.exists(path):
+            self._write([list(header)])  # 첫 실행: 헤더만 있는 파일 (빈 목록을 돌려주면 화면이 헤더 없이 깨진다)
+
+    def revision(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def read_values(self):
+        try:
+            with open(self.path, newline="", encoding="utf-8-sig") as f:
+                return [row for row in csv.reader(f)]
+        except FileNotFoundError:
+            return []
+
+    def write_ops(self, ops, expected_revision=None):
+        with self._lock:
+            if expected_revision is not None and self.revision() != expected_revision:
+                raise SheetConflictError("다른 사용자가 먼저 파일을 수정했습니다. 새로고침 후 다시 저장해주세요.")
+            return self._write(apply_ops_to_values(self.read_values(), ops))
+
+    def append_rows(self, rows, expected_revision=None):
+        rows = [[cell_text(v) for v in row] for row in rows]
+        with self._lock:
+            unchanged = self.revision() == expected_revision
+            revision = self._write(self.read_values() + rows)
+            return revision if unchanged else None
+
+    def replace_values(self, values):
+        with self._lock:
+            return self._write(values)
+
+    def _write(self, values):
+        # 임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(values)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self.revision()
+
+
+class SqliteBackend:
+    """로컬 SQLite 파일
+
+    행마다 (시트 행 번호, 셀 값 JSON)을 저장하고 행 번호에 인덱스를 둔다 (행 단위 수정/삭제가 SQL 한 번).
+    지점 검색은 다른 백엔드와 같이 스냅샷의 BranchSearchIndex(초성 검색 포함)가 맡는다.
+    revision은 쓰기마다 1씩 늘어나는 번호.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, header=None):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS branch_rows (
+                    id INTEGER PRIMARY KEY,
+                    row_number INTEGER NOT NULL,
+                    cells TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_branch_rows_row_number ON branch_rows (row_number);
+                INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', '0');
+            """)
+            if header and db.execute("SELECT 1 FROM branch_rows LIMIT 1").fetchone() is None:
+                self._insert(db, [list(header)])  # 첫 실행: 헤더 행만
+
+    @contextmanager
+    def _connect(self):
+        # 호출마다 새 연결 (화면 스레드와 쓰기 대기열 스레드가 함께 사용), 성공 시 커밋 후 닫는다
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def revision(self):
+        with self._connect() as db:
+            return self._revision(db)
+
+    @staticmethod
+    def _revision(db):
+        return "sqlite#" + db.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    def _bump(self, db):
+        db.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision'")
+        return self._revision(db)
+
+    def read_values(self):
+        with self._connect() as db:
+            return [json.loads(cells) for cells, in db.execute("SELECT cells FROM branch_rows ORDER BY row_number")]
+
+    def write_ops(self, ops, expected_revision=None):
+        with self._lock, self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            if expected_revision is not None and self._revision(db) != expected_revision:
+                raise SheetConflictError("다른 사용자가 먼저 데이터를 수정했습니다. 새로고침 후 다시 저장해주세요.")
+
+            for row_number, cells in ops["updates"].items():
+                row = db.execute("SELECT id, cells FROM branch_rows WHERE row_number = ?", (row_number,)).fetchone()
+                if row is None:
+                    continue
+                values = json.loads(row[1])
+                for col, value in cells.items():
+                    values.extend([""] * (col + 1 - len(values)))
+                    values[col] = value
+                db.execute("UPDATE branch_rows SET cells = ? WHERE id = ?", (json.dumps(values, ensure_ascii=False), row[0]))
+
+            self._insert(db, ops["appends"])
+
+            # 아래쪽 행부터 지우고 뒤쪽 행 번호를 당긴다
+            for row_number in sorted(set(ops["deletes"]), reverse=True):
+                db.execute("DELETE FROM branch_rows WHERE row_number = ?", (row_number,))
+                db.execute("UPDATE branch_rows SET row_number = row_number - 1 WHERE row_number > ?", (row_number,))
+            return self._bump(db)
+
+    def append_rows(self, rows, expected_revision=None):
+        rows = [[cell_text(v) for v in row] for row in rows]
+        with self._lock, self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            unchanged = self._revision(db) == expected_revision
+            self._insert(db, rows)
+            revision = self._bump(db)
+            return revision if unchanged else None
+
+    def replace_values(self, values):
+        """전체 값을 교체 (CSV/시트에서 옮겨올 때 사용)"""
+        with self._lock, self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM branch_rows")
+            self._insert(db, values)
+            return self._bump(db)
+
+    def _insert(self, db, rows):
+        start = db.execute("SELECT COALESCE(MAX(row_number), 0) FROM branch_rows").fetchone()[0] + 1
+        db.executemany(
+            "INSERT INTO branch_rows (row_number, cells) VALUES (?, ?)",
+            [(start + i, json.dumps(list(row), ensure_ascii=False)) for i, row in enumerate(rows)],
+        )
+
+
+def create_backend(kind, path=None, connection=None, header=SHEET_COLUMNS):
+    """설정값으로 백엔드 생성 (sheets는 connection, sqlite/csv는 path 필요, 새 파일은 header 행으로 시작)"""
+    if kind == "sheets":
+        if connection is None:
+            raise ValueError("sheets 백엔드에는 시트 연결이 필요합니다.")
+        return SheetsBackend(connection)
+    if kind in ("sqlite", "csv"):
+        if not path:
+            raise ValueError(f"{kind} 백엔드에는 BRANCH_BACKEND_PATH가 필요합니다.")
+        return SqliteBackend(path, header) if kind == "sqlite" else CsvBackend(path, header)
+    raise ValueError(f"알 수 없는 저장소 종류: {kind} (가능한 값: {', '.join(BACKENDS)})")
@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import shapely
+from pyproj import Transformer
+
+
+# ✅ 가맹 상권(영업 보호 구역) 중복 분석
+#    지점 좌표를 미터 단위 투영 좌표계(EPSG:5179, Korea 2000 통합좌표계)로 바꾼 뒤 반경 radius_m 원으로 버퍼링하고,
+#    STRtree로 서로 겹칠 수 있는 구역만 골라 실제 교차 면적을 계산한다.
+
+PROJECTED_CRS = "EPSG:5179"
+_to_projected = Transformer.from_crs("EPSG:4326", PROJECTED_CRS, always_xy=True)
+
+
+def project(lats, lngs):
+    """위도/경도 배열 → 투영 좌표 (x, y) 배열 (미터)"""
+    return _to_projected.transform(np.asarray(lngs, dtype=float), np.asarray(lats, dtype=float))
+
+
+class TerritoryIndex:
+    """지점별 상권 원(버퍼)과 STRtree (스냅샷 버전 + 반경마다 한 번 생성)"""
+
+    def __init__(self, locations, radius_m=500, quad_segs=16):
+        self.radius_m = float(radius_m)
+        self.quad_segs = quad_segs
+
+        located = locations.dropna(subset=["위도", "경도"])
+        located = located[located["지점명"].astype(str).str.strip() != ""]
+        located = located.drop_duplicates(subset="지점명")
+        self.names = located["지점명"].astype(str).str.strip().to_numpy()
+        self.addresses = located["주소"].astype(str).to_numpy()
+
+        x, y = project(located["위도"], located["경도"])
+        self.points = shapely.points(x, y)
+        self.areas = shapely.buffer(self.points, self.radius_m, quad_segs=quad_segs)
+        self.tree = shapely.STRtree(self.areas)
+        self.area_m2 = float(shapely.area(self.areas[0])) if len(self.areas) else math.pi * self.radius_m ** 2
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidate_overlaps(self, lat, lng):
+        """후보 위치의 상권과 겹치는 기존 지점: [{지점명, 주소, 거리(m), 중복면적(㎡), 중복률(%)}] 중복 면적 큰 순"""
+        x, y = project([lat], [lng])
+        candidate = shapely.buffer(shapely.points(x[0], y[0]), self.radius_m, quad_segs=self.quad_segs)
+        hits = self.tree.query(candidate, predicate="intersects")
+        if len(hits) == 0:
+            return []
+        overlap = shapely.area(shapely.intersection(self.areas[hits], candidate))
+        distance = shapely.distance(self.points[hits], shapely.points(x[0], y[0]))
+        return self._rows(
+            [{"지점명": self.names[i], "주소": self.addresses[i]} for i in hits], distance, overlap
+        )
+
+    def pairwise_overlaps(self):
+        """기존 지점끼리 겹치는 모든 쌍: [{지점A, 지점B, 거리(m), 중복면적(㎡), 중복률(%)}] 중복 면적 큰 순"""
+        if len(self) < 2:
+            return []
+        # 전체 구역을 한 번에 질의 (shapely 2 bulk query) → (질의 번호, 트리 번호) 쌍
+        left, right = self.tree.query(self.areas, predicate="intersects")
+        keep = left < right  # 자기 자신, 중복 쌍 제거
+        left, right = left[keep], right[keep]
+        if len(left) == 0:
+            return []
+        overlap = shapely.area(shapely.intersection(self.areas[left], self.areas[right]))
+        distance = shapely.distance(self.points[left], self.points[right])
+        return self._rows(
+            [{"지점A": self.names[i], "지점B": self.names[j]} for i, j in zip(left, right)], distance, overlap
+        )
+
+    def _rows(self, rows, distance, overlap):
+        for row, d, a in zip(rows, distance, overlap):
+            row["거리(m)"] = round(float(d), 1)
+            row["중복면적(㎡)"] = round(float(a), 1)
+            row["중복률(%)"] = round(float(a) / self.area_m2 * 100, 1)
+        rows = [row for row in rows if row["중복면적(㎡)"] > 0]  # 경계만 닿는 경우 제외
+        rows.sort(key=lambda row: -row["중복면적(㎡)"])
+        return rows
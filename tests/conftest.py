@@ -0,0 +1,24 @@
+import os, sys
+
+import pytest
+
+# 저장소 루트의 모듈(refund_engine, sheet_writes 등)을 패키지 없이 바로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def stub():
+    """kakao_stub 서버 시작 함수 (start(**옵션) → (server, url)). 테스트가 끝나면 모두 종료"""
+    from kakao_stub import start_stub
+
+    servers = []
+
+    def start(**options):
+        server, url = start_stub(**options)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
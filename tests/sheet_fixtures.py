@@ -0,0 +1,10 @@
+from branch_store import REQUIRED_COLUMNS
+
+HEADER = REQUIRED_COLUMNS + ["주소"]
+
+
+def branch_values(count=5):
+    """헤더 + 지점 count개 (시트와 같은 2차원 문자열 목록)"""
+    rows = [[f"지점{i}", str(i), f"{i:04d}", f"id{i}", f"pw{i}", "", "O", "X", "O", f"서울 {i}길"]
+            for i in range(1, count + 1)]
+    return [list(HEADER)] + rows
@@ -0,0 +1,83 @@
+from branch_search import BranchSearchIndex, has_chosung, normalize, to_chosung
+
+NAMES = [
+    "부산연산점", "부산서면점", "연산점", "서울강남점", "강남역점", "부산", "부산 사상점", "광주수완점",
+    "ㄱ", "대구수성점", "부산연산점", None, "", "인천송도점",
+]
+
+
+def brute_force(names, query):
+    """정확히 일치 > 앞부분 일치 > 부분 일치 (초성이 섞이면 초성끼리 비교), 같은 순위는 위치/길이/시트 순서"""
+    query = normalize(query)
+    chosung = has_chosung(query)
+    if chosung:
+        query = to_chosung(query)
+    ranked = []
+    for order, name in enumerate(names):
+        key = normalize(name)
+        if chosung:
+            key = to_chosung(key)
+        pos = key.find(query)
+        if pos < 0:
+            continue
+        rank = 0 if key == query and not chosung else (1 if pos == 0 else 2)
+        ranked.append((rank, pos, len(normalize(name)), order, name))
+    return [ranked_name for *_, ranked_name in sorted(ranked)]
+
+
+def index():
+    return BranchSearchIndex(NAMES)
+
+
+def test_names_and_rows_skip_blanks_and_merge_duplicates():
+    idx = index()
+    assert idx.names == [
+        "부산연산점", "부산서면점", "연산점", "서울강남점", "강남역점", "부산", "부산 사상점", "광주수완점",
+        "ㄱ", "대구수성점", "인천송도점",
+    ]
+    assert idx.rows["부산연산점"] == [0, 10]
+    assert idx.search_rows("연산") == [0, 2, 10]
+
+
+def test_exact_then_prefix_then_substring():
+    assert index().search("부산") == ["부산", "부산연산점", "부산서면점", "부산 사상점"]
+    assert index().search("연산") == ["연산점", "부산연산점"]
+    assert index().search("강남") == ["강남역점", "서울강남점"]
+    assert index().search(" 부산 사상 ") == ["부산 사상점"]  # 공백 무시
+
+
+def test_chosung_query():
+    idx = index()
+    assert idx.search("ㅂㅅㅇㅅ") == ["부산연산점"]
+    assert idx.search("ㅇㅅㅈ") == ["연산점", "부산연산점"]  # 앞부분 일치가 먼저
+    assert idx.search("ㄷㄱ") == ["대구수성점"]
+    assert idx.search("ㅎ") == []
+
+
+def test_mixed_chosung_query():
+    idx = index()
+    assert idx.search("부산ㅇㅅ") == ["부산연산점"]
+    assert idx.search("ㅂ산ㅅㅁ") == ["부산서면점"]
+    assert idx.search("강ㄴ") == ["강남역점", "서울강남점"]
+
+
+def test_matches_brute_force_for_every_single_character():
+    idx = index()
+    singles = {ch for name in idx.names for ch in normalize(name)}
+    singles |= {ch for name in idx.names for ch in to_chosung(normalize(name))}
+    for ch in sorted(singles):
+        assert idx.search(ch) == brute_force(idx.names, ch), ch
+
+
+def test_matches_brute_force_for_longer_queries():
+    idx = index()
+    for query in ["산점", "부산연", "ㅂㅅ", "ㅅㅈ", "부ㅅ", "점", "남점", "수", "ㅅㅇㅈ", "없는지점", "ㄱㄴ"]:
+        assert idx.search(query) == brute_force(idx.names, query), query
+
+
+def test_limit_and_cache_do_not_change_results():
+    idx = index()
+    full = idx.search("점")
+    assert idx.search("점", limit=3) == full[:3]
+    assert idx.search("점") == full
+    assert idx.search("") == []
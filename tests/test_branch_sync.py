@@ -0,0 +1,76 @@
+import threading, time
+
+from branch_store import BranchSync
+from sheet_fixtures import branch_values
+from storage_backends import CsvBackend
+
+
+class SlowBackend:
+    """revision() 도중 멈춰 있다가 release되면 돌아가는 백엔드 (확인 도중에 일어나는 일을 재현)"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.entered, self.release = threading.Event(), threading.Event()
+
+    def revision(self):
+        self.entered.set()
+        self.release.wait(5)
+        return self.inner.revision()
+
+    def read_values(self):
+        return self.inner.read_values()
+
+
+def wait_refreshed(sync, timeout=5):
+    deadline = time.monotonic() + timeout
+    while sync._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not sync._refreshing
+
+
+def make_sync(tmp_path):
+    inner = CsvBackend(str(tmp_path / "branches.csv"))
+    inner.replace_values(branch_values(3))
+    sync = BranchSync(inner, path=str(tmp_path / "snapshot.json"), check_interval=60)
+    sync.current()
+    sync.source = SlowBackend(inner)
+    return sync, inner
+
+
+def test_first_call_waits_for_data_and_later_calls_do_not(tmp_path):
+    sync, inner = make_sync(tmp_path)
+
+    assert sync.current()["values"] == branch_values(3)
+    assert sync.checked_at > 0 and not sync._refreshing  # 확인 주기 전에는 백그라운드 확인도 없음
+
+
+def test_refresh_swaps_in_changed_data(tmp_path):
+    sync, inner = make_sync(tmp_path)
+    inner.append_rows([["지점9"]], expected_revision=inner.revision())
+    sync.source.release.set()
+
+    sync.invalidate()
+    old = sync.current()  # 기다리지 않고 이전 스냅샷을 바로 돌려줌
+    wait_refreshed(sync)
+
+    assert old["values"] == branch_values(3)
+    assert sync.current()["values"][-1] == ["지점9"]
+    assert sync.store().frame["지점명"].tolist()[-1] == "지점9"
+
+
+def test_invalidate_during_refresh_is_not_lost(tmp_path):
+    sync, inner = make_sync(tmp_path)
+    sync.invalidate()
+    sync.current()  # 백그라운드 확인 시작
+    assert sync.source.entered.wait(5)
+
+    # 확인하는 도중 다른 곳에서 쓰고 invalidate → 이 확인 결과로 checked_at을 갱신하면 안 된다
+    inner.append_rows([["지점9"]], expected_revision=inner.revision())
+    sync.invalidate()
+    sync.source.release.set()
+    wait_refreshed(sync)
+
+    assert sync.checked_at == 0.0
+    sync.current()
+    wait_refreshed(sync)
+    assert sync.current()["values"][-1] == ["지점9"]
@@ -0,0 +1,53 @@
+import io
+
+import pandas as pd
+import pytest
+
+from checkout_fees import FeeRule, compute_overstay_fees, load_fee_rules, overstay_fee
+
+NOW = "2025-01-01 12:00"
+
+
+def rules_file(text):
+    return io.StringIO("지점명,단위(분),단위요금,최대요금\n" + text)
+
+
+def test_fee_rules_are_parsed_per_branch():
+    rules = load_fee_rules(rules_file('강남점,60,"2,000",5000\n신촌점,10,500,\n,,,\n'))
+
+    assert rules == {"강남점": FeeRule(60, 2000, 5000), "신촌점": FeeRule(10, 500, None)}
+
+
+@pytest.mark.parametrize("row", ["강남점,0,1000,", "강남점,,1000,", "강남점,30,-500,", "강남점,30,abc,"])
+def test_invalid_fee_rule_names_the_branch(row):
+    with pytest.raises(ValueError, match="강남점"):
+        load_fee_rules(rules_file(row + "\n"))
+
+
+def test_fee_rule_rejects_zero_unit():
+    with pytest.raises(ValueError):
+        FeeRule(unit_minutes=0)
+    assert overstay_fee(95) == 3000
+    assert overstay_fee(600, FeeRule(60, 2000, 5000)) == 5000
+
+
+def test_mixed_timezone_offsets_and_naive_times():
+    frame = pd.DataFrame({
+        "지점명": ["a"] * 5,
+        "퇴실시각": ["2025-01-01 10:00", "2025-01-01T01:00:00Z", "2025-01-01 10:00+09:00",
+                   "2024-12-31 23:00:00-05:00", "모름"],
+    })
+
+    result = compute_overstay_fees(frame, NOW)
+
+    assert result["미처리(분)"].tolist()[:3] == [120, 120, 120]
+    assert result["오류"].tolist()[3:] == ["퇴실시각이 기준 시각 이후", "퇴실시각 형식 오류"]
+
+
+def test_branch_rules_and_split_date_time_columns():
+    frame = pd.DataFrame({"지점명": ["강남점", "기타"], "퇴실일자": ["2025-01-01"] * 2, "퇴실시간": ["02:00"] * 2})
+
+    result = compute_overstay_fees(frame, NOW, {"강남점": FeeRule(60, 2000, 5000)})
+
+    assert result["초과요금"].tolist() == [5000, 20000]
+    assert result["미처리시간"].tolist() == ["10시간 0분"] * 2
@@ -0,0 +1,125 @@
+import json, unicodedata
+
+import pytest
+import requests
+
+from geocoding import GeocodeCache, KakaoGeocoder, geocode_all, normalize_address
+from http_client import HttpClient
+from kakao_stub import stub_coords
+
+
+class CountingCache(GeocodeCache):
+    saves = 0
+
+    def save(self):
+        self.saves += 1
+        super().save()
+
+
+def geocoder_for(url, cache, retries=5):
+    return KakaoGeocoder("test-key", cache, url=url, http=HttpClient(retries=retries, backoff=0.01))
+
+
+def test_geocode_all_skips_cached_retries_429_and_saves_once(stub, tmp_path):
+    server, url = stub(delay=0.02, fail_every=3)  # 세 번째 요청마다 429
+    cache = CountingCache(str(tmp_path / "geocode.json"))
+    cached = ["서울 강남구 테헤란로 1", "서울 마포구 양화로 2"]
+    for address in cached:
+        cache.put(address, (37.5, 127.0), save=False)
+
+    todo = [f"서울 종로구 세종대로 {n}" for n in range(12)] + ["서울 없는주소 1"]
+    addresses = cached + todo + [f" {todo[0]} ", "N/A", None]  # 공백만 다른 중복, 빈 값
+    geocoder = geocoder_for(url, cache)
+    progress = []
+    stats = geocode_all(geocoder, addresses, workers=4, rate=0, progress=lambda done, total: progress.append(done))
+
+    assert stats == {"total": len(cached) + len(todo), "cached": 2, "found": 12, "missing": 1, "failed": 0}
+    http_stats = geocoder.http.stats()["kakao_address"]
+    assert http_stats["retries"] > 0
+    # 캐시에 있던 주소는 요청하지 않는다: 요청 수 = 새 주소 + 429 재시도
+    assert server.request_count == len(todo) + http_stats["retries"]
+    assert cache.saves == 1
+    assert progress == list(range(1, len(todo) + 1))
+
+    reloaded = GeocodeCache(cache.path)
+    assert reloaded.lookup(todo[0]) == stub_coords(todo[0])
+    assert reloaded.get("서울 없는주소 1") == (True, None)
+    assert reloaded.lookup(cached[0]) == (37.5, 127.0)
+
+
+def test_geocode_all_with_everything_cached_makes_no_requests(stub, tmp_path):
+    server, url = stub()
+    cache = GeocodeCache(str(tmp_path / "geocode.json"))
+    cache.put("서울 강남구 테헤란로 1", (37.5, 127.0), save=False)
+
+    stats = geocode_all(geocoder_for(url, cache), ["서울  강남구 테헤란로 1"])
+    assert stats == {"total": 1, "cached": 1, "found": 0, "missing": 0, "failed": 0}
+    assert server.request_count == 0
+
+
+def test_keys_are_nfc_and_whitespace_normalized(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geocode.json"))
+    decomposed = unicodedata.normalize("NFD", "서울 강남구  테헤란로\t1 ")  # macOS 파일명 등에서 오는 자모 분리형
+    assert decomposed != "서울 강남구 테헤란로 1"
+    assert normalize_address(decomposed) == "서울 강남구 테헤란로 1"
+
+    cache.put(decomposed, (37.5, 127.0), save=False)
+    assert cache.get("서울 강남구 테헤란로 1") == (True, (37.5, 127.0))
+    assert cache.lookup(" 서울  강남구 테헤란로 1") == (37.5, 127.0)
+    assert len(cache) == 1
+
+
+def test_misses_expire_after_miss_ttl_but_hits_do_not(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geocode.json"), miss_ttl=60)
+    cache.put("서울 없는주소 1", None, save=False)
+    cache.put("서울 강남구 테헤란로 1", (37.5, 127.0), save=False)
+    assert cache.get("서울 없는주소 1") == (True, None)
+
+    for entry in cache._entries.values():
+        entry["at"] -= 61
+    assert cache.get("서울 없는주소 1") == (False, None)  # 다시 조회 대상
+    assert cache.get("서울 강남구 테헤란로 1") == (True, (37.5, 127.0))
+
+
+def test_cache_survives_reload_and_ignores_broken_files(tmp_path):
+    path = tmp_path / "geocode.json"
+    cache = GeocodeCache(str(path))
+    cache.put("서울 강남구 테헤란로 1", (37.5, 127.0))
+    assert GeocodeCache(str(path)).lookup("서울 강남구 테헤란로 1") == (37.5, 127.0)
+
+    path.write_text("{broken", encoding="utf-8")
+    assert len(GeocodeCache(str(path))) == 0
+    path.write_text(json.dumps(["not", "a", "dict"]), encoding="utf-8")
+    assert len(GeocodeCache(str(path))) == 0
+
+
+def test_geocode_caches_hits_and_misses(stub, tmp_path):
+    server, url = stub()
+    geocoder = geocoder_for(url, GeocodeCache(str(tmp_path / "geocode.json")))
+    address = "서울 중구 세종대로 110"
+    assert geocoder.geocode(address) == stub_coords(address)
+    assert geocoder.geocode("서울 없는주소 1") is None
+    assert geocoder.geocode(f"  {address}") == stub_coords(address)
+    assert geocoder.geocode("서울  없는주소 1") is None
+    assert geocoder.geocode("") is None
+    assert server.request_count == 2
+
+
+def test_transport_errors_are_not_cached(stub, tmp_path):
+    server, url = stub(fail_every=1, fail_status=503)
+    cache = GeocodeCache(str(tmp_path / "geocode.json"))
+    geocoder = geocoder_for(url, cache, retries=1)
+    with pytest.raises(requests.HTTPError):
+        geocoder.geocode("서울 중구 세종대로 110")
+    assert cache.get("서울 중구 세종대로 110") == (False, None)
+
+    server.fail_every = 0  # 복구되면 다시 조회해서 기록
+    assert geocoder.geocode("서울 중구 세종대로 110") == stub_coords("서울 중구 세종대로 110")
+    assert server.request_count == 3
+
+    server.shutdown()
+    server.server_close()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        geocoder.geocode("서울 종로구 종로 1")
+    assert cache.get("서울 종로구 종로 1") == (False, None)
+    assert len(cache) == 1
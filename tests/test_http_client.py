@@ -0,0 +1,74 @@
+import time
+
+import pytest
+import requests
+
+from http_client import HttpClient
+
+AUTH = {"Authorization": "KakaoAK test-key"}
+
+
+def get(client, url):
+    return client.get("kakao_address", url, headers=AUTH, params={"query": "서울 중구 세종대로 110"})
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retryable_status_is_retried_then_raised(stub, status):
+    server, url = stub(fail_every=1, fail_status=status)
+    client = HttpClient(retries=2, backoff=0.01)
+    with pytest.raises(requests.HTTPError):
+        get(client, url)
+    assert server.request_count == 3  # 처음 1번 + 재시도 2번
+    stats = client.stats()["kakao_address"]
+    assert (stats["requests"], stats["errors"], stats["retries"]) == (3, 3, 2)
+
+
+def test_other_errors_are_not_retried(stub):
+    server, url = stub()
+    client = HttpClient(retries=2, backoff=0.01)
+    with pytest.raises(requests.HTTPError):
+        client.get("kakao_address", url)  # 인증 헤더 없음 → 401
+    stats = client.stats()["kakao_address"]
+    assert (stats["requests"], stats["errors"], stats["retries"]) == (1, 1, 0)
+
+
+def test_retry_after_is_honoured(stub):
+    server, url = stub(fail_every=2, retry_after=0.4)  # 두 번째 요청이 429
+    client = HttpClient(retries=2, backoff=0.001)
+    get(client, url)
+    started = time.monotonic()
+    assert get(client, url).json()["documents"]
+    assert time.monotonic() - started >= 0.4  # 백오프(1ms)가 아니라 Retry-After만큼 기다림
+    assert server.request_count == 3
+    assert client.stats()["kakao_address"]["retries"] == 1
+
+
+def test_retry_after_is_capped_by_max_backoff(stub):
+    server, url = stub(fail_every=1, retry_after=30)
+    client = HttpClient(retries=1, backoff=0.001, max_backoff=0.05)
+    started = time.monotonic()
+    with pytest.raises(requests.HTTPError):
+        get(client, url)
+    assert time.monotonic() - started < 5
+    assert server.request_count == 2
+
+
+def test_timeouts_are_counted_as_errors(stub):
+    server, url = stub(delay=0.5)
+    client = HttpClient(timeouts={"kakao_address": (1, 0.1)}, retries=1, backoff=0.01)
+    with pytest.raises(requests.exceptions.Timeout):
+        get(client, url)
+    stats = client.stats()["kakao_address"]
+    assert (stats["requests"], stats["errors"], stats["retries"]) == (2, 2, 1)
+    assert stats["max_ms"] >= 100
+
+
+def test_connection_errors_are_counted_per_endpoint(stub):
+    server, url = stub()
+    server.shutdown()
+    server.server_close()  # 포트를 닫아 연결 거부
+    client = HttpClient(retries=1, backoff=0.01)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get("closed", url, headers=AUTH)
+    assert client.stats()["closed"]["errors"] == 2
+    assert "kakao_address" not in client.stats()
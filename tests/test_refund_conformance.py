@@ -0,0 +1,71 @@
+from dataclasses import replace
+
+import pytest
+
+from refund_bench import (
+    app_case, boundary_cases, cases_frame, random_cases, reference_refund, refund112_case,
+    run_app, run_batch, run_curve, run_engine, run_refund112, _diff, COMPARED_FIELDS,
+)
+from refund_engine import calculate_refund, calculate_refunds
+
+LEGACY_FIELDS = ("used_days", "deduction_amount", "refund_amount")
+SEED = 7
+
+
+@pytest.fixture(scope="module")
+def cases():
+    return boundary_cases() + random_cases(2000, seed=SEED)
+
+
+def mismatches(cases, outputs, fields=COMPARED_FIELDS):
+    return [
+        (case, diff) for case, actual in zip(cases, outputs)
+        if actual is not None and (diff := _diff(reference_refund(case), actual, fields))
+    ]
+
+
+def test_engine_matches_reference(cases):
+    assert mismatches(cases, run_engine(cases)) == []
+
+
+def test_batch_matches_reference(cases):
+    assert mismatches(cases, run_batch(cases)) == []
+
+
+def test_curve_matches_reference(cases):
+    subset = cases[:150]
+    outputs = run_curve(subset)
+    assert sum(output is not None for output in outputs) > 100  # 대부분 곡선 범위 안
+    assert mismatches(subset, outputs) == []
+
+
+def test_refund112_matches_reference(cases):
+    legacy = [refund112_case(case) for case in cases]
+    assert mismatches(legacy, run_refund112(legacy), LEGACY_FIELDS) == []
+
+
+def test_percent_band_boundaries():
+    # 사용률이 정확히 25% / 50%이면 다음 구간 (< 25, < 50)
+    refunds = [reference_refund(case)["refund_amount"] for case in boundary_cases()]
+    assert refunds == [50000, 25000, 25000, 25000, 0, 0, 50000, 25000, 25000, 0]
+
+
+def test_app_matches_reference_at_band_boundaries():
+    pytest.importorskip("streamlit.testing.v1")
+    cases = [app_case(case) for case in boundary_cases()]
+    assert mismatches(cases, run_app(cases), LEGACY_FIELDS) == []
+
+
+def test_unknown_ticket_type_is_rejected_by_both_paths():
+    known = boundary_cases()[:3]
+    unknown = replace(known[0], ticket_type="월정액")
+    with pytest.raises(ValueError, match="월정액"):
+        calculate_refund(unknown)
+
+    result = calculate_refunds(cases_frame(known + [unknown]))
+    assert list(result["오류"][:3]) == ["", "", ""]
+    assert "월정액" in result["오류"].iloc[3]
+    assert result[["공제금액", "환불금액", "최종환불금액", "입금액"]].iloc[3].isna().all()
+    assert result["환불구간"].iloc[3] == ""
+    # 나머지 행은 그대로 계산
+    assert list(result["환불금액"][:3]) == [calculate_refund(case).refund_amount for case in known]
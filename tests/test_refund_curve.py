@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from refund_engine import LIMIT_DAYS, RefundCase, curve_markers, refund_curve
+
+PURCHASE = date(2025, 3, 1)
+
+
+def period_case(days_given):
+    return RefundCase("기간권", "% 규정", 300000, PURCHASE, PURCHASE, days_given=days_given)
+
+
+def hours_case(total_hours):
+    return RefundCase("시간권", "% 규정", 100000, PURCHASE, PURCHASE, hours_used=0, total_hours=total_hours)
+
+
+def test_limit_marker_only_when_it_falls_on_the_curve():
+    for days_given in (LIMIT_DAYS, LIMIT_DAYS + 1, LIMIT_DAYS + 2, 60):
+        case = period_case(days_given)
+        last_day = refund_curve(case)["환불요청일"].max()
+        limit = [x for x, label in curve_markers(case) if "초과" in label]
+        assert all(pd.Timestamp(x) <= last_day for x, _ in curve_markers(case))
+        assert bool(limit) == (days_given > LIMIT_DAYS + 1)
+        if limit:
+            assert limit[0] == PURCHASE + timedelta(days=LIMIT_DAYS + 1)
+
+
+def test_fractional_total_hours_end_at_total():
+    hours = refund_curve(hours_case(10.5))["사용시간"].tolist()
+    assert hours == [float(h) for h in range(11)] + [10.5]
+    assert refund_curve(hours_case(10))["사용시간"].tolist() == [float(h) for h in range(11)]
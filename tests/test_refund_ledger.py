@@ -0,0 +1,87 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from refund_ledger import RefundLedger
+
+
+def refund(branch, phone, refund_date, created_at, amount=0):
+    return {
+        "branch": branch, "phone": phone, "refund_date": refund_date, "created_at": created_at,
+        "formatted_ticket_type": "기간권 (30일)", "policy": "일반", "ticket_price": 100000,
+        "final_refund_amount": amount,
+    }
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = RefundLedger(str(tmp_path / "ledger.db"))
+    ledger.record_many([
+        (refund("강남점", "010-1234-5678", date(2026, 10, 1), "2026-10-01 10:00:00", 1000), None, "calculation"),
+        (refund("강남점", "01012345678", date(2026, 10, 5), "2026-10-05 09:00:00", 2000), None, "calculation"),
+        (refund("연산점", "010-9999-5678", date(2026, 10, 5), "2026-10-05 11:00:00", 3000), None, "calculation"),
+        (refund("연산점", "010-1111-2222", date(2026, 10, 9), "2026-10-09 12:00:00", 4000), None, "calculation"),
+    ])
+    ledger.record(
+        refund("강남점", "010 1234 5678", date(2026, 10, 5), "2026-10-05 09:00:00", 2000),
+        account={"account_holder": "홍길동", "bank_name": "국민", "account_number": "123-45"}, kind="account",
+    )
+    return ledger
+
+
+def amounts(frame):
+    return list(frame["환불금액"])
+
+
+@pytest.mark.parametrize("sql", ["UPDATE refunds SET final_refund_amount = 0", "DELETE FROM refunds"])
+def test_rows_cannot_be_changed_or_deleted(ledger, sql):
+    with sqlite3.connect(ledger.path) as db, pytest.raises(sqlite3.DatabaseError, match="append-only"):
+        db.execute(sql)
+    assert len(ledger) == 5
+
+
+def test_lookup_by_full_phone_ignores_formatting(ledger):
+    for phone in ("010-1234-5678", "01012345678", "010 1234 5678"):
+        frame, _ = ledger.history(phone=phone)
+        assert amounts(frame) == [2000, 2000, 1000]  # 같은 시각이면 나중에 기록한 것부터
+        assert list(frame["구분"]) == ["계좌입력", "계산", "계산"]
+
+
+def test_lookup_by_last_four_digits_and_branch(ledger):
+    assert amounts(ledger.history(phone="5678")[0]) == [3000, 2000, 2000, 1000]
+    assert amounts(ledger.history(phone="5678", branch="연산점")[0]) == [3000]
+    assert amounts(ledger.history(branch="연산점")[0]) == [4000, 3000]
+    assert amounts(ledger.history(branch="연산")[0]) == []  # 지점명은 정확히 일치
+    assert amounts(ledger.history(phone="0000")[0]) == []
+
+
+def test_refund_date_range(ledger):
+    assert amounts(ledger.history(since=date(2026, 10, 5), until=date(2026, 10, 5))[0]) == [3000, 2000, 2000]
+    assert amounts(ledger.history(since="2026-10-02")[0]) == [4000, 3000, 2000, 2000]
+    assert amounts(ledger.history(until=date(2026, 10, 4))[0]) == [1000]
+    assert amounts(ledger.history(branch="강남점", since=date(2026, 10, 2))[0]) == [2000, 2000]
+
+
+def test_newest_first_and_limit(ledger):
+    frame, elapsed_ms = ledger.history(since="2026-01-01", limit=2)
+    assert list(frame["기록시각"]) == ["2026-10-09 12:00:00", "2026-10-05 11:00:00"]
+    assert elapsed_ms >= 0
+    assert list(frame.columns)[:4] == ["기록시각", "구분", "지점명", "전화번호"]
+
+
+def test_account_entry_keeps_account_fields(ledger):
+    frame, _ = ledger.history(phone="01012345678", limit=1)
+    assert frame.iloc[0][["예금주", "은행명", "계좌번호"]].tolist() == ["홍길동", "국민", "123-45"]
+
+
+def test_queries_use_indexes(ledger):
+    with sqlite3.connect(ledger.path) as db:
+        def plan(where, *params):
+            rows = db.execute(f"EXPLAIN QUERY PLAN SELECT * FROM refunds WHERE {where}", params).fetchall()
+            return " ".join(row[-1] for row in rows)
+
+        assert "idx_refunds_phone (" in plan("phone_digits = ?", "01012345678")
+        assert "idx_refunds_phone_last4" in plan("phone_last4 = ?", "5678")
+        assert "idx_refunds_branch" in plan("branch = ?", "강남점")
+        assert "idx_refunds_refund_date" in plan("refund_date >= ? AND refund_date <= ?", "2026-10-01", "2026-10-05")
@@ -0,0 +1,90 @@
+import sys, time, types
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+import refund_pdf
+
+# 워커 프로세스는 spawn으로 뜨므로 아래 함수들은 모듈 최상위에 있어야 한다 (이름으로 불러옴)
+
+
+def init_worker():
+    """weasyprint 없이 뜨는 워커"""
+
+
+def render(fields):
+    time.sleep(fields.get("sleep", 0))
+    return b"%PDF-" + str(fields["branch"]).encode(), 1.0
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    monkeypatch.setattr(refund_pdf, "_init_worker", init_worker)
+    monkeypatch.setattr(refund_pdf, "_render", render)
+    monkeypatch.setattr(refund_pdf, "RENDER_TIMEOUT", 3)
+    renderer = refund_pdf.PdfRenderer(workers=2)
+    assert renderer.render({"branch": "warm"}) == b"%PDF-warm"  # 워커 시작 시간은 제한 시간에서 제외
+    yield renderer
+    renderer.shutdown()
+
+
+def test_hung_render_resets_the_pool(renderer):
+    pool = renderer._pool
+    workers = list(pool._processes.values())
+
+    with pytest.raises(FutureTimeoutError):
+        renderer.render({"branch": "stuck", "sleep": 600})
+
+    assert renderer._pool is None
+    assert renderer.stats()["errors"] == 1
+    for process in workers:
+        process.join(5)
+    assert not any(process.is_alive() for process in workers)  # 멈춘 워커는 종료됨
+    assert renderer.render({"branch": "next"}) == b"%PDF-next"  # 새 풀에서 계속 동작
+
+
+def test_hung_batch_render_resets_the_pool(renderer):
+    fields = [{"branch": "a", "phone": "1"}, {"branch": "stuck", "phone": "2", "sleep": 600}, {"branch": "c", "phone": "3"}]
+    produced = []
+
+    with pytest.raises(FutureTimeoutError):
+        for filename, pdf in renderer.iter_pdf_files(fields):
+            produced.append(pdf)
+
+    assert produced == [b"%PDF-a"]
+    assert renderer._pool is None
+    assert [pdf for _, pdf in renderer.iter_pdf_files(fields[:1] + fields[2:])] == [b"%PDF-a", b"%PDF-c"]
+
+
+def test_batch_render_consumes_input_lazily(renderer):
+    consumed = []
+
+    def fields():
+        for i in range(1000):
+            consumed.append(i)
+            yield {"branch": i, "phone": str(i)}
+
+    files = renderer.iter_pdf_files(fields(), prefetch=4)
+    filename, pdf = next(files)
+    files.close()
+
+    assert pdf == b"%PDF-0" and filename.endswith(".pdf")
+    assert len(consumed) == 4
+
+
+def test_workers_do_not_rerun_the_page_script(monkeypatch, tmp_path):
+    # Streamlit은 __main__을 페이지 스크립트로 바꿔 둔다 → spawn 워커가 그 스크립트를 다시 실행하면 안 된다
+    script = tmp_path / "page.py"
+    script.write_text("raise SystemExit('페이지 스크립트가 워커에서 실행됨')\n", encoding="utf-8")
+    page = types.ModuleType("__main__")
+    page.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", page)
+    monkeypatch.setattr(refund_pdf, "_init_worker", init_worker)
+    monkeypatch.setattr(refund_pdf, "_render", render)
+
+    renderer = refund_pdf.PdfRenderer(workers=2)
+    try:
+        assert [renderer.render({"branch": i}) for i in range(4)] == [b"%PDF-0", b"%PDF-1", b"%PDF-2", b"%PDF-3"]
+        assert sys.modules["__main__"] is page
+    finally:
+        renderer.shutdown()
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from branch_store import BranchRecords
+from refund_policy import PolicyTable, parse_amount, parse_days
+
+
+def table():
+    df = pd.DataFrame({
+        "지점명": ["강남점", "연산점", "서면점"],
+        "시간권금액": ["2,000원", "", "1시간 2,000원"],
+        "기간권금액": ["15,000원", "-", ""],
+        "환불기간": ["결제 후 7일", "미입력", "1주"],
+        "환불응대금지": ["O", "X", "전화 문의만"],
+    })
+    return PolicyTable(BranchRecords(df))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2,000원", 2000), ("시간당 2000", 2000), (" 15,000 ", 15000), (2500, 2500),
+    ("", 0), ("0", 0), ("-", 0), ("미입력", 0), (None, 0),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+
+@pytest.mark.parametrize("text", ["1시간 2,000원", "2,000원/3,000원", "무료", "문의"])
+def test_parse_amount_rejects_zero_or_several_numbers(text):
+    with pytest.raises(ValueError, match="금액"):
+        parse_amount(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("7일", 7), ("7", 7), ("14 일", 14), ("결제후 14일", 14), ("결제 후 3일", 3),
+    ("", None), ("미입력", None), (None, None),
+])
+def test_parse_days(text, expected):
+    assert parse_days(text) == expected
+
+
+@pytest.mark.parametrize("text", ["1주", "한달", "7일 이내", "7시간"])
+def test_parse_days_rejects_other_periods(text):
+    with pytest.raises(ValueError, match="환불기간"):
+        parse_days(text)
+
+
+def test_policy_table_collects_issues_instead_of_guessing():
+    policies = table()
+    gangnam, yeonsan, seomyeon = (policies.get(name) for name in ("강남점", "연산점", "서면점"))
+    assert (gangnam.hourly_rate, gangnam.daily_rate, gangnam.policy) == (2000, 15000, "일반")
+    assert (gangnam.refund_days, gangnam.refund_blocked) == (7, True)
+    assert (yeonsan.policy, yeonsan.refund_days, yeonsan.refund_blocked) == ("% 규정", None, False)
+    assert (seomyeon.hourly_rate, seomyeon.refund_days, seomyeon.restriction) == (0, None, "전화 문의만")
+    assert [(name, label) for name, label, _ in policies.issues] == [("서면점", "시간권금액"), ("서면점", "환불기간")]
+    assert list(policies.issues_frame().columns) == ["지점명", "항목", "오류"]
+
+
+def test_fill_cases_fills_only_blank_cells():
+    cases = pd.DataFrame({
+        "지점명": ["강남점", " 연산점 ", "강남점", "없는지점"],
+        "환불규정": ["", "일반", None, ""],
+        "1일요금": ["", "9000", " ", ""],
+        "결제금액": ["100000"] * 4,
+    })
+    original = cases.copy()
+    filled = table().fill_cases(cases)
+
+    assert list(filled["환불규정"][:3]) == ["일반", "일반", "일반"]
+    assert list(filled["1일요금"][:3]) == [15000, "9000", 15000]
+    assert list(filled["시간당요금"][:3]) == [2000, None, 2000]  # 없던 열은 새로 만듦, 0원은 채우지 않음
+    assert filled.iloc[3][["환불규정", "1일요금", "시간당요금"]].isna().all()  # 정책표에 없는 지점
+    assert list(filled["결제금액"]) == list(cases["결제금액"])
+    pd.testing.assert_frame_equal(cases, original)  # 원본은 그대로
+
+
+def test_fill_cases_without_branch_column_is_unchanged():
+    cases = pd.DataFrame({"환불규정": [""], "결제금액": ["1000"]})
+    assert table().fill_cases(cases) is cases
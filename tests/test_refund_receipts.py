@@ -0,0 +1,36 @@
+import io, zipfile
+
+import pandas as pd
+
+from refund_receipts import CSS_FILENAME, iter_receipt_fields, iter_receipt_files, stream_receipts_zip
+
+CASES = pd.DataFrame({
+    "지점명": ["강남점", "신촌점"], "전화번호": ["010-1234-5678", "010-0000-1111"],
+    "이용권종류": ["기간권", "시간권"], "환불규정": ["일반", "% 규정"], "결제금액": [300000, 100000],
+    "결제일": ["2025-03-01"] * 2, "환불요청일": ["2025-03-05"] * 2, "부여일수": [28, None],
+    "사용시간": [0, 20], "부여시간": [None, 100], "위약금": [0.1, 0],
+})
+
+
+def open_zip(chunks):
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_html_zip_shares_one_stylesheet():
+    archive = open_zip(stream_receipts_zip(iter_receipt_files(iter_receipt_fields(CASES)), index=True))
+
+    names = archive.namelist()
+    assert names[0] == CSS_FILENAME and names[-1] == "index.html" and len(names) == 4
+    for name in names[1:]:
+        assert f'href="{CSS_FILENAME}"' in archive.read(name).decode()
+
+
+def test_pdf_zip_index_does_not_link_missing_stylesheet():
+    files = [("1_강남점_5678.pdf", b"%PDF-1"), ("2_신촌점_1111.pdf", b"%PDF-2")]
+
+    archive = open_zip(stream_receipts_zip(files, index=True, stylesheet=False))
+
+    assert CSS_FILENAME not in archive.namelist()
+    index = archive.read("index.html").decode()
+    assert CSS_FILENAME not in index and "<style>" in index
+    assert "1_강남점_5678.pdf" in index
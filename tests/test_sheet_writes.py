@@ -0,0 +1,112 @@
+import pandas as pd
+
+from fake_sheets import FakeClient
+from sheet_writes import (
+    apply_ops_to_values, build_batch_requests, diff_frames, empty_ops, merge_ops, shift_ops,
+)
+from sheet_fixtures import HEADER, branch_values
+
+
+def frame(values):
+    return pd.DataFrame(values[1:], columns=values[0])
+
+
+def apply_with_fake_sheet(values, ops):
+    """FakeSpreadsheet.batch_update로 실제 요청을 보낸 결과"""
+    client = FakeClient({"t": {"시트1": values}})
+    spreadsheet = client.open("t")
+    spreadsheet.batch_update({"requests": build_batch_requests(spreadsheet.worksheet("시트1").id, ops)})
+    return spreadsheet.worksheet("시트1").get_all_values(), client.calls
+
+
+def test_diff_frames_updates_appends_and_deletes():
+    values = branch_values(4)
+    original = frame(values)
+    edited = original.drop(index=[1]).copy()  # 3행(지점2) 삭제
+    edited.loc[0, "PWD"] = "new"
+    edited.loc[3, ["ID", "PWD"]] = ["a", "b"]
+    edited.loc[10] = ["지점9"] + [""] * (len(HEADER) - 1)
+
+    ops = diff_frames(original, edited)
+
+    assert ops["updates"] == {2: {HEADER.index("PWD"): "new"}, 5: {HEADER.index("ID"): "a", HEADER.index("PWD"): "b"}}
+    assert ops["appends"] == [["지점9"] + [""] * (len(HEADER) - 1)]
+    assert ops["deletes"] == [3]
+
+
+def test_diff_frames_leaves_rows_outside_the_view_alone():
+    original = frame(branch_values(4))
+    view = original.loc[[2, 3]]
+    edited = view.drop(index=[3])
+
+    ops = diff_frames(original, edited, view_index=view.index)
+
+    assert ops == {"updates": {}, "appends": [], "deletes": [5]}
+
+
+def test_diff_frames_ignores_blank_new_rows_and_nan():
+    original = frame(branch_values(2))
+    edited = original.copy()
+    edited.loc[0, "주소"] = None
+    edited.loc[5] = [None] * len(HEADER)
+
+    ops = diff_frames(original, edited)
+
+    assert ops["updates"] == {2: {HEADER.index("주소"): ""}}
+    assert ops["appends"] == []
+
+
+def test_build_batch_requests_groups_runs_and_deletes_bottom_up():
+    ops = {"updates": {2: {1: "a", 2: "b", 5: "c"}}, "appends": [["x"]], "deletes": [3, 4, 6]}
+
+    requests = build_batch_requests(7, ops)
+
+    kinds = [next(iter(r)) for r in requests]
+    assert kinds == ["updateCells", "updateCells", "appendCells", "deleteDimension", "deleteDimension"]
+    assert requests[0]["updateCells"]["start"] == {"sheetId": 7, "rowIndex": 1, "columnIndex": 1}
+    assert len(requests[0]["updateCells"]["rows"][0]["values"]) == 2
+    ranges = [(r["deleteDimension"]["range"]["startIndex"], r["deleteDimension"]["range"]["endIndex"])
+              for r in requests[3:]]
+    assert ranges == [(5, 6), (2, 4)]  # 아래쪽 범위부터
+
+
+def test_batch_requests_match_local_apply():
+    values = branch_values(6)
+    ops = {"updates": {2: {0: "수정", 4: "pw"}, 7: {3: "id"}}, "appends": [["새지점"]], "deletes": [3, 4, 6]}
+
+    written, calls = apply_with_fake_sheet(values, ops)
+
+    assert written == apply_ops_to_values(values, ops)
+    assert calls["batch_update"] == 1
+
+
+def test_merge_ops_combines_cells_and_drops_updates_to_deleted_rows():
+    older = {"updates": {2: {0: "a"}, 3: {1: "b"}}, "appends": [["x"]], "deletes": [4]}
+    newer = {"updates": {2: {1: "c"}, 4: {0: "gone"}}, "appends": [["y"]], "deletes": [3]}
+
+    merged = merge_ops(older, newer)
+
+    assert merged == {"updates": {2: {0: "a", 1: "c"}}, "appends": [["x"], ["y"]], "deletes": [3, 4]}
+
+
+def test_shift_ops_moves_rows_below_deleted_rows():
+    ops = {"updates": {2: {0: "a"}, 4: {0: "gone"}, 6: {0: "b"}}, "appends": [["x"]], "deletes": [4, 7]}
+
+    shifted = shift_ops(ops, [3, 4])
+
+    assert shifted == {"updates": {2: {0: "a"}, 4: {0: "b"}}, "appends": [["x"]], "deletes": [5]}
+    assert shift_ops(ops, []) is ops
+
+
+def test_shifted_ops_apply_to_the_sheet_after_the_delete():
+    # 첫 번째 쓰기(3행 삭제)가 반영된 뒤, 그 전 스냅샷 기준으로 만든 수정이 같은 지점에 가야 한다
+    values = branch_values(5)
+    first = {"updates": {}, "appends": [], "deletes": [3]}
+    second = {"updates": {5: {HEADER.index("PWD"): "changed"}}, "appends": [], "deletes": []}
+
+    after_first = apply_ops_to_values(values, first)
+    written, _ = apply_with_fake_sheet(after_first, shift_ops(second, first["deletes"]))
+
+    row = next(r for r in written if r[0] == "지점4")
+    assert row[HEADER.index("PWD")] == "changed"
+    assert empty_ops() == {"updates": {}, "appends": [], "deletes": []}
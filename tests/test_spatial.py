@@ -0,0 +1,90 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("rtree")
+
+from spatial import BranchSpatialIndex, haversine_km, parse_coordinate
+
+SEED = 11
+
+
+def random_locations(count, seed=SEED):
+    rng = random.Random(seed)
+    rows = [
+        (f"지점{i}", f"주소{i}", rng.uniform(33.2, 38.6), rng.uniform(124.6, 131.0))  # 남한 전체 범위
+        for i in range(count)
+    ]
+    return pd.DataFrame(rows, columns=["지점명", "주소", "위도", "경도"])
+
+
+def brute_force(locations, lat, lng, k):
+    distances = [
+        (haversine_km(lat, lng, b_lat, b_lng), name)
+        for name, b_lat, b_lng in zip(locations["지점명"], locations["위도"], locations["경도"])
+    ]
+    return [name for _, name in sorted(distances)[:k]]
+
+
+def test_nearest_matches_haversine_brute_force():
+    locations = random_locations(400)
+    idx = BranchSpatialIndex()
+    assert idx.sync(locations) == (400, 0)
+    rng = random.Random(SEED + 1)
+    for _ in range(200):
+        lat, lng = rng.uniform(33.0, 38.8), rng.uniform(124.5, 131.2)
+        for k in (1, 5, 20):
+            found = idx.nearest(lat, lng, k)
+            assert [name for name, *_ in found] == brute_force(locations, lat, lng, k)
+            assert [d for *_, d in found] == sorted(d for *_, d in found)
+
+
+def test_nearest_returns_address_and_distance():
+    idx = BranchSpatialIndex()
+    assert idx.nearest(37.5, 127.0) == []
+    idx.sync(pd.DataFrame({"지점명": ["시청점"], "주소": ["서울 중구 세종대로 110"], "위도": [37.5663], "경도": [126.9779]}))
+    [(name, address, km)] = idx.nearest(37.5665, 126.9780, k=3)
+    assert (name, address) == ("시청점", "서울 중구 세종대로 110")
+    assert km == pytest.approx(haversine_km(37.5665, 126.9780, 37.5663, 126.9779))
+
+
+def test_sync_skips_same_frame_and_reinserts_only_changed_rows():
+    locations = random_locations(50)
+    idx = BranchSpatialIndex()
+    idx.sync(locations)
+    ids = {name: entry[0] for name, entry in idx._entries.items()}
+    assert idx.sync(locations) == (0, 0)  # 같은 표면 바로 반환
+
+    changed = locations.copy()
+    changed.loc[3, "위도"] += 0.01  # 좌표 변경 → 삭제 1 + 추가 1
+    changed.loc[7, "주소"] = "새 주소"  # 주소 변경도 다시 넣음
+    changed.loc[9, ["위도", "경도"]] = np.nan  # 좌표 없음 → 삭제
+    changed = pd.concat([changed, pd.DataFrame([["새지점", "새 주소", 37.5, 127.0]], columns=changed.columns)])
+    assert idx.sync(changed) == (3, 3)
+    assert len(idx) == 50
+    kept = {name: entry[0] for name, entry in idx._entries.items() if name not in ("지점3", "지점7", "새지점")}
+    assert kept == {name: ids[name] for name in kept}  # 나머지 지점은 id 그대로 (다시 넣지 않음)
+    assert "지점9" not in idx._entries
+
+    assert idx.sync(changed.copy()) == (0, 0)  # 내용이 같은 다른 표
+    assert idx.nearest(37.5, 127.0, k=1)[0][0] == "새지점"
+
+
+def test_sync_keeps_first_row_of_duplicate_names():
+    locations = pd.DataFrame({
+        "지점명": ["강남점", " 강남점 ", "", "역삼점"], "주소": ["a", "b", "c", "d"],
+        "위도": [37.49, 37.0, 37.5, 37.50], "경도": [127.02, 127.0, 127.0, 127.03],
+    })
+    idx = BranchSpatialIndex()
+    assert idx.sync(locations) == (2, 0)
+    assert idx._entries["강남점"][1:] == (37.49, 127.02, "a")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("37.5, 127.0", (37.5, 127.0)), ("37.5,127", (37.5, 127.0)),
+    ("127.0, 37.5", None), ("91, 127", None), ("37.5", None), ("서울시청", None), ("a, b", None),
+])
+def test_parse_coordinate(text, expected):
+    assert parse_coordinate(text) == expected
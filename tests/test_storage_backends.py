@@ -0,0 +1,87 @@
+import pytest
+
+from branch_store import SHEET_COLUMNS, build_frame
+from fake_sheets import FakeClient
+from sheet_fixtures import branch_values
+from sheet_writes import SheetConflictError, apply_ops_to_values
+from sheets_client import SheetsConnection
+from storage_backends import CsvBackend, SheetsBackend, create_backend
+
+OPS = {"updates": {2: {4: "pw-new"}}, "appends": [["지점9"]], "deletes": [3]}
+
+
+def sheets_backend(values):
+    client = FakeClient({"멘토즈 지점 정보": {"시트1": values}})
+    return SheetsBackend(SheetsConnection(lambda: client, "멘토즈 지점 정보", "시트1")), client
+
+
+@pytest.fixture(params=["sheets", "csv", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sheets":
+        return sheets_backend(branch_values(4))[0]
+    backend = create_backend(request.param, path=str(tmp_path / f"branches.{request.param}"))
+    backend.replace_values(branch_values(4))
+    return backend
+
+
+def test_read_values_round_trip(backend):
+    assert backend.read_values() == branch_values(4)
+
+
+def test_write_ops_applies_ops_and_changes_revision(backend):
+    before = backend.revision()
+    revision = backend.write_ops(OPS, expected_revision=before)
+
+    assert backend.read_values() == apply_ops_to_values(branch_values(4), OPS)
+    assert revision == backend.revision()
+
+
+def test_write_ops_rejects_stale_revision(backend):
+    stale = backend.revision()
+    backend.append_rows([["지점8"]], expected_revision=stale)
+
+    with pytest.raises(SheetConflictError):
+        backend.write_ops(OPS, expected_revision=stale)
+    assert backend.read_values()[-1][0] == "지점8"
+
+
+def test_append_rows_reports_concurrent_change(backend):
+    revision = backend.append_rows([["지점8", 1]], expected_revision=backend.revision())
+    assert revision is not None
+    assert backend.read_values()[-1][:2] == ["지점8", "1"]
+
+    assert backend.append_rows([["지점7"]], expected_revision="다른 수정 시각") is None
+
+
+def test_sheets_backend_uses_one_batch_update():
+    backend, client = sheets_backend(branch_values(4))
+    backend.write_ops(OPS, expected_revision=backend.revision())
+    backend.write_ops(OPS, expected_revision=backend.revision())
+
+    assert client.calls["batch_update"] == 2
+    assert client.calls["open"] == 1  # 이름 조회는 처음 한 번만
+
+
+@pytest.mark.parametrize("kind", ["csv", "sqlite"])
+def test_new_file_starts_with_the_sheet_header(kind, tmp_path):
+    backend = create_backend(kind, path=str(tmp_path / "new" / f"branches.{kind}"))
+
+    assert backend.read_values() == [SHEET_COLUMNS]
+    assert build_frame(backend.read_values()).empty
+    backend.append_rows([["지점1"]], expected_revision=backend.revision())
+    assert create_backend(kind, path=backend.path).read_values() == [SHEET_COLUMNS, ["지점1"]]  # 다시 열어도 그대로
+
+
+def test_empty_values_give_a_clear_error():
+    with pytest.raises(KeyError, match="헤더"):
+        build_frame([])
+
+
+def test_create_backend_validates_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        create_backend("sheets")
+    with pytest.raises(ValueError):
+        create_backend("csv")
+    with pytest.raises(ValueError):
+        create_backend("excel", path=str(tmp_path / "x"))
+    assert isinstance(create_backend("csv", path=str(tmp_path / "b.csv")), CsvBackend)
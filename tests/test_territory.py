@@ -0,0 +1,83 @@
+import random
+from itertools import combinations
+
+import pandas as pd
+import pytest
+
+shapely = pytest.importorskip("shapely")
+pytest.importorskip("pyproj")
+
+from territory import TerritoryIndex, project
+
+SEED = 5
+
+
+def random_locations(count, seed=SEED):
+    rng = random.Random(seed)
+    rows = [
+        (f"지점{i}", f"주소{i}", rng.uniform(37.45, 37.65), rng.uniform(126.85, 127.15))  # 서울 안에 촘촘히
+        for i in range(count)
+    ]
+    return pd.DataFrame(rows, columns=["지점명", "주소", "위도", "경도"])
+
+
+def circles(lats, lngs, radius_m):
+    x, y = project(lats, lngs)
+    return [shapely.Point(px, py).buffer(radius_m, quad_segs=16) for px, py in zip(x, y)]
+
+
+def brute_force_pairs(locations, radius_m):
+    areas = circles(locations["위도"], locations["경도"], radius_m)
+    names = list(locations["지점명"])
+    pairs = {}
+    for i, j in combinations(range(len(areas)), 2):
+        overlap = round(areas[i].intersection(areas[j]).area, 1)
+        if overlap > 0:
+            pairs[(names[i], names[j])] = overlap
+    return pairs
+
+
+@pytest.mark.parametrize("radius_m", [300, 500, 1000])
+def test_pairwise_overlaps_match_brute_force(radius_m):
+    locations = random_locations(150)
+    rows = TerritoryIndex(locations, radius_m=radius_m).pairwise_overlaps()
+    expected = brute_force_pairs(locations, radius_m)
+    assert expected  # 실제로 겹치는 쌍이 있는 데이터
+    assert {(row["지점A"], row["지점B"]): row["중복면적(㎡)"] for row in rows} == pytest.approx(expected, abs=0.2)
+    assert len(rows) == len(expected)
+    assert [row["중복면적(㎡)"] for row in rows] == sorted((row["중복면적(㎡)"] for row in rows), reverse=True)
+    assert all(row["거리(m)"] < 2 * radius_m for row in rows)
+
+
+def test_candidate_overlaps_match_brute_force():
+    locations = random_locations(150)
+    idx = TerritoryIndex(locations, radius_m=500)
+    areas = circles(locations["위도"], locations["경도"], 500)
+    rng = random.Random(SEED + 1)
+    for _ in range(50):
+        lat, lng = rng.uniform(37.45, 37.65), rng.uniform(126.85, 127.15)
+        [candidate] = circles([lat], [lng], 500)
+        expected = {
+            name: round(candidate.intersection(area).area, 1)
+            for name, area in zip(locations["지점명"], areas)
+        }
+        expected = {name: area for name, area in expected.items() if area > 0}
+        rows = idx.candidate_overlaps(lat, lng)
+        assert {row["지점명"]: row["중복면적(㎡)"] for row in rows} == pytest.approx(expected, abs=0.2)
+        for row in rows:
+            assert row["중복률(%)"] == pytest.approx(row["중복면적(㎡)"] / idx.area_m2 * 100, abs=0.1)
+
+
+def test_same_spot_overlaps_fully_and_far_apart_not_at_all():
+    locations = pd.DataFrame({
+        "지점명": ["시청점", "시청2호점", "부산점", "", "좌표없음"],
+        "주소": ["a", "b", "c", "d", "e"],
+        "위도": [37.5663, 37.5663, 35.1796, 37.5, None],
+        "경도": [126.9779, 126.9779, 129.0756, 127.0, None],
+    })
+    idx = TerritoryIndex(locations, radius_m=500)
+    assert len(idx) == 3  # 이름/좌표 없는 행 제외
+    [row] = idx.pairwise_overlaps()
+    assert (row["지점A"], row["지점B"], row["거리(m)"], row["중복률(%)"]) == ("시청점", "시청2호점", 0.0, 100.0)
+    assert idx.candidate_overlaps(33.5, 126.5) == []  # 제주
+    assert TerritoryIndex(locations.iloc[:1]).pairwise_overlaps() == []
@@ -0,0 +1,175 @@
+import sqlite3, threading
+
+import pytest
+
+from branch_store import BranchSync
+from fake_sheets import FakeClient
+from sheet_fixtures import HEADER, branch_values
+from sheets_client import SheetsConnection
+from storage_backends import CsvBackend, SheetsBackend
+from write_queue import COMMITTED, FAILED, SheetWriteQueue
+
+PWD = HEADER.index("PWD")
+
+
+class ScriptedBackend:
+    """CsvBackend를 감싸서 revision / 오류를 마음대로 돌려주는 백엔드"""
+
+    def __init__(self, inner, revisions=None, errors=()):
+        self.inner = inner
+        self.revisions = revisions  # 쓰기 후 돌려줄 revision (없으면 실제 값)
+        self.errors = list(errors)  # 쓰기마다 하나씩 꺼내 던질 오류
+        self.writes = 0
+
+    def revision(self):
+        return self.revisions or self.inner.revision()
+
+    def read_values(self):
+        return self.inner.read_values()
+
+    def write_ops(self, ops, expected_revision=None):
+        self.writes += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        revision = self.inner.write_ops(ops)
+        return self.revisions or revision
+
+    def append_rows(self, rows, expected_revision=None):
+        self.writes += 1
+        revision = self.inner.append_rows(rows, expected_revision=self.inner.revision())
+        return self.revisions or revision
+
+
+@pytest.fixture
+def csv_backend(tmp_path):
+    backend = CsvBackend(str(tmp_path / "branches.csv"))
+    backend.replace_values(branch_values(5))
+    return backend
+
+
+def make_queue(backend, tmp_path):
+    sync = BranchSync(backend, path=str(tmp_path / "snapshot.json"))
+    sync.current()
+    return SheetWriteQueue(backend, sync, min_interval=0), sync
+
+
+def submit_in_thread(queue, ops, base, timeout=5):
+    """submit이 제시간에 돌아오는지 확인 (_cond를 잡고 멈추면 실패)"""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("ticket", queue.submit(ops, base)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "submit이 멈춤"
+    return result["ticket"]
+
+
+def update(row, value):
+    return {"updates": {row: {PWD: value}}, "appends": [], "deletes": []}
+
+
+def test_submitted_ops_reach_backend_and_snapshot(csv_backend, tmp_path):
+    queue, sync = make_queue(csv_backend, tmp_path)
+    base = sync.snapshot["revision"]
+
+    first = queue.submit(update(2, "a"), base)
+    second = queue.submit({"updates": {}, "appends": [["지점9"]], "deletes": [4]}, base)
+    assert queue.wait(5)
+
+    expected = branch_values(5)
+    expected[1][PWD] = "a"
+    del expected[3]
+    expected.append(["지점9"])
+    assert csv_backend.read_values() == expected
+    assert sync.snapshot["values"] == expected  # 다시 읽지 않고 스냅샷에 바로 반영
+    assert sync.snapshot["revision"] == csv_backend.revision()
+    assert queue.status(first) == queue.status(second) == (COMMITTED, "")
+
+
+def test_ops_from_an_older_snapshot_are_shifted_past_deletes(csv_backend, tmp_path):
+    queue, sync = make_queue(csv_backend, tmp_path)
+    base = sync.snapshot["revision"]
+
+    queue.submit({"updates": {}, "appends": [], "deletes": [3]}, base)  # 지점2 삭제
+    assert queue.wait(5)
+    queue.submit(update(5, "changed"), base)  # 삭제 전 화면 기준 5행 = 지점4
+    assert queue.wait(5)
+
+    rows = {row[0]: row for row in csv_backend.read_values()[1:]}
+    assert "지점2" not in rows
+    assert rows["지점4"][PWD] == "changed"
+    assert rows["지점3"][PWD] == "pw3"
+
+
+def test_backend_returning_the_same_revision_does_not_hang(csv_backend, tmp_path):
+    # 쓰기 후에도 revision이 그대로인 백엔드 → 이력이 자기 자신을 가리키면 submit이 _cond를 잡은 채 멈췄다
+    backend = ScriptedBackend(csv_backend, revisions="r1")
+    queue, sync = make_queue(backend, tmp_path)
+
+    submit_in_thread(queue, update(2, "a"), "r1")
+    assert queue.wait(5)
+    ticket = submit_in_thread(queue, update(3, "b"), "r1")
+    assert queue.wait(5)
+
+    assert queue.status(ticket) == (COMMITTED, "")
+    assert backend.writes == 2
+
+
+def test_failed_snapshot_commit_keeps_writer_alive(csv_backend, tmp_path):
+    queue, sync = make_queue(csv_backend, tmp_path)
+    base = sync.snapshot["revision"]
+
+    def broken_commit(values, revision):
+        raise OSError("디스크 가득 참")
+
+    sync.commit = broken_commit
+    first = queue.submit(update(2, "a"), base)
+    assert queue.wait(5)
+    assert queue.status(first) == (COMMITTED, "")  # 시트에는 반영됨
+    assert sync.checked_at == 0.0  # 스냅샷은 다시 읽도록 표시
+
+    second = queue.submit(update(3, "b"), csv_backend.revision())
+    assert queue.wait(5)
+    assert queue.status(second) == (COMMITTED, "")
+
+
+def test_retryable_error_is_retried(csv_backend, tmp_path):
+    backend = ScriptedBackend(csv_backend, errors=[sqlite3.OperationalError("database is locked")])
+    queue, sync = make_queue(backend, tmp_path)
+    queue.min_interval = 0.01
+
+    ticket = queue.submit(update(2, "a"), sync.snapshot["revision"])
+    assert queue.wait(5)
+
+    assert queue.status(ticket) == (COMMITTED, "")
+    assert backend.writes == 2
+    assert csv_backend.read_values()[1][PWD] == "a"
+
+
+def test_conflict_fails_ticket_and_invalidates(csv_backend, tmp_path):
+    queue, sync = make_queue(csv_backend, tmp_path)
+    stale = sync.snapshot["revision"]
+    csv_backend.append_rows([["다른 곳에서 추가"]], expected_revision=stale)
+
+    ticket = queue.submit(update(2, "a"), stale)
+    assert queue.wait(5)
+
+    assert queue.status(ticket)[0] == FAILED
+    assert sync.checked_at == 0.0
+    assert csv_backend.read_values()[1][PWD] == "pw1"
+
+
+def test_queue_over_fake_sheets(tmp_path):
+    client = FakeClient({"멘토즈 지점 정보": {"시트1": branch_values(5)}})
+    backend = SheetsBackend(SheetsConnection(lambda: client, "멘토즈 지점 정보", "시트1"))
+    queue, sync = make_queue(backend, tmp_path)
+    base = sync.snapshot["revision"]
+    reads = client.calls["get_all_values"]
+
+    for row in range(2, 7):
+        queue.submit(update(row, f"new{row}"), base)
+    assert queue.wait(5)
+
+    assert client.calls["get_all_values"] == reads  # 쓴 결과는 스냅샷에 바로 반영
+    assert client.calls["batch_update"] <= 2  # 대기 중인 변경은 한 번에 합쳐서 전송
+    assert [row[PWD] for row in sync.snapshot["values"][1:]] == [f"new{row}" for row in range(2, 7)]
+    assert backend.read_values() == sync.snapshot["values"]
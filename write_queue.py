@@ -0,0 +1,183 @@
+import itertools, sqlite3, threading, time
+
+import gspread
+
+from sheet_writes import SheetConflictError, apply_ops_to_values, empty_ops, is_empty, merge_ops, shift_ops
+
+
+# ✅ 시트 쓰기 대기열 (write-behind)
+#    화면에서는 변경 내용을 넣고 바로 돌아가고, 백그라운드 스레드가 행 단위로 합쳐서
+#    min_interval 간격으로 batch_update 한 번씩 보낸다 (Sheets 쓰기 할당량: 분당 60회).
+
+PENDING, COMMITTED, FAILED = "pending", "committed", "failed"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_retryable(error):
+    """잠시 후 다시 보내면 되는 오류인지 (할당량 초과, 일시적인 서버 오류)"""
+    if isinstance(error, gspread.exceptions.APIError):
+        return getattr(error.response, "status_code", None) in RETRY_STATUS_CODES
+    if isinstance(error, sqlite3.OperationalError):
+        return "locked" in str(error)  # 다른 프로세스가 SQLite 파일에 쓰는 중
+    return False
+
+
+class SheetWriteQueue:
+    def __init__(self, backend, sync, min_interval=1.0, max_backoff=60):
+        self.backend = backend  # storage_backends의 백엔드
+        self.sync = sync  # branch_store.BranchSync (반영된 결과를 스냅샷에 바로 적용)
+        self.min_interval = min_interval
+        self.max_backoff = max_backoff
+
+        self._cond = threading.Condition()
+        self._pending = empty_ops()
+        self._pending_tickets = []
+        self._base_revision = None  # 대기 중인 ops의 행 번호 기준이 되는 시트 수정 시각
+        self._history = {}  # 반영 전 수정 시각 → (반영 후 수정 시각, 삭제된 행 번호)
+        self._status = {}
+        self._ticket_ids = itertools.count(1)
+        self._flushing = False
+        self._last_flush = 0.0
+        self._backoff = 0
+
+        self._thread = threading.Thread(target=self._run, name="sheet-write-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, ops, base_revision):
+        """ops를 대기열에 넣고 티켓 번호 반환 (base_revision: ops를 계산한 스냅샷의 수정 시각)"""
+        with self._cond:
+            target = self._base_revision if not is_empty(self._pending) else None
+            ops = self._rebase(ops, base_revision, target)
+            if ops is None:
+                raise SheetConflictError("다른 사용자가 먼저 시트를 수정했습니다. 새로고침 후 다시 저장해주세요.")
+            if is_empty(self._pending):
+                self._base_revision = self._latest(base_revision)
+
+            ticket = next(self._ticket_ids)
+            self._pending = merge_ops(self._pending, ops)
+            self._pending_tickets.append(ticket)
+            self._status[ticket] = (PENDING, "")
+            self._cond.notify()
+            return ticket
+
+    def status(self, ticket):
+        """(상태, 메시지) 반환: pending / committed / failed"""
+        with self._cond:
+            return self._status.get(ticket, ("unknown", ""))
+
+    def pending_count(self):
+        """대기 중인 변경 건수 (수정 행 + 추가 행 + 삭제 행)"""
+        with self._cond:
+            ops = self._pending
+            return len(ops["updates"]) + len(ops["appends"]) + len(ops["deletes"])
+
+    def wait(self, timeout=None):
+        """대기열이 빌 때까지 기다림 (CLI/테스트용)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not is_empty(self._pending) or self._flushing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    # ✅ 행 번호 보정: base 이후 반영된 삭제만큼 행 번호를 당긴다
+    def _rebase(self, ops, base_revision, target):
+        revision = base_revision
+        seen = set()
+        while revision != target and revision in self._history and revision not in seen:  # 순환 방지
+            seen.add(revision)
+            revision, deleted_rows = self._history[revision]
+            ops = shift_ops(ops, deleted_rows)
+        if target is not None and revision != target:
+            return None
+        return ops
+
+    def _latest(self, revision):
+        seen = set()
+        while revision in self._history and revision not in seen:  # 순환 방지
+            seen.add(revision)
+            revision = self._history[revision][0]
+        return revision
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while is_empty(self._pending):
+                    self._cond.wait()
+
+            # ✅ 전송 간격 유지 (기다리는 동안 들어온 변경은 같은 배치로 합쳐진다)
+            delay = self._last_flush + self.min_interval + self._backoff - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self._cond:
+                ops, tickets, base = self._pending, self._pending_tickets, self._base_revision
+                self._pending, self._pending_tickets = empty_ops(), []
+                self._flushing = True
+            try:
+                self._flush(ops, tickets, base)
+            except Exception as e:
+                # 예상하지 못한 오류로 쓰기 스레드가 멈추면 이후 티켓이 영원히 pending이 되므로 실패로 기록하고 계속 돈다
+                with self._cond:
+                    for ticket in tickets:
+                        if self._status.get(ticket, (PENDING,))[0] == PENDING:
+                            self._status[ticket] = (FAILED, str(e))
+                    self._flushing = False
+                    self._cond.notify_all()
+                self.sync.invalidate()
+
+    def _flush(self, ops, tickets, base):
+        self._last_flush = time.monotonic()
+        try:
+            if ops["updates"] or ops["deletes"]:
+                revision = self.backend.write_ops(ops, expected_revision=base)
+            else:
+                revision = self.backend.append_rows(ops["appends"], expected_revision=base)
+        except Exception as e:
+            with self._cond:
+                if is_retryable(e):
+                    # 할당량 초과 등 → 대기열 앞에 되돌려 놓고 점점 길게 쉬었다가 재시도
+                    self._backoff = min(max(self._backoff * 2, self.min_interval), self.max_backoff)
+                    self._pending = merge_ops(ops, self._pending)
+                    self._pending_tickets = tickets + self._pending_tickets
+                    self._base_revision = base
+                else:
+                    for ticket in tickets:
+                        self._status[ticket] = (FAILED, str(e))
+                    if isinstance(e, SheetConflictError):
+                        self.sync.invalidate()
+                self._flushing = False
+                self._cond.notify_all()
+            return
+
+        # ✅ 반영 결과를 로컬 스냅샷에 적용 (전체를 다시 읽지 않음)
+        #    시트에는 이미 반영됐으므로 여기서 실패해도 티켓은 committed, 스냅샷만 다시 읽게 한다
+        try:
+            snapshot = self.sync.snapshot
+            if revision is not None and snapshot is not None and snapshot.get("revision") == base:
+                self.sync.commit(apply_ops_to_values(snapshot["values"], ops), revision)
+            else:
+                self.sync.invalidate()
+        except Exception:
+            self.sync.invalidate()
+
+        with self._cond:
+            self._backoff = 0
+            if revision is not None:
+                # 수정 시각이 바로 갱신되지 않는 백엔드(Drive modifiedTime 지연, CSV mtime:size 동일)는
+                # 반영 후에도 같은 revision을 돌려줄 수 있다 → 자기 자신을 가리키는 이력은 만들지 않는다
+                if revision != base:
+                    self._history[base] = (revision, list(ops["deletes"]))
+                while len(self._history) > 50:
+                    self._history.pop(next(iter(self._history)))
+                # 전송 중에 들어온 변경도 새 수정 시각 기준으로 옮긴다
+                self._pending = shift_ops(self._pending, ops["deletes"])
+                self._base_revision = revision
+            for ticket in tickets:
+                self._status[ticket] = (COMMITTED, "")
+            while len(self._status) > 1000:
+                self._status.pop(next(iter(self._status)))
+            self._flushing = False
+            self._cond.notify_all()